@@ -7,6 +7,15 @@ import logging
 import numpy as np
 import json
 import sys
+import argparse
+from columnar_store import ParquetStockStore, iter_stock_frames
+from mmap_store import get_series_store, FIELDS
+from data_version import bump_data_version, ANALYSIS
+from surge_index import refresh_surge_events
+
+# API DB 게시 모듈(저장소 루트)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from pipeline_publish import get_api_engine, publish_analysis_results
 
 # 로깅 설정
 logging.basicConfig(
@@ -15,6 +24,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 패턴 분석기와 급등 이벤트 색인이 사용하는 수집 데이터 컬럼 (모두 메모리 맵 시계열 저장소에 있는 컬럼)
+ANALYSIS_COLUMNS = ['시가', '고가', '저가', '종가', '거래량', '등락률', '시가총액', '거래대금', '공매도잔고', '비중']
+
 def load_csv_data(csv_path):
     """CSV 파일에서 데이터를 로드합니다."""
     try:
@@ -24,6 +36,39 @@ def load_csv_data(csv_path):
         logger.error(f"CSV 파일 로딩 실패 ({csv_path}): {str(e)}")
         return None
 
+def load_stock_data(stock_code, columns=None, start_date=None, end_date=None):
+    """Parquet 저장소에서 종목 데이터를 로드합니다. 저장소에 없으면 CSV 파일을 사용합니다.
+
+    columns가 시계열 저장소 컬럼 범위 안이면 메모리 맵 시계열 저장소를 먼저 사용합니다.
+
+    반환값: (종목명, DataFrame). 데이터가 없으면 (None, None)
+    """
+    # 필요한 컬럼이 모두 시계열 저장소에 있으면 메모리 맵에서 읽음
+    series_store = get_series_store()
+    if columns is not None and set(columns) <= set(FIELDS.values()) and series_store.has_stock(stock_code):
+        return (series_store.get_name(stock_code) or stock_code,
+                series_store.read_frame(stock_code, start_date, end_date, columns=columns))
+
+    store = ParquetStockStore()
+    if store.has_stock(stock_code):
+        stock_name = store.get_name(stock_code) or stock_code
+        try:
+            return stock_name, store.read(stock_code, columns=columns, start_date=start_date, end_date=end_date)
+        except Exception as e:
+            logger.error(f"Parquet 데이터 로딩 실패 ({stock_code}): {str(e)}")
+            return stock_name, None
+
+    csv_files = glob.glob(f"Result/*_{stock_code}.csv")
+    if not csv_files:
+        return None, None
+    stock_name, _ = extract_stock_info_from_filename(csv_files[0])
+    df = load_csv_data(csv_files[0])
+    if df is not None:
+        if columns is not None:
+            df = df[[col for col in columns if col in df.columns]]
+        df = df.loc[start_date:end_date]
+    return stock_name, df
+
 def extract_stock_info_from_filename(filename):
     """파일명에서 종목명과 종목코드를 추출합니다."""
     basename = os.path.basename(filename)
@@ -40,47 +85,65 @@ def extract_stock_info_from_filename(filename):
         stock_name = name_without_ext.replace('_comprehensive_data', '')
         return stock_name, None
 
+def convert_numpy_types(obj):
+    """numpy 타입을 Python 기본 타입으로 변환"""
+    if isinstance(obj, np.integer):
+        return int(obj)
+    elif isinstance(obj, np.floating):
+        return float(obj)
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, dict):
+        return {key: convert_numpy_types(value) for key, value in obj.items()}
+    elif isinstance(obj, list):
+        return [convert_numpy_types(item) for item in obj]
+    else:
+        return obj
+
+def build_analysis_row(result):
+    """분석 결과를 manipulation_analysis 행(컬럼명 → 값)으로 변환합니다."""
+    # 패턴 데이터를 JSON 문자열로 변환 (numpy 타입 변환 포함)
+    patterns_converted = convert_numpy_types(result['patterns'])
+    patterns_json = json.dumps(patterns_converted, ensure_ascii=False)
+    warnings_json = json.dumps(result['warnings'], ensure_ascii=False)
+    
+    # 최대 상승률 계산 (패턴에서 추출)
+    max_rise_rate = float(result['patterns'].get('최대등락률', 0))
+    
+    # 조작 유형 결정
+    manipulation_type = []
+    if result['patterns'].get('급등일수', 0) > 5:
+        manipulation_type.append('급등빈발')
+    if result['patterns'].get('거래량폭등일수', 0) > 10:
+        manipulation_type.append('거래량조작')
+    if result['patterns'].get('상한가근처일수', 0) > 3:
+        manipulation_type.append('상한가조작')
+    
+    manipulation_type_str = ', '.join(manipulation_type) if manipulation_type else '정상'
+    
+    return {
+        'stock_name': result['stock_name'],
+        'stock_code': result['stock_code'],
+        'category': '패턴분석',
+        'manipulation_period': result['data_summary']['period'],
+        'max_rise_rate': max_rise_rate,
+        'manipulation_type': manipulation_type_str,
+        'risk_level': result['risk_level'],
+        'risk_score': int(result['risk_score']),
+        'description': f"3년간 데이터 분석 결과 - {len(result['warnings'])}개 이상 패턴 감지",
+        'analysis_patterns': patterns_json,
+        'warnings': warnings_json,
+    }
+
 def save_analysis_to_db(analysis_results):
     """분석 결과를 DB에 저장합니다."""
     try:
-        def convert_numpy_types(obj):
-            """numpy 타입을 Python 기본 타입으로 변환"""
-            if isinstance(obj, np.integer):
-                return int(obj)
-            elif isinstance(obj, np.floating):
-                return float(obj)
-            elif isinstance(obj, np.ndarray):
-                return obj.tolist()
-            elif isinstance(obj, dict):
-                return {key: convert_numpy_types(value) for key, value in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_numpy_types(item) for item in obj]
-            else:
-                return obj
-        
         db_manager = DatabaseManager()
         conn = db_manager.get_connection()
         cursor = conn.cursor()
         
         for result in analysis_results:
-            # 패턴 데이터를 JSON 문자열로 변환 (numpy 타입 변환 포함)
-            patterns_converted = convert_numpy_types(result['patterns'])
-            patterns_json = json.dumps(patterns_converted, ensure_ascii=False)
-            warnings_json = json.dumps(result['warnings'], ensure_ascii=False)
-            
-            # 최대 상승률 계산 (패턴에서 추출)
-            max_rise_rate = float(result['patterns'].get('최대등락률', 0))
-            
-            # 조작 유형 결정
-            manipulation_type = []
-            if result['patterns'].get('급등일수', 0) > 5:
-                manipulation_type.append('급등빈발')
-            if result['patterns'].get('거래량폭등일수', 0) > 10:
-                manipulation_type.append('거래량조작')
-            if result['patterns'].get('상한가근처일수', 0) > 3:
-                manipulation_type.append('상한가조작')
-            
-            manipulation_type_str = ', '.join(manipulation_type) if manipulation_type else '정상'
+            row = build_analysis_row(result)
             
             # DB에 삽입
             cursor.execute('''
@@ -88,23 +151,14 @@ def save_analysis_to_db(analysis_results):
                 (stock_name, stock_code, category, manipulation_period, max_rise_rate, 
                  manipulation_type, risk_level, risk_score, description, 
                  analysis_patterns, warnings)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                result['stock_name'],
-                result['stock_code'],
-                '패턴분석',
-                result['data_summary']['period'],
-                max_rise_rate,
-                manipulation_type_str,
-                result['risk_level'],
-                int(result['risk_score']),
-                f"3년간 데이터 분석 결과 - {len(result['warnings'])}개 이상 패턴 감지",
-                patterns_json,
-                warnings_json
-            ))
+                VALUES (:stock_name, :stock_code, :category, :manipulation_period, :max_rise_rate,
+                        :manipulation_type, :risk_level, :risk_score, :description,
+                        :analysis_patterns, :warnings)
+            ''', row)
         
         conn.commit()
         conn.close()
+        bump_data_version(ANALYSIS)
         
         print(f"\n💾 분석 결과 {len(analysis_results)}건이 DB에 저장되었습니다.")
         
@@ -113,32 +167,43 @@ def save_analysis_to_db(analysis_results):
         import traceback
         traceback.print_exc()
 
-def main():
+def publish_analysis_to_api_db(engine, analysis_results):
+    """분석 결과를 API DB(PostgreSQL)에 추가하고 대시보드 요약을 다시 집계합니다. 실패하면 예외를 올립니다."""
+    count = publish_analysis_results(engine, [build_analysis_row(result) for result in analysis_results])
+    print(f"\n🌐 분석 결과 {count}건을 API DB에 게시하고 대시보드 요약을 갱신했습니다.")
+
+def parse_args(argv=None):
+    """명령행 인자를 해석합니다."""
+    parser = argparse.ArgumentParser(description="수집 데이터 패턴 분석")
+    parser.add_argument("stock_code", nargs="?", help="단일 종목코드 (생략 시 수집된 전체 종목)")
+    parser.add_argument("--publish", action="store_true",
+                        help="분석 결과를 API DB(PostgreSQL, DATABASE_URL)에도 저장하고 대시보드 요약 갱신")
+    args = parser.parse_args(argv)
+    if args.publish and not os.getenv("DATABASE_URL"):
+        parser.error("--publish에는 DATABASE_URL 환경변수가 필요합니다.")
+    return args
+
+def main(argv=None):
     """패턴 분석 메인 실행 함수"""
+    args = parse_args(argv)
+    api_engine = get_api_engine() if args.publish else None
+    
     # 명령행 인자로 종목코드가 전달된 경우 단일 종목 처리
-    if len(sys.argv) > 1:
-        stock_code = sys.argv[1]
+    if args.stock_code:
+        stock_code = args.stock_code
         
         # 패턴 분석기 초기화
         analyzer = StockPatternAnalyzer()
         
-        # Result 디렉토리에서 해당 종목의 CSV 파일 찾기
-        csv_files = glob.glob(f"Result/*_{stock_code}.csv")
+        # 시계열 저장소(없으면 Parquet 저장소, Result 디렉토리의 CSV 순)에서 분석에 필요한 컬럼만 로드
+        stock_name, df = load_stock_data(stock_code, columns=ANALYSIS_COLUMNS)
         
-        if not csv_files:
-            logger.error(f"종목코드 {stock_code}에 해당하는 CSV 파일을 찾을 수 없습니다.")
+        if stock_name is None:
+            logger.error(f"종목코드 {stock_code}에 해당하는 수집 데이터를 찾을 수 없습니다.")
             return
         
-        csv_file = csv_files[0]  # 첫 번째 파일 사용
-        
-        # 파일명에서 종목 정보 추출
-        stock_name, _ = extract_stock_info_from_filename(csv_file)
-        
         logger.info(f"단일 종목 패턴 분석 시작: {stock_name} ({stock_code})")
         
-        # CSV 데이터 로드
-        df = load_csv_data(csv_file)
-        
         if df is not None:
             # 패턴 분석 수행
             analysis_result = analyzer.analyze_stock_data(df, stock_name, stock_code)
@@ -149,6 +214,11 @@ def main():
                 
                 # 분석 결과를 DB에 저장
                 save_analysis_to_db([analysis_result])
+                if api_engine is not None:
+                    publish_analysis_to_api_db(api_engine, [analysis_result])
+                
+                # 급등 이벤트 색인 갱신
+                refresh_surge_events(stock_code, df)
                 
                 # 작전주 의심 종목인지 확인하고 anomalousList.db에 저장
                 save_to_anomalous_db_if_suspicious(analysis_result)
@@ -167,27 +237,14 @@ def main():
     # 패턴 분석기 초기화
     analyzer = StockPatternAnalyzer()
     
-    # Result 디렉토리에서 CSV 파일들 찾기
-    csv_files = glob.glob("Result/*.csv")
-    
-    if not csv_files:
-        print("❌ Result 디렉토리에 분석할 CSV 파일이 없습니다.")
-        print("💡 먼저 stock_scrap.py를 실행하여 데이터를 수집하세요.")
-        return
-    
-    print(f"📋 총 {len(csv_files)}개 CSV 파일 발견\n")
-    
+    # Parquet 저장소와 Result 디렉토리의 CSV 파일에서 종목 데이터 로드
     analysis_results = []
+    stock_count = 0
     
-    for csv_file in csv_files:
-        # 파일명에서 종목 정보 추출
-        stock_name, stock_code = extract_stock_info_from_filename(csv_file)
-        
+    for stock_name, stock_code, df in iter_stock_frames(columns=ANALYSIS_COLUMNS):
+        stock_count += 1
         print(f"📈 {stock_name} ({stock_code}) 패턴 분석 중...")
         
-        # CSV 데이터 로드
-        df = load_csv_data(csv_file)
-        
         if df is not None:
             # 패턴 분석 수행
             analysis_result = analyzer.analyze_stock_data(df, stock_name, stock_code)
@@ -196,12 +253,20 @@ def main():
                 # 분석 결과 출력
                 analyzer.print_analysis_result(analysis_result)
                 analysis_results.append(analysis_result)
+                refresh_surge_events(stock_code, df)
                 print()  # 빈 줄 추가
             else:
                 print(f"❌ {stock_name} 패턴 분석 실패\n")
         else:
             print(f"❌ {stock_name} 데이터 로딩 실패\n")
     
+    if not stock_count:
+        print("❌ Result 디렉토리에 분석할 수집 데이터가 없습니다.")
+        print("💡 먼저 stock_scrap.py를 실행하여 데이터를 수집하세요.")
+        return
+    
+    print(f"📋 총 {stock_count}개 종목 분석 완료\n")
+    
     # 종합 분석 결과 요약
     if analysis_results:
         summary = analyzer.generate_summary_report(analysis_results)
@@ -211,6 +276,8 @@ def main():
         
         # 분석 결과를 DB에 저장
         save_analysis_to_db(analysis_results)
+        if api_engine is not None:
+            publish_analysis_to_api_db(api_engine, analysis_results)
     else:
         print("❌ 분석 가능한 데이터가 없습니다.")
 
@@ -344,6 +411,7 @@ def save_to_anomalous_db_if_suspicious(analysis_result):
             
             conn.commit()
             conn.close()
+            bump_data_version(ANALYSIS)
             
             logger.info(f"작전주 의심 종목으로 등록: {analysis_result['stock_name']} ({analysis_result['stock_code']})")
             
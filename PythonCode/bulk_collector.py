@@ -0,0 +1,131 @@
+from pykrx import stock
+import pandas as pd
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from rate_limiter import TokenBucketRateLimiter, RateLimitedSource
+from collection_engine import DEFAULT_WORKERS
+from ticker_index import get_ticker_index
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# collect_comprehensive_data 결과(completed_stocks 원본)와 같은 컬럼 순서
+COMPREHENSIVE_COLUMNS = [
+    '시가', '고가', '저가', '종가', '거래량', '등락률',
+    '시가총액', '거래량_cap', '거래대금', '상장주식수',
+    'BPS', 'PER', 'PBR', 'EPS', 'DIV', 'DPS',
+    '기관합계', '기타법인', '개인', '외국인합계'
+]
+
+# 투자자 구분(pykrx 인자) → 종목별 컬럼명
+INVESTORS = {
+    '기관합계': '기관합계',
+    '기타법인': '기타법인',
+    '개인': '개인',
+    '외국인': '외국인합계',
+}
+
+
+class MarketSnapshotCollector:
+    """거래일별 전 종목 스냅샷을 받아 종목별 시계열로 재구성하는 대량 수집기
+
+    종목마다 기간 조회를 하는 대신 거래일마다 시장 전체를 한 번씩 조회하므로
+    호출 수가 종목 수가 아닌 거래일 수에 비례합니다.
+    """
+
+    def __init__(self, rate_limiter=None, workers=DEFAULT_WORKERS, include_investor=False, data_source=None):
+        self.rate_limiter = rate_limiter or TokenBucketRateLimiter(rate=1, capacity=1)
+        self.source = data_source or RateLimitedSource(stock, self.rate_limiter)
+        self.workers = max(1, int(workers))
+        # 투자자별 순매수는 거래일마다 4회 추가 호출이 필요하므로 선택 사항
+        self.include_investor = include_investor
+
+    def get_trading_days(self, start_date, end_date):
+        """기간 내 거래일 목록(YYYYMMDD)을 반환합니다."""
+        days = self.source.get_previous_business_days(fromdate=start_date, todate=end_date)
+        return [day.strftime("%Y%m%d") for day in days]
+
+    def collect_snapshot(self, date):
+        """특정 거래일의 전 종목 데이터를 종목코드 인덱스 DataFrame으로 반환합니다."""
+        ohlcv_df = self.source.get_market_ohlcv_by_ticker(date, market="ALL")
+        cap_df = self.source.get_market_cap_by_ticker(date, market="ALL")
+        fundamental_df = self.source.get_market_fundamental_by_ticker(date, market="ALL")
+
+        snapshot_df = ohlcv_df[[col for col in ['시가', '고가', '저가', '종가', '거래량', '등락률'] if col in ohlcv_df.columns]]
+        cap_df = cap_df.rename(columns={'거래량': '거래량_cap'})
+        snapshot_df = snapshot_df.join(
+            cap_df[[col for col in ['시가총액', '거래량_cap', '거래대금', '상장주식수'] if col in cap_df.columns]],
+            how='left'
+        )
+        snapshot_df = snapshot_df.join(fundamental_df, how='left', rsuffix='_fund')
+
+        if self.include_investor:
+            for investor, column in INVESTORS.items():
+                investor_df = self.source.get_market_net_purchases_of_equities_by_ticker(date, date, "ALL", investor)
+                if '순매수거래대금' in investor_df.columns:
+                    snapshot_df[column] = investor_df['순매수거래대금']
+
+        return snapshot_df.reindex(columns=[col for col in COMPREHENSIVE_COLUMNS if col in snapshot_df.columns])
+
+    def collect(self, start_date, end_date):
+        """기간 내 모든 거래일 스냅샷을 (날짜, 티커) MultiIndex DataFrame으로 반환합니다."""
+        trading_days = self.get_trading_days(start_date, end_date)
+        logger.info(f"시장 스냅샷 수집 시작: {len(trading_days)}거래일 (작업자 {self.workers}개)")
+
+        snapshots = {}
+        lock = threading.Lock()
+
+        def fetch(date):
+            df = self.collect_snapshot(date)
+            with lock:
+                snapshots[pd.Timestamp(date)] = df
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="krx-bulk") as executor:
+            futures = {executor.submit(fetch, date): date for date in trading_days}
+            for i, future in enumerate(as_completed(futures), 1):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"{futures[future]} 스냅샷 수집 오류: {str(e)}")
+                if i % 50 == 0 or i == len(futures):
+                    logger.info(f"스냅샷 진행률: {i}/{len(futures)}")
+
+        if not snapshots:
+            return None
+
+        market_df = pd.concat(snapshots, names=['날짜', '티커'])
+        return market_df.sort_index()
+
+    def iter_stock_frames(self, market_df, stock_codes=None):
+        """시장 DataFrame을 종목별 시계열(날짜 인덱스)로 나눠 (종목코드, DataFrame)을 반환합니다."""
+        if stock_codes is not None:
+            market_df = market_df[market_df.index.get_level_values('티커').isin(list(stock_codes))]
+        for stock_code, stock_df in market_df.groupby(level='티커', sort=False):
+            yield stock_code, stock_df.droplevel('티커')
+
+    def run(self, start_date, end_date, sinks, stock_codes=None):
+        """스냅샷을 수집해 종목별로 sink(df, stock_name, stock_code)에 저장합니다."""
+        market_df = self.collect(start_date, end_date)
+        if market_df is None:
+            logger.error("시장 스냅샷 수집 실패")
+            return []
+
+        ticker_index = get_ticker_index(wait=True)
+        results = []
+        for stock_code, stock_df in self.iter_stock_frames(market_df, stock_codes):
+            stock_name = ticker_index.get_name(stock_code) or stock_code
+            for sink in sinks:
+                try:
+                    sink(stock_df, stock_name, stock_code)
+                except Exception as e:
+                    logger.error(f"{stock_name} 저장 오류: {str(e)}")
+            results.append({'stock_name': stock_name, 'stock_code': stock_code, 'rows': len(stock_df)})
+
+        logger.info(f"시장 스냅샷 종목별 저장 완료: {len(results)}개 종목")
+        return results
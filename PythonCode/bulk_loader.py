@@ -0,0 +1,193 @@
+import io
+import itertools
+import logging
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# 수집 데이터 컬럼 → manipulation_stocks.db completed_stocks 컬럼
+COMPLETED_STOCKS_COLUMNS = {
+    '시가': 'open_price',
+    '고가': 'high_price',
+    '저가': 'low_price',
+    '종가': 'close_price',
+    '거래량': 'volume',
+    '등락률': 'change_rate',
+    '시가총액': 'market_cap',
+    '거래량_cap': 'trading_volume_cap',
+    '거래대금': 'trading_value',
+    '상장주식수': 'listed_shares',
+    'BPS': 'bps',
+    'PER': 'per',
+    'PBR': 'pbr',
+    'EPS': 'eps',
+    'DIV': 'div',
+    'DPS': 'dps',
+    '기관합계': 'institution_total',
+    '기타법인': 'other_corporation',
+    '개인': 'individual',
+    '외국인합계': 'foreign_total',
+    '공매도잔고': 'short_balance',
+    '비중': 'short_ratio',
+}
+COMPLETED_STOCKS_INT_COLUMNS = {
+    'open_price', 'high_price', 'low_price', 'close_price', 'volume', 'market_cap',
+    'trading_volume_cap', 'trading_value', 'listed_shares', 'institution_total',
+    'other_corporation', 'individual', 'foreign_total', 'short_balance',
+}
+
+# 수집 데이터 컬럼 → stock_daily_data 컬럼
+DAILY_DATA_COLUMNS = {
+    '시가': 'open_price',
+    '고가': 'high_price',
+    '저가': 'low_price',
+    '종가': 'close_price',
+    '거래량': 'volume',
+    '등락률': 'change_rate',
+    '시가총액': 'market_cap',
+    '거래대금': 'trading_value',
+}
+
+# collectCompleteData.db 한글 컬럼 테이블(수집 데이터 컬럼명을 그대로 사용)의 컬럼과 정수 컬럼
+KOREAN_COLUMNS = {
+    column: column for column in [
+        '시가', '고가', '저가', '종가', '거래량', '등락률',
+        '시가총액', '거래량_cap', '거래대금', '상장주식수',
+        'BPS', 'PER', 'PBR', 'EPS', 'DIV', 'DPS',
+        '기관합계', '기타법인', '개인', '외국인합계'
+    ]
+}
+KOREAN_INT_COLUMNS = {
+    '시가', '고가', '저가', '종가', '거래량', '시가총액', '거래량_cap', '거래대금', '상장주식수',
+    '기관합계', '기타법인', '개인', '외국인합계',
+}
+
+
+def coerce_frame(df, column_map, int_columns=(), constants=None, date_column='date', date_format='%Y-%m-%d'):
+    """날짜 인덱스 수집 DataFrame을 적재용 DataFrame으로 변환합니다.
+
+    행 단위 safe_int/safe_float 대신 컬럼 단위로 숫자 변환합니다.
+    변환할 수 없는 값과 원본에 없는 컬럼은 NULL이 되며, 정수 컬럼은 소수점 이하를 버립니다.
+
+    Args:
+        column_map: 원본 컬럼명 → 대상 컬럼명
+        int_columns: 정수로 저장할 대상 컬럼명
+        constants: 모든 행에 넣을 고정값 {대상 컬럼명: 값} (종목명, 종목코드 등)
+        date_column: 날짜 인덱스를 문자열로 넣을 대상 컬럼명
+    """
+    data = {}
+    for column, value in (constants or {}).items():
+        data[column] = np.full(len(df), value, dtype=object)
+    if date_column:
+        data[date_column] = pd.to_datetime(df.index).strftime(date_format)
+
+    for source, target in column_map.items():
+        if source in df.columns:
+            values = pd.to_numeric(df[source], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        else:
+            values = np.full(len(df), np.nan)
+        data[target] = pd.array(np.trunc(values), dtype='Int64') if target in int_columns else values
+
+    return pd.DataFrame(data)
+
+
+class BulkLoader:
+    """DataFrame을 DB 테이블에 청크 단위로 일괄 적재합니다.
+
+    - SQLite: executemany (upsert_keys가 있으면 ON CONFLICT ... DO UPDATE)
+    - PostgreSQL(psycopg2): COPY FROM STDIN (upsert_keys가 있으면 임시 테이블로 COPY 후 INSERT ... ON CONFLICT)
+
+    트랜잭션 커밋은 호출하는 쪽에서 합니다.
+    """
+
+    def __init__(self, conn, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.conn = conn
+        self.chunk_size = max(1, int(chunk_size))
+        self._temp_ids = itertools.count()
+
+    @property
+    def is_sqlite(self):
+        return isinstance(self.conn, sqlite3.Connection)
+
+    def _chunks(self, df):
+        for start in range(0, len(df), self.chunk_size):
+            yield df.iloc[start:start + self.chunk_size]
+
+    def load(self, table, df, upsert_keys=None, touch_columns=()):
+        """df의 모든 컬럼을 table에 적재하고 적재한 행 수를 반환합니다.
+
+        upsert_keys가 주어지면 같은 키의 기존 행을 갱신하며,
+        touch_columns의 컬럼은 갱신 시 CURRENT_TIMESTAMP로 설정합니다.
+        """
+        if df is None or df.empty:
+            return 0
+        if self.is_sqlite:
+            self._load_sqlite(table, df, upsert_keys, touch_columns)
+        elif hasattr(self.conn.cursor(), 'copy_expert'):
+            self._load_postgres(table, df, upsert_keys, touch_columns)
+        else:
+            raise ValueError(f"지원하지 않는 DB 연결입니다: {type(self.conn).__name__}")
+        return len(df)
+
+    def _upsert_clause(self, columns, upsert_keys, touch_columns):
+        updates = [f"{col} = excluded.{col}" for col in columns if col not in upsert_keys]
+        updates += [f"{col} = CURRENT_TIMESTAMP" for col in touch_columns]
+        action = f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING"
+        return f"ON CONFLICT ({', '.join(upsert_keys)}) {action}"
+
+    def _load_sqlite(self, table, df, upsert_keys, touch_columns):
+        columns = list(df.columns)
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        if upsert_keys:
+            query += " " + self._upsert_clause(columns, upsert_keys, touch_columns)
+
+        cursor = self.conn.cursor()
+        for chunk in self._chunks(df):
+            rows = chunk.astype(object).where(chunk.notna(), None)
+            cursor.executemany(query, rows.itertuples(index=False, name=None))
+
+    def _to_copy_buffer(self, chunk):
+        # 정수 컬럼이 결측 때문에 실수로 읽힌 경우 "1.0"이 정수 컬럼에 들어가지 않도록 정수로 기록
+        chunk = chunk.copy()
+        for col in chunk.columns:
+            if pd.api.types.is_float_dtype(chunk[col]):
+                values = chunk[col].dropna()
+                if len(values) and (values == np.trunc(values)).all() and values.abs().max() < 2 ** 53:
+                    chunk[col] = chunk[col].astype('Int64')
+        buffer = io.StringIO()
+        chunk.to_csv(buffer, index=False, header=False, na_rep='')
+        buffer.seek(0)
+        return buffer
+
+    def _load_postgres(self, table, df, upsert_keys, touch_columns):
+        columns = list(df.columns)
+        column_list = ', '.join(columns)
+        cursor = self.conn.cursor()
+
+        target = table
+        if upsert_keys:
+            target = f"_bulk_{table}_{next(self._temp_ids)}"
+            cursor.execute(f"CREATE TEMP TABLE {target} (LIKE {table} INCLUDING DEFAULTS)")
+
+        for chunk in self._chunks(df):
+            cursor.copy_expert(
+                f"COPY {target} ({column_list}) FROM STDIN WITH (FORMAT csv)",
+                self._to_copy_buffer(chunk)
+            )
+
+        if upsert_keys:
+            cursor.execute(
+                f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {target} "
+                + self._upsert_clause(columns, upsert_keys, touch_columns)
+            )
+            cursor.execute(f"DROP TABLE {target}")
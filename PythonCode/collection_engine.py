@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from job_ledger import STORED_UNIT
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BACKOFF_SECONDS = 2.0
+
+# 데이터셋 이름 → StockDataCollector 수집 메서드
+DATASETS = {
+    'basic': 'collect_basic_data',
+    'market_cap': 'collect_market_cap_data',
+    'fundamental': 'collect_fundamental_data',
+    'investor': 'collect_trading_volume_by_investor',
+    'shorting': 'collect_shorting_data',
+}
+
+
+class _StockJob:
+    """한 종목의 데이터셋 수집 진행 상태"""
+
+    def __init__(self, stock_name, stock_code, start_date):
+        self.stock_name = stock_name
+        self.stock_code = stock_code
+        self.start_date = start_date
+        self.frames = {}
+        self.remaining = len(DATASETS)
+        self.lock = threading.Lock()
+
+
+class CollectionEngine:
+    """여러 종목의 데이터셋을 공유 속도 제한기 아래에서 동시에 수집하는 엔진
+
+    종목별 5개 데이터셋이 모두 모이면 그 종목만 즉시 병합하여 sink로 넘기므로
+    느린 종목이 있어도 다른 종목의 저장은 기다리지 않습니다.
+    sink는 ``sink(df, stock_name, stock_code)`` 형태의 호출 가능 객체이며,
+    예외를 올리거나 False를 반환하면 저장 실패로 봅니다.
+
+    ledger(CollectionLedger)가 주어지면 데이터셋 단위로 상태를 기록하고,
+    같은 기준일·시작일로 이미 끝난 단위는 다시 수집하지 않습니다. 실패한 데이터셋은
+    지수 백오프로 max_attempts회까지 재시도합니다.
+    """
+
+    def __init__(self, collector, workers=DEFAULT_WORKERS, sinks=None, ledger=None,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, backoff_seconds=DEFAULT_BACKOFF_SECONDS):
+        self.collector = collector
+        self.workers = max(1, int(workers))
+        self.sinks = list(sinks or [])
+        self.ledger = ledger
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_seconds = backoff_seconds
+        # SQLite 동시 쓰기 충돌을 피하기 위해 저장은 직렬화
+        self._sink_lock = threading.Lock()
+
+    def run(self, stocks, years=3, start_dates=None):
+        """(종목명, 종목코드) 목록을 수집하고 종목별 결과 목록을 반환합니다.
+
+        start_dates에 종목코드별 시작일(YYYYMMDD)이 있으면 해당 날짜부터만 수집합니다.
+        """
+        # 수집기 기준일에서 계산 (캐시 replay 모드에서는 캐시를 기록한 날)
+        default_start = (datetime.strptime(self.collector.today, "%Y%m%d") - timedelta(days=365*years)).strftime("%Y%m%d")
+        start_dates = start_dates or {}
+        jobs = [
+            _StockJob(stock_name, stock_code, start_dates.get(stock_code, default_start))
+            for stock_name, stock_code in stocks
+        ]
+        results = []
+
+        if self.ledger is not None:
+            target_date = self.collector.today
+            completed = {
+                job.stock_code for job in jobs
+                if self.ledger.is_stock_complete(job.stock_code, DATASETS, target_date, job.start_date)
+            }
+            if completed:
+                logger.info(f"이미 완료된 {len(completed)}개 종목은 건너뜁니다. (기준일 {target_date})")
+                jobs = [job for job in jobs if job.stock_code not in completed]
+
+        logger.info(f"총 {len(jobs)}개 종목 동시 수집 시작 (작업자 {self.workers}개)")
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="krx") as executor:
+            futures = [
+                executor.submit(self._collect_dataset, job, dataset)
+                for job in jobs
+                for dataset in DATASETS
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                if result is not None:
+                    results.append(result)
+                    status = "완료" if result['success'] else "실패"
+                    logger.info(f"[{len(results)}/{len(jobs)}] {result['stock_name']} ({result['stock_code']}) 데이터 수집 {status}")
+
+        logger.info(f"동시 수집 종료: 성공 {sum(r['success'] for r in results)}개 / 전체 {len(jobs)}개")
+        return results
+
+    def _collect_dataset(self, job, dataset):
+        """데이터셋 하나를 수집하고, 종목의 마지막 데이터셋이면 병합·저장까지 수행합니다."""
+        df = self._fetch_dataset(job, dataset)
+
+        with job.lock:
+            job.frames[dataset] = df
+            job.remaining -= 1
+            finished = job.remaining == 0
+
+        if finished:
+            return self._finish(job)
+        return None
+
+    def _fetch_dataset(self, job, dataset):
+        """데이터셋을 수집합니다. 원장이 있으면 완료 단위는 재사용하고 실패 시 백오프 후 재시도합니다."""
+        method = getattr(self.collector, DATASETS[dataset])
+        target_date = self.collector.today
+
+        if self.ledger is not None:
+            staged_df = self.ledger.load_staged(job.stock_code, dataset, target_date, job.start_date)
+            if staged_df is not None:
+                return staged_df
+
+        for attempt in range(1, self.max_attempts + 1):
+            if self.ledger is not None:
+                self.ledger.mark_running(job.stock_code, dataset, target_date, job.start_date, job.stock_name)
+            try:
+                df = method(job.stock_code, job.start_date)
+                error = None if df is not None else "수집 결과 없음"
+            except Exception as e:
+                df = None
+                error = str(e)
+
+            if df is not None:
+                if self.ledger is not None:
+                    self.ledger.mark_done(job.stock_code, dataset, target_date, job.start_date, df, job.stock_name)
+                return df
+
+            if self.ledger is not None:
+                self.ledger.mark_failed(job.stock_code, dataset, target_date, job.start_date, error, job.stock_name)
+            if attempt < self.max_attempts:
+                delay = self.backoff_seconds * (2 ** (attempt - 1))
+                logger.warning(f"{job.stock_name} {dataset} 수집 실패({attempt}/{self.max_attempts}), {delay:.0f}초 후 재시도: {error}")
+                time.sleep(delay)
+            else:
+                logger.error(f"{job.stock_name} {dataset} 수집 최종 실패: {error}")
+        return None
+
+    def _finish(self, job):
+        """수집된 데이터셋을 병합하여 sink에 저장합니다."""
+        df = self.collector.merge_comprehensive_data(
+            job.frames.get('basic'),
+            job.frames.get('market_cap'),
+            job.frames.get('fundamental'),
+            job.frames.get('investor'),
+            job.frames.get('shorting'),
+        )
+        result = {
+            'stock_name': job.stock_name,
+            'stock_code': job.stock_code,
+            'rows': 0 if df is None else len(df),
+            'success': df is not None and not df.empty,
+        }
+        job.frames.clear()
+
+        if result['success']:
+            stored = True
+            with self._sink_lock:
+                for sink in self.sinks:
+                    try:
+                        if sink(df, job.stock_name, job.stock_code) is False:
+                            stored = False
+                    except Exception as e:
+                        stored = False
+                        logger.error(f"{job.stock_name} 저장 오류: {str(e)}")
+
+            if self.ledger is not None and stored:
+                target_date = self.collector.today
+                self.ledger.mark_done(job.stock_code, STORED_UNIT, target_date, job.start_date,
+                                      stock_name=job.stock_name)
+                if self.ledger.is_stock_complete(job.stock_code, DATASETS, target_date, job.start_date):
+                    self.ledger.clear_staged(job.stock_code, DATASETS)
+        return result
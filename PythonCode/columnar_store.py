@@ -0,0 +1,183 @@
+import glob
+import json
+import logging
+import os
+import shutil
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = "Result/parquet"
+MANIFEST_FILE = "_stocks.json"
+DATE_COLUMN = "날짜"
+
+# 정수형으로 저장할 컬럼 (나머지 숫자 컬럼은 실수형)
+INT_COLUMNS = [
+    '시가', '고가', '저가', '종가', '거래량', '시가총액', '거래량_cap', '거래대금', '상장주식수',
+    'BPS', 'EPS', 'DPS', '기관합계', '기타법인', '개인', '외국인합계', '공매도잔고', '공매도금액'
+]
+
+
+def coerce_types(df):
+    """컬럼 타입을 고정합니다. (정수 컬럼은 결측 허용 Int64, 그 외 숫자는 float64)"""
+    df = df.copy()
+    for col in df.columns:
+        if col in INT_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors='coerce').round().astype('Int64')
+        elif df[col].dtype == object:
+            converted = pd.to_numeric(df[col], errors='coerce')
+            if converted.notna().any() or df[col].isna().all():
+                df[col] = converted.astype('float64')
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype('float64')
+    return df
+
+
+class ParquetStockStore:
+    """종목별 시계열을 stock_code/year 파티션 Parquet으로 보관하는 컬럼형 저장소
+
+    ``Result/parquet/stock_code=005930/year=2024/data.parquet`` 구조로 저장하며,
+    읽을 때 필요한 컬럼만 읽고(projection) 연도 파티션과 날짜 조건으로 범위를 좁힙니다.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR, compression="zstd"):
+        self.root = root
+        self.compression = compression
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _stock_dir(self, stock_code):
+        return os.path.join(self.root, f"stock_code={stock_code}")
+
+    def _manifest_path(self):
+        return os.path.join(self.root, MANIFEST_FILE)
+
+    def _load_manifest(self):
+        path = self._manifest_path()
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest):
+        tmp_path = f"{self._manifest_path()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self._manifest_path())
+
+    def write(self, df, stock_name, stock_code, append=False):
+        """종목 데이터를 연도별 파티션으로 저장합니다. append=True이면 기존 데이터와 날짜 기준으로 병합합니다. 실패하면 False를 반환합니다."""
+        try:
+            df = coerce_types(df)
+            df.index = pd.to_datetime(df.index)
+            df.index.name = DATE_COLUMN
+            stock_dir = self._stock_dir(stock_code)
+
+            with self._lock:
+                if not append and os.path.exists(stock_dir):
+                    shutil.rmtree(stock_dir)
+
+                for year, year_df in df.groupby(df.index.year):
+                    year_dir = os.path.join(stock_dir, f"year={year}")
+                    path = os.path.join(year_dir, "data.parquet")
+                    if append and os.path.exists(path):
+                        existing_df = pd.read_parquet(path).set_index(DATE_COLUMN)
+                        year_df = pd.concat([existing_df, year_df])
+                        year_df = year_df[~year_df.index.duplicated(keep='last')].sort_index()
+                    os.makedirs(year_dir, exist_ok=True)
+                    table = pa.Table.from_pandas(year_df.reset_index(), preserve_index=False)
+                    pq.write_table(table, path, compression=self.compression)
+
+                manifest = self._load_manifest()
+                manifest[stock_code] = stock_name
+                self._save_manifest(manifest)
+
+            logger.info(f"{stock_name} ({stock_code}) Parquet 저장 완료")
+            return stock_dir
+        except Exception as e:
+            logger.error(f"Parquet 저장 오류: {str(e)}")
+            return False
+
+    def has_stock(self, stock_code):
+        return os.path.isdir(self._stock_dir(stock_code))
+
+    def list_stocks(self):
+        """저장된 (종목명, 종목코드) 목록을 반환합니다."""
+        manifest = self._load_manifest()
+        return [(name, code) for code, name in sorted(manifest.items()) if self.has_stock(code)]
+
+    def get_name(self, stock_code):
+        """저장된 종목의 종목명을 반환합니다."""
+        return self._load_manifest().get(stock_code)
+
+    def read(self, stock_code, columns=None, start_date=None, end_date=None):
+        """종목 데이터를 날짜 인덱스 DataFrame으로 읽습니다.
+
+        columns로 필요한 컬럼만 읽고, start_date/end_date는 연도 파티션과
+        Parquet 통계로 걸러서 필요한 행 그룹만 읽습니다.
+        """
+        stock_dir = self._stock_dir(stock_code)
+        if not os.path.isdir(stock_dir):
+            return None
+
+        dataset = ds.dataset(stock_dir, format="parquet", partitioning="hive")
+        condition = None
+        if start_date is not None:
+            start = pd.Timestamp(start_date)
+            condition = (ds.field("year") >= start.year) & (ds.field(DATE_COLUMN) >= start)
+        if end_date is not None:
+            end = pd.Timestamp(end_date)
+            end_condition = (ds.field("year") <= end.year) & (ds.field(DATE_COLUMN) <= end)
+            condition = end_condition if condition is None else condition & end_condition
+
+        read_columns = None
+        if columns is not None:
+            available = set(dataset.schema.names)
+            read_columns = [DATE_COLUMN] + [col for col in columns if col in available and col != DATE_COLUMN]
+
+        table = dataset.to_table(columns=read_columns, filter=condition)
+        df = table.to_pandas()
+        if "year" in df.columns:
+            df = df.drop(columns=["year"])
+        return df.set_index(DATE_COLUMN).sort_index()
+
+
+def iter_stock_frames(store=None, csv_pattern="Result/*.csv", columns=None):
+    """저장소와 CSV 파일에서 (종목명, 종목코드, DataFrame)을 차례로 반환합니다.
+
+    같은 종목이 둘 다 있으면 Parquet 저장소를 우선합니다.
+    읽기에 실패한 종목은 로그를 남기고 건너뜁니다.
+    """
+    store = store or ParquetStockStore()
+    seen = set()
+    for stock_name, stock_code in store.list_stocks():
+        seen.add(stock_code)
+        try:
+            df = store.read(stock_code, columns=columns)
+        except Exception as e:
+            logger.error(f"Parquet 데이터 로딩 실패 ({stock_code}): {str(e)}")
+            continue
+        yield stock_name, stock_code, df
+
+    for csv_file in sorted(glob.glob(csv_pattern)):
+        parts = os.path.basename(csv_file).replace('.csv', '').split('_')
+        if len(parts) < 2 or not parts[1].isdigit() or parts[1] in seen:
+            continue
+        try:
+            df = pd.read_csv(csv_file, index_col=0, parse_dates=True)
+        except Exception as e:
+            logger.error(f"CSV 파일 로딩 실패 ({csv_file}): {str(e)}")
+            continue
+        if columns is not None:
+            df = df[[col for col in columns if col in df.columns]]
+        yield parts[0], parts[1], df
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import os
+import uuid
+
+from sqlalchemy import text
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_VERSION_DIR = os.getenv(
+    "DATA_VERSION_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "DB", "versions")
+)
+
+# 수집 데이터(수집 종목, 일별 데이터, 시계열 저장소)와 분석 결과(작전주, 패턴 분석, 의심 종목)
+COLLECTION = "collection"
+ANALYSIS = "analysis"
+SCOPES = (COLLECTION, ANALYSIS)
+
+# 여러 프로세스·호스트가 공유하는 버전 (PostgreSQL data_versions 테이블)
+# PostgreSQL에 쓰는 작업이 같은 트랜잭션에서 올리고, API 프로세스는 주기적으로 읽어 둠
+DATA_VERSION_POLL_SECONDS = float(os.getenv("DATA_VERSION_POLL_SECONDS", "2"))
+BUMP_SHARED_SQL = """
+    INSERT INTO data_versions (scope, version, updated_at) VALUES (:scope, 1, CURRENT_TIMESTAMP)
+    ON CONFLICT (scope) DO UPDATE SET version = data_versions.version + 1, updated_at = CURRENT_TIMESTAMP
+"""
+SELECT_SHARED_SQL = "SELECT scope, version FROM data_versions"
+
+
+def _check_scope(scope):
+    if scope not in SCOPES:
+        raise ValueError(f"지원하지 않는 데이터 범위입니다: {scope}")
+    return scope
+
+
+def _version_path(scope, root):
+    return os.path.join(root, _check_scope(scope))
+
+
+def bump_data_version(*scopes, root=DEFAULT_VERSION_DIR):
+    """데이터 범위의 버전을 새 값으로 바꿉니다. 쓰기 작업이 커밋된 뒤 호출합니다.
+
+    API 응답 캐시는 이 버전이 바뀌면 해당 범위의 캐시 항목을 버립니다.
+    버전 기록에 실패해도 쓰기 작업 자체는 실패시키지 않습니다.
+    """
+    try:
+        os.makedirs(root, exist_ok=True)
+        for scope in scopes:
+            path = _version_path(scope, root)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(uuid.uuid4().hex)
+            os.replace(tmp_path, path)
+    except Exception as e:
+        logger.error(f"데이터 버전 갱신 실패 ({', '.join(scopes)}): {str(e)}")
+
+
+def shared_version_bump(*scopes):
+    """PostgreSQL 쓰기 트랜잭션 안에서 실행할 공유 버전 증가 (문장, 파라미터 목록)를 반환합니다.
+
+    커밋과 함께 반영되므로 다른 호스트의 API 프로세스도 다음 폴링에서 캐시를 버립니다.
+    사용: connection.execute(*shared_version_bump(COLLECTION)), 비동기 세션은 await db.execute(...)
+    """
+    return text(BUMP_SHARED_SQL), [{"scope": _check_scope(scope)} for scope in scopes]
+
+
+class SharedDataVersions:
+    """data_versions 테이블의 범위별 버전을 주기적으로 읽어 메모리에 보관합니다.
+
+    요청마다 DB를 조회하지 않도록 API 프로세스에서 poll()을 백그라운드로 실행합니다.
+    """
+
+    def __init__(self):
+        self._versions = {}
+        self._failing = False
+
+    def get(self, scope):
+        return self._versions.get(scope, 0)
+
+    async def refresh(self, db):
+        rows = (await db.execute(text(SELECT_SHARED_SQL))).all()
+        self._versions = {scope: version for scope, version in rows}
+
+    async def poll(self, session_factory, interval=DATA_VERSION_POLL_SECONDS):
+        while True:
+            try:
+                async with session_factory() as db:
+                    await self.refresh(db)
+                self._failing = False
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 연속 실패는 한 번만 기록 (그동안은 마지막으로 읽은 버전과 유효 시간으로 만료)
+                if not self._failing:
+                    logger.error(f"공유 데이터 버전 조회 실패: {str(e)}")
+                self._failing = True
+            await asyncio.sleep(interval)
+
+
+shared_versions = SharedDataVersions()
+
+
+def get_data_version(scopes, root=DEFAULT_VERSION_DIR):
+    """데이터 범위들의 현재 버전을 하나의 문자열로 반환합니다.
+
+    범위마다 이 호스트의 버전 파일(기록된 적 없으면 '0')과 마지막으로 읽은 공유 버전을 합칩니다.
+    """
+    versions = []
+    for scope in scopes:
+        try:
+            with open(_version_path(scope, root), "r", encoding="utf-8") as f:
+                local = f.read().strip() or "0"
+        except FileNotFoundError:
+            local = "0"
+        versions.append(f"{local}.{shared_versions.get(scope)}")
+    return ":".join(versions)
@@ -1,9 +1,13 @@
 import sqlite3
+import numpy as np
 import pandas as pd
 import os
 import glob
 import logging
 from datetime import datetime
+from columnar_store import iter_stock_frames
+from bulk_loader import BulkLoader, coerce_frame, COMPLETED_STOCKS_COLUMNS, COMPLETED_STOCKS_INT_COLUMNS
+from data_version import bump_data_version, COLLECTION
 
 # 로깅 설정
 logging.basicConfig(
@@ -12,6 +16,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 이전 collectCompleteData.db(update_collectcompletedata_columns.py) 컬럼명 → 현재 컬럼명
+LEGACY_COMPLETED_STOCKS_COLUMNS = {
+    'volume_cap': 'trading_volume_cap',
+    'shares_outstanding': 'listed_shares',
+    'institutional_total': 'institution_total',
+    'other_corporate': 'other_corporation',
+}
+
+# 이전 스키마에 없을 수 있는 컬럼과 타입 (ALTER TABLE ADD COLUMN은 상수가 아닌 기본값을 받지 않음)
+COMPLETED_STOCKS_ADDED_COLUMNS = {
+    'short_balance': 'BIGINT',
+    'short_ratio': 'REAL',
+    'created_at': 'TIMESTAMP',
+    'updated_at': 'TIMESTAMP',
+}
+
 class DatabaseManager:
     """데이터베이스 관리 클래스"""
     
@@ -54,49 +74,120 @@ class DatabaseManager:
         """2. 등록 완료 테이블 생성"""
         try:
             conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS completed_stocks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    stock_name TEXT NOT NULL,
-                    stock_code TEXT NOT NULL,
-                    date DATE NOT NULL,
-                    open_price INTEGER,
-                    high_price INTEGER,
-                    low_price INTEGER,
-                    close_price INTEGER,
-                    volume BIGINT,
-                    change_rate REAL,
-                    market_cap BIGINT,
-                    trading_volume_cap BIGINT,
-                    trading_value BIGINT,
-                    listed_shares BIGINT,
-                    bps REAL,
-                    per REAL,
-                    pbr REAL,
-                    eps REAL,
-                    div REAL,
-                    dps REAL,
-                    institution_total BIGINT,
-                    other_corporation BIGINT,
-                    individual BIGINT,
-                    foreign_total BIGINT,
-                    short_balance BIGINT,
-                    short_ratio REAL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(stock_code, date)
-                )
-            ''')
-            
+            self.ensure_completed_stocks_table(conn)
             conn.commit()
             conn.close()
             logger.info("✅ 등록 완료 테이블 생성 완료")
-            
+
         except Exception as e:
             logger.error(f"❌ 등록 완료 테이블 생성 실패: {str(e)}")
-    
+
+    def ensure_completed_stocks_table(self, conn):
+        """등록 완료 테이블을 만들거나 기존 테이블을 현재 스키마로 맞춥니다 (오류는 호출한 쪽으로 전달).
+
+        - 이전 collectCompleteData.db 컬럼명(volume_cap 등)은 현재 컬럼명으로 변경
+        - 빠진 컬럼(공매도 잔고·비중 등)은 추가
+        - (stock_code, date) UNIQUE가 없으면 중복 행을 정리한 뒤 UNIQUE 인덱스 생성 (증분 upsert의 ON CONFLICT 대상)
+        """
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS completed_stocks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                stock_name TEXT NOT NULL,
+                stock_code TEXT NOT NULL,
+                date DATE NOT NULL,
+                open_price INTEGER,
+                high_price INTEGER,
+                low_price INTEGER,
+                close_price INTEGER,
+                volume BIGINT,
+                change_rate REAL,
+                market_cap BIGINT,
+                trading_volume_cap BIGINT,
+                trading_value BIGINT,
+                listed_shares BIGINT,
+                bps REAL,
+                per REAL,
+                pbr REAL,
+                eps REAL,
+                div REAL,
+                dps REAL,
+                institution_total BIGINT,
+                other_corporation BIGINT,
+                individual BIGINT,
+                foreign_total BIGINT,
+                short_balance BIGINT,
+                short_ratio REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(stock_code, date)
+            )
+        ''')
+
+        existing = {row[1] for row in cursor.execute("PRAGMA table_info(completed_stocks)").fetchall()}
+        for legacy, current in LEGACY_COMPLETED_STOCKS_COLUMNS.items():
+            if legacy in existing and current not in existing:
+                cursor.execute(f"ALTER TABLE completed_stocks RENAME COLUMN {legacy} TO {current}")
+                existing.add(current)
+        for column, column_type in COMPLETED_STOCKS_ADDED_COLUMNS.items():
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE completed_stocks ADD COLUMN {column} {column_type}")
+
+        if not self._has_unique_key(cursor, 'completed_stocks', ('stock_code', 'date')):
+            cursor.execute('''
+                DELETE FROM completed_stocks WHERE rowid NOT IN (
+                    SELECT MAX(rowid) FROM completed_stocks GROUP BY stock_code, date
+                )
+            ''')
+            cursor.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_completed_stocks_stock_code_date "
+                "ON completed_stocks (stock_code, date)"
+            )
+
+    @staticmethod
+    def _has_unique_key(cursor, table, columns):
+        """table에 columns와 같은 컬럼 구성의 UNIQUE 인덱스(제약 포함)가 있는지 확인"""
+        for index in cursor.execute(f"PRAGMA index_list({table})").fetchall():
+            if not index[2]:
+                continue
+            indexed = [row[2] for row in cursor.execute(f"PRAGMA index_info('{index[1]}')").fetchall()]
+            if tuple(indexed) == tuple(columns):
+                return True
+        return False
+
+    def save_completed_stocks(self, df, stock_name, stock_code, incremental=False):
+        """수집 DataFrame(날짜 인덱스)을 등록 완료 테이블에 저장하고 저장한 행 수를 반환합니다.
+
+        테이블이 없거나 이전 스키마이면 먼저 맞춥니다 (오류는 호출한 쪽으로 전달).
+        incremental=True이면 기존 데이터를 지우지 않고 (stock_code, date) 기준으로 upsert하고,
+        아니면 종목의 기존 데이터를 지운 뒤 삽입합니다.
+        """
+        rows = coerce_frame(
+            df, COMPLETED_STOCKS_COLUMNS, COMPLETED_STOCKS_INT_COLUMNS,
+            constants={'stock_name': stock_name, 'stock_code': stock_code}
+        )
+        # 등락률 계산 (없는 경우)
+        if '등락률' not in df.columns:
+            close = rows['close_price'].to_numpy(dtype='float64', na_value=np.nan)
+            open_ = rows['open_price'].to_numpy(dtype='float64', na_value=np.nan)
+            rows['change_rate'] = np.round((close - open_) / open_ * 100, 2)
+
+        conn = self.get_connection()
+        try:
+            self.ensure_completed_stocks_table(conn)
+            loader = BulkLoader(conn)
+            if incremental:
+                loader.load('completed_stocks', rows, upsert_keys=['stock_code', 'date'], touch_columns=['updated_at'])
+            else:
+                # 기존 데이터 삭제 (중복 방지)
+                conn.execute("DELETE FROM completed_stocks WHERE stock_code = ?", (stock_code,))
+                loader.load('completed_stocks', rows)
+            conn.commit()
+        finally:
+            conn.close()
+        return len(rows)
+
     def create_manipulation_stocks_table(self):
         """3. 작전주 테이블 생성"""
         try:
@@ -161,82 +252,37 @@ class DatabaseManager:
             
             conn.commit()
             conn.close()
+            bump_data_version(COLLECTION)
             logger.info("✅ 수집 종목 테이블 업데이트 완료")
             
         except Exception as e:
             logger.error(f"❌ 수집 종목 테이블 업데이트 실패: {str(e)}")
     
     def insert_completed_stocks_from_csv(self):
-        """CSV 파일들의 데이터를 등록 완료 테이블에 삽입"""
+        """수집 결과(Parquet 저장소 및 CSV 파일)의 데이터를 등록 완료 테이블에 삽입"""
         try:
-            csv_files = glob.glob("Result/*.csv")
-            
-            if not csv_files:
-                logger.warning("Result 폴더에 CSV 파일이 없습니다.")
-                return
-            
             conn = self.get_connection()
+            loader = BulkLoader(conn)
+            stock_count = 0
             
-            for csv_file in csv_files:
-                # 파일명에서 종목 정보 추출
-                basename = os.path.basename(csv_file)
-                name_without_ext = basename.replace('.csv', '')
-                parts = name_without_ext.split('_')
+            for stock_name, stock_code, df in iter_stock_frames():
+                stock_count += 1
+                logger.info(f"📊 {stock_name} ({stock_code}) 데이터 처리 중...")
+                
+                # 컬럼 단위 타입 변환 후 일괄 삽입
+                rows = coerce_frame(
+                    df, COMPLETED_STOCKS_COLUMNS, COMPLETED_STOCKS_INT_COLUMNS,
+                    constants={'stock_name': stock_name, 'stock_code': stock_code}
+                )
+                loader.load('completed_stocks', rows)
+                conn.commit()
+                logger.info(f"✅ {stock_name} 데이터 {len(rows)}건 삽입 완료")
                 
-                if len(parts) >= 2:
-                    stock_name = parts[0]
-                    stock_code = parts[1]
-                    
-                    logger.info(f"📊 {stock_name} ({stock_code}) 데이터 처리 중...")
-                    
-                    # CSV 파일 읽기
-                    df = pd.read_csv(csv_file, index_col=0, parse_dates=True)
-                    
-                    # 데이터 전처리 및 컬럼 매핑
-                    processed_data = []
-                    
-                    for date, row in df.iterrows():
-                        # 날짜 형식 변환
-                        date_str = date.strftime('%Y-%m-%d') if hasattr(date, 'strftime') else str(date)
-                        
-                        # 데이터 매핑 (None 값 처리)
-                        data_row = {
-                            'stock_name': stock_name,
-                            'stock_code': stock_code,
-                            'date': date_str,
-                            'open_price': self.safe_int(row.get('시가')),
-                            'high_price': self.safe_int(row.get('고가')),
-                            'low_price': self.safe_int(row.get('저가')),
-                            'close_price': self.safe_int(row.get('종가')),
-                            'volume': self.safe_int(row.get('거래량')),
-                            'change_rate': self.safe_float(row.get('등락률')),
-                            'market_cap': self.safe_int(row.get('시가총액')),
-                            'trading_volume_cap': self.safe_int(row.get('거래량_cap')),
-                            'trading_value': self.safe_int(row.get('거래대금')),
-                            'listed_shares': self.safe_int(row.get('상장주식수')),
-                            'bps': self.safe_float(row.get('BPS')),
-                            'per': self.safe_float(row.get('PER')),
-                            'pbr': self.safe_float(row.get('PBR')),
-                            'eps': self.safe_float(row.get('EPS')),
-                            'div': self.safe_float(row.get('DIV')),
-                            'dps': self.safe_float(row.get('DPS')),
-                            'institution_total': self.safe_int(row.get('기관합계')),
-                            'other_corporation': self.safe_int(row.get('기타법인')),
-                            'individual': self.safe_int(row.get('개인')),
-                            'foreign_total': self.safe_int(row.get('외국인합계')),
-                            'short_balance': self.safe_int(row.get('공매도잔고')),
-                            'short_ratio': self.safe_float(row.get('비중'))
-                        }
-                        
-                        processed_data.append(data_row)
-                    
-                    # 배치 삽입
-                    if processed_data:
-                        df_to_insert = pd.DataFrame(processed_data)
-                        df_to_insert.to_sql('completed_stocks', conn, if_exists='append', index=False, method='multi')
-                        logger.info(f"✅ {stock_name} 데이터 {len(processed_data)}건 삽입 완료")
-                    
             conn.close()
+            if not stock_count:
+                logger.warning("Result 폴더에 수집 데이터가 없습니다.")
+                return
+            bump_data_version(COLLECTION)
             logger.info("✅ 등록 완료 테이블 업데이트 완료")
             
         except Exception as e:
@@ -0,0 +1,200 @@
+import logging
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "DB")
+DEFAULT_LEDGER_PATH = os.path.join(DB_DIR, "collection_ledger.db")
+DEFAULT_STAGING_DIR = os.path.join(DB_DIR, "collection_staging")
+
+# 종목의 모든 데이터셋이 병합·저장까지 끝났음을 기록하는 단위
+STORED_UNIT = "_stored"
+# 파이프라인 이름을 주지 않았을 때의 기본값
+DEFAULT_PIPELINE = "stock_scrap"
+
+
+class CollectionLedger:
+    """(파이프라인, 종목, 데이터셋) 단위 수집 작업 원장
+
+    작업 단위마다 상태(pending/running/done/failed), 시도 횟수, 마지막 오류,
+    마지막 수집일을 SQLite에 기록합니다. 완료된 데이터셋은 staging 파일로 보관하여
+    재시작 시 미완료 단위만 다시 수집하고 나머지는 파일에서 불러옵니다.
+    작업은 수집 기준일(target_date)과 수집 시작일(start_date)이 모두 같을 때만 같은 실행으로 봅니다.
+    (증분 수집의 일부 구간이 같은 날 전체 수집에 재사용되지 않도록)
+    pipeline: 원장을 공유하는 수집 파이프라인 이름 (stock_scrap, manipulation_stock_db 등)
+    """
+
+    def __init__(self, db_path=DEFAULT_LEDGER_PATH, staging_dir=DEFAULT_STAGING_DIR, pipeline=DEFAULT_PIPELINE):
+        self.db_path = db_path
+        self.pipeline = pipeline
+        self.staging_dir = staging_dir
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self.init_database()
+
+    def get_connection(self):
+        """원장 DB 연결 반환"""
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_database(self):
+        """원장 테이블 생성"""
+        conn = self.get_connection()
+        # 파이프라인·시작일 구분 이전의 원장은 재시작용 기록일 뿐이므로 새로 만듦
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(collection_jobs)")}
+        if columns and 'pipeline' not in columns:
+            conn.execute("DROP TABLE collection_jobs")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS collection_jobs (
+                pipeline TEXT NOT NULL,
+                stock_code TEXT NOT NULL,
+                dataset TEXT NOT NULL,
+                target_date TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                stock_name TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                last_collected_date TEXT,
+                staged_path TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (pipeline, stock_code, dataset)
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_collection_jobs_status ON collection_jobs (pipeline, target_date, status)")
+        conn.commit()
+        conn.close()
+
+    def _execute(self, query, params=()):
+        with self._lock:
+            conn = self.get_connection()
+            try:
+                cursor = conn.execute(query, params)
+                rows = cursor.fetchall()
+                conn.commit()
+                return rows
+            finally:
+                conn.close()
+
+    def get_unit(self, stock_code, dataset, target_date, start_date):
+        """작업 단위 상태를 dict로 반환합니다. 다른 기준일·시작일의 기록은 없는 것으로 봅니다."""
+        rows = self._execute('''
+            SELECT status, attempts, last_error, last_collected_date, staged_path
+            FROM collection_jobs
+            WHERE pipeline = ? AND stock_code = ? AND dataset = ? AND target_date = ? AND start_date = ?
+        ''', (self.pipeline, stock_code, dataset, target_date, start_date))
+        if not rows:
+            return None
+        status, attempts, last_error, last_collected_date, staged_path = rows[0]
+        return {
+            'status': status,
+            'attempts': attempts,
+            'last_error': last_error,
+            'last_collected_date': last_collected_date,
+            'staged_path': staged_path,
+        }
+
+    def is_done(self, stock_code, dataset, target_date, start_date):
+        unit = self.get_unit(stock_code, dataset, target_date, start_date)
+        return unit is not None and unit['status'] == 'done'
+
+    def _upsert(self, stock_code, dataset, target_date, start_date, stock_name, status, error=None,
+                last_collected_date=None, staged_path=None, count_attempt=False):
+        # 기준일이나 시작일이 바뀌면 시도 횟수와 이전 기록을 초기화
+        self._execute(f'''
+            INSERT INTO collection_jobs
+            (pipeline, stock_code, dataset, target_date, start_date, stock_name, status, attempts, last_error,
+             last_collected_date, staged_path, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(pipeline, stock_code, dataset) DO UPDATE SET
+                attempts = CASE WHEN collection_jobs.target_date = excluded.target_date
+                                 AND collection_jobs.start_date = excluded.start_date
+                                THEN collection_jobs.attempts ELSE 0 END + {1 if count_attempt else 0},
+                target_date = excluded.target_date,
+                start_date = excluded.start_date,
+                stock_name = excluded.stock_name,
+                status = excluded.status,
+                last_error = excluded.last_error,
+                last_collected_date = COALESCE(excluded.last_collected_date, collection_jobs.last_collected_date),
+                staged_path = excluded.staged_path,
+                updated_at = CURRENT_TIMESTAMP
+        ''', (self.pipeline, stock_code, dataset, target_date, start_date, stock_name, status,
+              1 if count_attempt else 0, error, last_collected_date, staged_path))
+
+    def mark_running(self, stock_code, dataset, target_date, start_date, stock_name=None):
+        self._upsert(stock_code, dataset, target_date, start_date, stock_name, 'running', count_attempt=True)
+
+    def mark_failed(self, stock_code, dataset, target_date, start_date, error, stock_name=None):
+        self._upsert(stock_code, dataset, target_date, start_date, stock_name, 'failed', error=str(error)[:1000])
+
+    def mark_done(self, stock_code, dataset, target_date, start_date, df=None, stock_name=None):
+        """완료로 기록하고 수집 결과를 staging 파일로 보관합니다."""
+        staged_path = None
+        last_collected_date = None
+        if df is not None:
+            staged_path = self.stage_frame(stock_code, dataset, df)
+            if len(df.index) > 0 and hasattr(df.index.max(), 'strftime'):
+                last_collected_date = df.index.max().strftime('%Y-%m-%d')
+        self._upsert(stock_code, dataset, target_date, start_date, stock_name, 'done',
+                     last_collected_date=last_collected_date, staged_path=staged_path)
+
+    def _staged_path(self, stock_code, dataset):
+        return os.path.join(self.staging_dir, f"{self.pipeline}_{stock_code}_{dataset}.pkl")
+
+    def stage_frame(self, stock_code, dataset, df):
+        path = self._staged_path(stock_code, dataset)
+        df.to_pickle(path)
+        return path
+
+    def load_staged(self, stock_code, dataset, target_date, start_date):
+        """완료된 단위의 staging 데이터를 불러옵니다. 없으면 None을 반환합니다."""
+        unit = self.get_unit(stock_code, dataset, target_date, start_date)
+        if not unit or unit['status'] != 'done' or not unit['staged_path']:
+            return None
+        try:
+            return pd.read_pickle(unit['staged_path'])
+        except Exception as e:
+            logger.warning(f"staging 데이터 로딩 실패 ({unit['staged_path']}): {str(e)}")
+            return None
+
+    def is_stock_complete(self, stock_code, datasets, target_date, start_date):
+        """같은 실행에서 모든 데이터셋과 저장 단위가 완료되었으면 True를 반환합니다."""
+        rows = self._execute('''
+            SELECT dataset FROM collection_jobs
+            WHERE pipeline = ? AND stock_code = ? AND target_date = ? AND start_date = ? AND status = 'done'
+        ''', (self.pipeline, stock_code, target_date, start_date))
+        done = {row[0] for row in rows}
+        return STORED_UNIT in done and all(dataset in done for dataset in datasets)
+
+    def clear_staged(self, stock_code, datasets):
+        """저장이 끝난 종목의 staging 파일을 삭제합니다."""
+        for dataset in datasets:
+            path = self._staged_path(stock_code, dataset)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def reset(self, target_date=None):
+        """이 파이프라인의 원장 기록을 삭제합니다. target_date가 주어지면 해당 기준일만 삭제합니다."""
+        if target_date:
+            self._execute("DELETE FROM collection_jobs WHERE pipeline = ? AND target_date = ?",
+                          (self.pipeline, target_date))
+        else:
+            self._execute("DELETE FROM collection_jobs WHERE pipeline = ?", (self.pipeline,))
+
+    def summary(self, target_date):
+        """기준일의 상태별 작업 단위 수를 반환합니다."""
+        rows = self._execute('''
+            SELECT status, COUNT(*) FROM collection_jobs
+            WHERE pipeline = ? AND target_date = ? AND dataset != ?
+            GROUP BY status
+        ''', (self.pipeline, target_date, STORED_UNIT))
+        return dict(rows)
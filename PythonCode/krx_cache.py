@@ -0,0 +1,228 @@
+import functools
+import gzip
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "DB", "krx_cache")
+# 오늘 이후 날짜가 포함된 호출(장중 변동 가능)의 유효 시간(초)
+DEFAULT_TTL = 60 * 60
+CACHE_MODES = ("off", "readwrite", "replay")
+# 기록한 날짜를 남기는 파일 (replay 모드에서 수집 기준일로 사용)
+MANIFEST_FILE = "manifest.json"
+
+_DATE_PATTERN = re.compile(r"^\d{8}$")
+
+
+class CacheMissError(Exception):
+    """replay 모드에서 캐시에 없는 호출이 발생했을 때의 예외"""
+
+
+def _is_date(value):
+    return isinstance(value, str) and bool(_DATE_PATTERN.match(value))
+
+
+def _previous_day(yyyymmdd):
+    return (datetime.strptime(yyyymmdd, "%Y%m%d") - timedelta(days=1)).strftime("%Y%m%d")
+
+
+def _concat_frames(past, live):
+    """과거 구간과 오늘 이후 구간의 일자별 DataFrame을 이어 붙입니다. (겹치는 날짜는 최신 값)"""
+    import pandas as pd
+
+    if past is None or len(past) == 0:
+        return live
+    if live is None or len(live) == 0:
+        return past
+    merged = pd.concat([past, live])
+    return merged[~merged.index.duplicated(keep="last")]
+
+
+def _normalize_arg(value):
+    """캐시 키 생성을 위해 인자를 문자열로 정규화합니다."""
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y%m%d")
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y%m%d")
+    return value
+
+
+class CachedDataSource:
+    """데이터 소스(pykrx stock 모듈 등) 호출 결과를 디스크에 캐시하는 래퍼
+
+    - 키: 함수명 + 인자 해시
+    - 저장: gzip 압축 pickle (DataFrame을 그대로 바이너리로 보관)
+    - 유효 기간: 날짜 인자가 모두 기준일 이전이면 변하지 않는 과거 데이터로 보고 만료 없음,
+      그 외에는 ttl초 후 만료
+    - 기간 조회(*_by_date, fromdate~todate)가 기준일을 포함하면 어제까지의 과거 구간(만료 없음)과
+      기준일 이후 구간(ttl)으로 나누어 캐시하고 이어 붙임 (만료 후에는 오늘 구간만 다시 조회)
+    - 기준일(as_of): 평소에는 오늘, replay 모드에서는 기록한 날(manifest.json)이므로
+      수집기가 as_of로 기간을 정하면 다른 날에 재실행해도 같은 키로 조회됨
+    - replay 모드: 네트워크를 호출하지 않고 캐시에 없으면 CacheMissError 발생
+    """
+
+    def __init__(self, source, cache_dir=DEFAULT_CACHE_DIR, mode="readwrite", ttl=DEFAULT_TTL):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"지원하지 않는 캐시 모드입니다: {mode}")
+        self.source = source
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        self._manifest_written = False
+        self.as_of = self._recorded_on() if mode == "replay" else None
+        self.as_of = self.as_of or datetime.now().strftime("%Y%m%d")
+
+    def _recorded_on(self):
+        try:
+            with open(os.path.join(self.cache_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+                return json.load(f).get("recorded_on")
+        except (OSError, ValueError):
+            logger.warning("캐시 기록일을 알 수 없어 오늘을 기준일로 재실행합니다.")
+            return None
+
+    def _record_manifest(self):
+        if self._manifest_written:
+            return
+        self._manifest_written = True
+        try:
+            self._atomic_write(
+                os.path.join(self.cache_dir, MANIFEST_FILE),
+                lambda f: f.write(json.dumps({"recorded_on": self.as_of}).encode("utf-8"))
+            )
+        except Exception as e:
+            logger.warning(f"캐시 기록일 저장 실패: {str(e)}")
+
+    def _count(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def __getattr__(self, name):
+        attr = getattr(self.source, name)
+        if not callable(attr) or self.mode == "off":
+            return attr
+
+        @functools.wraps(attr)
+        def wrapper(*args, **kwargs):
+            return self.call(name, attr, *args, **kwargs)
+
+        return wrapper
+
+    def make_key(self, name, args, kwargs):
+        """함수명과 인자로 캐시 키를 만듭니다."""
+        payload = json.dumps(
+            [name, [_normalize_arg(arg) for arg in args],
+             {key: _normalize_arg(value) for key, value in sorted(kwargs.items())}],
+            ensure_ascii=False, default=str
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def is_immutable(self, args, kwargs):
+        """날짜 인자가 있고 모두 기준일 이전이면 True를 반환합니다."""
+        dates = [
+            value for value in (_normalize_arg(v) for v in list(args) + list(kwargs.values()))
+            if _is_date(value)
+        ]
+        return bool(dates) and max(dates) < self.as_of
+
+    def _split_range(self, name, kwargs):
+        """기준일을 포함하는 일자별 기간 조회면 (과거 구간 인자, 기준일 이후 구간 인자)를 반환합니다."""
+        if not name.endswith("_by_date"):
+            return None
+        fromdate, todate = _normalize_arg(kwargs.get("fromdate")), _normalize_arg(kwargs.get("todate"))
+        if not (_is_date(fromdate) and _is_date(todate)) or todate < self.as_of or fromdate >= self.as_of:
+            return None
+        past = {**kwargs, "fromdate": fromdate, "todate": _previous_day(self.as_of)}
+        live = {**kwargs, "fromdate": self.as_of, "todate": todate}
+        return past, live
+
+    def _path(self, name, key):
+        return os.path.join(self.cache_dir, name, f"{key}.pkl.gz")
+
+    def _read(self, path):
+        with gzip.open(path, "rb") as f:
+            return pickle.load(f)
+
+    def _atomic_write(self, path, write):
+        """임시 파일에 쓴 뒤 교체합니다. (같은 키를 동시에 쓰는 스레드·프로세스마다 다른 임시 파일)"""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _write(self, path, value):
+        def write(f):
+            with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6) as gz:
+                pickle.dump(value, gz, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._atomic_write(path, write)
+        self._record_manifest()
+
+    def call(self, name, func, *args, **kwargs):
+        """캐시를 확인한 뒤 필요할 때만 실제 함수를 호출합니다."""
+        split = None if args else self._split_range(name, kwargs)
+        if split is not None:
+            past_kwargs, live_kwargs = split
+            past = self._call(name, func, (), past_kwargs)
+            try:
+                live = self._call(name, func, (), live_kwargs)
+            except CacheMissError:
+                raise
+            except Exception as e:
+                # 휴장일 등으로 기준일 구간만 조회할 수 없으면 나누지 않고 전체 기간을 조회
+                logger.warning(f"{name} 기준일 구간 조회 실패, 전체 기간으로 조회합니다: {str(e)}")
+                return self._call(name, func, (), kwargs)
+            return _concat_frames(past, live)
+        return self._call(name, func, args, kwargs)
+
+    def _call(self, name, func, args, kwargs):
+        path = self._path(name, self.make_key(name, args, kwargs))
+
+        if os.path.exists(path):
+            fresh = self.is_immutable(args, kwargs) or time.time() - os.path.getmtime(path) < self.ttl
+            if fresh or self.mode == "replay":
+                try:
+                    value = self._read(path)
+                    self._count(hit=True)
+                    return value
+                except Exception as e:
+                    logger.warning(f"캐시 파일 손상, 다시 조회합니다 ({path}): {str(e)}")
+
+        self._count(hit=False)
+        if self.mode == "replay":
+            raise CacheMissError(f"캐시에 없는 호출입니다: {name}{args}{kwargs}")
+
+        value = func(*args, **kwargs)
+        try:
+            self._write(path, value)
+        except Exception as e:
+            logger.warning(f"캐시 저장 실패 ({path}): {str(e)}")
+        return value
@@ -3,6 +3,10 @@ import sqlite3
 from datetime import datetime, timedelta
 import logging
 from stock_scrap import StockDataCollector
+from pattern_analyzer import StockPatternAnalyzer
+from collection_engine import CollectionEngine
+from job_ledger import CollectionLedger
+from bulk_loader import BulkLoader, coerce_frame, DAILY_DATA_COLUMNS
 import json
 import os
 import numpy as np
@@ -18,6 +22,9 @@ class ManipulationStockDB:
     def __init__(self, db_path="manipulation_stocks.db"):
         self.db_path = db_path
         self.collector = StockDataCollector()
+        self.analyzer = StockPatternAnalyzer()
+        # 수집 결과를 이 DB에 저장하므로 stock_scrap.py와 원장 기록을 나눔
+        self.ledger = CollectionLedger(pipeline="manipulation_stock_db")
         self.init_database()
         
     def init_database(self):
@@ -234,7 +241,10 @@ class ManipulationStockDB:
             return 0
 
     def collect_manipulation_stock_data(self, years=3):
-        """등록된 작전주들의 과거 데이터를 수집합니다."""
+        """등록된 작전주들의 과거 데이터를 수집합니다.
+
+        수집 원장을 사용하므로 중간에 중단되어도 다시 실행하면 끝나지 않은 종목만 수집합니다.
+        """
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
@@ -242,39 +252,41 @@ class ManipulationStockDB:
             # 등록된 작전주 목록 조회
             cursor.execute("SELECT stock_name, stock_code FROM manipulation_stocks WHERE stock_code IS NOT NULL")
             stocks = cursor.fetchall()
+            conn.close()
             
             collected_stocks = []
             
-            for stock_name, stock_code in stocks:
-                logger.info(f"📊 {stock_name} 데이터 수집 중...")
+            def save_and_analyze(df, stock_name, stock_code):
+                # 패턴 분석
+                patterns = self.analyzer.analyze_manipulation_patterns(df, stock_name)
+                warnings, risk_level, risk_score = self.analyzer.detect_suspicious_patterns(patterns, stock_name)
                 
-                # 종합 데이터 수집
-                df = self.collector.collect_comprehensive_data(stock_name, years=years)
+                # 일별 데이터 저장
+                saved = self.save_daily_data_to_db(stock_code, df)
                 
-                if df is not None:
-                    # 패턴 분석
-                    patterns = self.collector.analyze_manipulation_patterns(df, stock_name)
-                    warnings, risk_level, risk_score = self.collector.detect_suspicious_patterns(patterns, stock_name)
-                    
-                    # 일별 데이터 저장
-                    self.save_daily_data_to_db(stock_code, df)
-                    
-                    # 패턴 분석 결과 저장
-                    self.save_pattern_analysis(stock_code, patterns, warnings, risk_level, risk_score)
-                    
-                    collected_stocks.append({
-                        'stock_name': stock_name,
-                        'stock_code': stock_code,
-                        'data_count': len(df),
-                        'risk_level': risk_level,
-                        'risk_score': risk_score
-                    })
-                    
-                    logger.info(f"✅ {stock_name} 수집 완료 - 위험도: {risk_level}")
-                else:
-                    logger.warning(f"❌ {stock_name} 데이터 수집 실패")
+                # 패턴 분석 결과 저장
+                saved = self.save_pattern_analysis(stock_code, patterns, warnings, risk_level, risk_score) and saved
+                if not saved:
+                    # 원장에 완료로 남기지 않아 다음 실행에서 다시 수집
+                    return False
+                
+                collected_stocks.append({
+                    'stock_name': stock_name,
+                    'stock_code': stock_code,
+                    'data_count': len(df),
+                    'risk_level': risk_level,
+                    'risk_score': risk_score
+                })
+                
+                logger.info(f"✅ {stock_name} 수집 완료 - 위험도: {risk_level}")
+            
+            engine = CollectionEngine(self.collector, sinks=[save_and_analyze], ledger=self.ledger)
+            results = engine.run(stocks, years=years)
+            
+            for result in results:
+                if not result['success']:
+                    logger.warning(f"❌ {result['stock_name']} 데이터 수집 실패")
             
-            conn.close()
             return collected_stocks
             
         except Exception as e:
@@ -285,32 +297,18 @@ class ManipulationStockDB:
         """일별 데이터를 DB에 저장합니다."""
         try:
             conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
             
-            for date, row in df.iterrows():
-                cursor.execute('''
-                    INSERT OR REPLACE INTO stock_daily_data 
-                    (stock_code, date, open_price, high_price, low_price, close_price, 
-                     volume, change_rate, market_cap, trading_value)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    stock_code,
-                    date.strftime('%Y-%m-%d'),
-                    row.get('시가'),
-                    row.get('고가'),
-                    row.get('저가'),
-                    row.get('종가'),
-                    row.get('거래량'),
-                    row.get('등락률'),
-                    row.get('시가총액'),
-                    row.get('거래대금')
-                ))
+            # 같은 (종목, 날짜)는 갱신
+            rows = coerce_frame(df, DAILY_DATA_COLUMNS, {'volume'}, constants={'stock_code': stock_code})
+            BulkLoader(conn).load('stock_daily_data', rows, upsert_keys=['stock_code', 'date'])
             
             conn.commit()
             conn.close()
+            return True
             
         except Exception as e:
             logger.error(f"일별 데이터 저장 오류: {str(e)}")
+            return False
 
     def convert_numpy_types(self, obj):
         """numpy 타입을 JSON 직렬화 가능한 타입으로 변환합니다."""
@@ -354,9 +352,11 @@ class ManipulationStockDB:
             
             conn.commit()
             conn.close()
+            return True
             
         except Exception as e:
             logger.error(f"패턴 분석 저장 오류: {str(e)}")
+            return False
 
     def get_manipulation_stocks_summary(self):
         """작전주 DB 요약 정보를 반환합니다."""
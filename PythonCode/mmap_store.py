@@ -0,0 +1,306 @@
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SERIES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "DB", "series")
+META_FILE = "meta.json"
+DATE_FIELD = "date"
+INITIAL_CAPACITY = 1024
+
+# 필드명(API 컬럼명) → 수집 데이터 컬럼명. 날짜 외 모든 필드는 결측을 NaN으로 두기 위해 float64로 저장
+FIELDS = {
+    'open_price': '시가',
+    'high_price': '고가',
+    'low_price': '저가',
+    'close_price': '종가',
+    'volume': '거래량',
+    'change_rate': '등락률',
+    'market_cap': '시가총액',
+    'trading_value': '거래대금',
+    'institution_total': '기관합계',
+    'other_corporation': '기타법인',
+    'individual': '개인',
+    'foreign_total': '외국인합계',
+    'short_balance': '공매도잔고',
+    'short_ratio': '비중',
+}
+# 응답에서 정수로 돌려줄 필드
+INT_FIELDS = {'volume'}
+
+
+def to_day(value):
+    """날짜(YYYY-MM-DD / YYYYMMDD 문자열, date, datetime)를 datetime64[D]로 변환합니다.
+
+    조회 경로에서 pandas를 불러오지 않도록 NumPy만 사용합니다.
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        if len(value) == 8 and value.isdigit():
+            value = f"{value[:4]}-{value[4:6]}-{value[6:]}"
+        return np.datetime64(value[:10], 'D')
+    return np.datetime64(value, 'D')
+
+
+class MmapSeriesStore:
+    """종목별 일봉 시계열을 필드별 고정폭 NumPy 배열 파일로 보관하는 메모리 맵 저장소
+
+    ``DB/series/005930/date.bin, close_price.bin, ... , meta.json`` 구조이며
+    배열은 날짜순으로 뒤에만 추가됩니다(용량이 차면 두 배로 확장).
+    meta.json의 length가 유효한 행 수이므로 데이터를 먼저 쓰고 length를 마지막에 갱신합니다.
+    범위 조회는 날짜 배열의 이진 탐색으로 오프셋을 구해 복사 없이 슬라이스를 반환합니다.
+    """
+
+    def __init__(self, root=DEFAULT_SERIES_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        # 종목코드 → (meta mtime, meta, {필드: 읽기 전용 memmap})
+        self._readers = {}
+
+    def _stock_dir(self, stock_code):
+        return os.path.join(self.root, stock_code)
+
+    def _field_path(self, stock_code, field):
+        return os.path.join(self._stock_dir(stock_code), f"{field}.bin")
+
+    def _meta_path(self, stock_code):
+        return os.path.join(self._stock_dir(stock_code), META_FILE)
+
+    def _dtype(self, field):
+        return np.dtype('datetime64[D]') if field == DATE_FIELD else np.dtype('float64')
+
+    def _load_meta(self, stock_code):
+        path = self._meta_path(stock_code)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_meta(self, stock_code, meta):
+        path = self._meta_path(stock_code)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def has_stock(self, stock_code):
+        return os.path.exists(self._meta_path(stock_code))
+
+    def _to_arrays(self, df):
+        """수집 DataFrame(날짜 인덱스)을 필드별 배열로 변환합니다."""
+        import pandas as pd
+
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+        arrays = {DATE_FIELD: pd.to_datetime(df.index).values.astype('datetime64[D]')}
+        for field, column in FIELDS.items():
+            if column in df.columns:
+                arrays[field] = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+            else:
+                arrays[field] = np.full(len(df), np.nan)
+        return arrays
+
+    def _write_files(self, stock_code, arrays, length, capacity):
+        """필드별 배열을 capacity 크기 파일로 새로 씁니다. 기존 reader는 이전 파일을 계속 봅니다."""
+        for field, values in arrays.items():
+            path = self._field_path(stock_code, field)
+            tmp_path = f"{path}.tmp"
+            data = np.zeros(capacity, dtype=self._dtype(field))
+            data[:length] = values[:length]
+            data.tofile(tmp_path)
+            os.replace(tmp_path, path)
+
+    def _grow(self, stock_code, capacity):
+        """파일 크기를 capacity 행으로 늘립니다."""
+        for field in [DATE_FIELD] + list(FIELDS):
+            with open(self._field_path(stock_code, field), "r+b") as f:
+                f.truncate(capacity * self._dtype(field).itemsize)
+
+    def write(self, df, stock_name, stock_code, append=False):
+        """종목 시계열을 저장합니다. append=True이면 마지막 날짜 이후 행만 뒤에 추가합니다. 실패하면 False를 반환합니다.
+
+        수집 sink(df, stock_name, stock_code)로 바로 사용할 수 있습니다.
+        """
+        try:
+            arrays = self._to_arrays(df)
+            count = len(arrays[DATE_FIELD])
+            with self._lock:
+                os.makedirs(self._stock_dir(stock_code), exist_ok=True)
+                meta = self._load_meta(stock_code) if append else None
+
+                if meta is None:
+                    capacity = max(INITIAL_CAPACITY, 1 << max(count - 1, 0).bit_length())
+                    self._write_files(stock_code, arrays, count, capacity)
+                    meta = {'stock_name': stock_name, 'length': count, 'capacity': capacity}
+                    self._save_meta(stock_code, meta)
+                else:
+                    self._append(stock_code, meta, arrays)
+
+            logger.info(f"{stock_name} ({stock_code}) 시계열 저장 완료")
+            return self._stock_dir(stock_code)
+        except Exception as e:
+            logger.error(f"시계열 저장 오류: {str(e)}")
+            return False
+
+    def _append(self, stock_code, meta, arrays):
+        length = meta['length']
+        dates = np.memmap(self._field_path(stock_code, DATE_FIELD), dtype=self._dtype(DATE_FIELD),
+                          mode='r', shape=(meta['capacity'],))[:length]
+        last_date = dates[-1] if length else None
+        new_dates = arrays[DATE_FIELD]
+
+        # 기존 구간의 날짜는 같은 오프셋에 덮어쓰고, 기존에 없던 과거 날짜가 있으면 전체를 다시 씀
+        overlap = new_dates <= last_date if last_date is not None else np.zeros(len(new_dates), dtype=bool)
+        offsets = np.searchsorted(dates, new_dates[overlap])
+        if overlap.any() and not np.array_equal(dates[np.minimum(offsets, length - 1)], new_dates[overlap]):
+            merged = {field: np.concatenate([
+                np.memmap(self._field_path(stock_code, field), dtype=self._dtype(field),
+                          mode='r', shape=(meta['capacity'],))[:length],
+                values
+            ]) for field, values in arrays.items()}
+            import pandas as pd
+
+            order = pd.Index(merged[DATE_FIELD])
+            keep = ~order.duplicated(keep='last')
+            sort = np.argsort(merged[DATE_FIELD][keep], kind='stable')
+            merged = {field: values[keep][sort] for field, values in merged.items()}
+            total = len(merged[DATE_FIELD])
+            capacity = max(meta['capacity'], 1 << max(total - 1, 0).bit_length())
+            self._write_files(stock_code, merged, total, capacity)
+            meta.update(length=total, capacity=capacity)
+            self._save_meta(stock_code, meta)
+            return
+
+        total = length + int((~overlap).sum())
+        if total > meta['capacity']:
+            meta['capacity'] = max(meta['capacity'] * 2, 1 << (total - 1).bit_length())
+            self._grow(stock_code, meta['capacity'])
+
+        for field, values in arrays.items():
+            data = np.memmap(self._field_path(stock_code, field), dtype=self._dtype(field),
+                             mode='r+', shape=(meta['capacity'],))
+            data[offsets] = values[overlap]
+            data[length:total] = values[~overlap]
+            data.flush()
+            del data
+
+        meta['length'] = total
+        self._save_meta(stock_code, meta)
+
+    def _get_reader(self, stock_code):
+        """읽기 전용 memmap을 캐시합니다. meta.json이 바뀌면 다시 엽니다."""
+        meta_path = self._meta_path(stock_code)
+        try:
+            mtime = os.stat(meta_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        cached = self._readers.get(stock_code)
+        if cached and cached[0] == mtime:
+            return cached[1], cached[2]
+
+        meta = self._load_meta(stock_code)
+        maps = {
+            field: np.memmap(self._field_path(stock_code, field), dtype=self._dtype(field),
+                             mode='r', shape=(meta['capacity'],))
+            for field in [DATE_FIELD] + list(FIELDS)
+        }
+        self._readers[stock_code] = (mtime, meta, maps)
+        return meta, maps
+
+    def read(self, stock_code, start_date=None, end_date=None, fields=None):
+        """기간 내 시계열을 {필드: 배열} dict로 반환합니다. 배열은 memmap의 슬라이스(복사 없음)입니다.
+
+        저장된 종목이 아니면 None을 반환합니다.
+        """
+        reader = self._get_reader(stock_code)
+        if reader is None:
+            return None
+        meta, maps = reader
+        dates = maps[DATE_FIELD][:meta['length']]
+
+        start = 0 if start_date is None else int(np.searchsorted(dates, to_day(start_date), side='left'))
+        end = len(dates) if end_date is None else int(np.searchsorted(dates, to_day(end_date), side='right'))
+
+        series = {DATE_FIELD: dates[start:end]}
+        for field in (fields or FIELDS):
+            series[field] = maps[field][start:end]
+        return series
+
+    def get_name(self, stock_code):
+        reader = self._get_reader(stock_code)
+        return reader[0].get('stock_name') if reader else None
+
+    def read_frame(self, stock_code, start_date=None, end_date=None, columns=None):
+        """분석기용으로 수집 데이터와 같은 컬럼명(날짜 인덱스)의 DataFrame을 반환합니다."""
+        fields = [field for field, column in FIELDS.items() if columns is None or column in columns]
+        series = self.read(stock_code, start_date, end_date, fields=fields)
+        if series is None:
+            return None
+        import pandas as pd
+
+        index = pd.DatetimeIndex(series[DATE_FIELD].astype('datetime64[ns]'), name='날짜')
+        return pd.DataFrame({FIELDS[field]: series[field] for field in fields}, index=index)
+
+
+def to_columns(series):
+    """read() 결과를 필드별 값 목록 dict로 변환합니다. (날짜는 YYYY-MM-DD 문자열, NaN → None)"""
+    if not series:
+        return {}
+    columns = {DATE_FIELD: np.datetime_as_string(series[DATE_FIELD], unit='D').tolist()}
+    for field, values in series.items():
+        if field == DATE_FIELD:
+            continue
+        column = values.astype(object)
+        missing = np.isnan(values)
+        if field in INT_FIELDS:
+            column[~missing] = values[~missing].astype('int64')
+        column[missing] = None
+        columns[field] = column.tolist()
+    return columns
+
+
+def to_records(series):
+    """read() 결과를 API 응답용 dict 목록으로 변환합니다. (NaN → None)"""
+    columns = to_columns(series)
+    if not columns:
+        return []
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_series_store():
+    """프로세스 전역 시계열 저장소를 반환합니다."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = MmapSeriesStore()
+        return _default_store
+
+
+def main():
+    """Parquet 저장소와 CSV 파일로부터 시계열 저장소를 다시 만듭니다."""
+    from columnar_store import iter_stock_frames
+
+    store = get_series_store()
+    count = 0
+    for stock_name, stock_code, df in iter_stock_frames(columns=list(FIELDS.values())):
+        if store.write(df, stock_name, stock_code):
+            count += 1
+    logger.info(f"시계열 저장소 생성 완료: {count}개 종목")
+
+
+if __name__ == "__main__":
+    main()
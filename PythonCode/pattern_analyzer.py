@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import logging
+from surge_index import VOLUME_SPIKE_SIGMA, NEAR_LIMIT_UP_THRESHOLD
 
 # 로깅 설정
 logging.basicConfig(
@@ -48,7 +49,7 @@ class StockPatternAnalyzer:
         if '거래량' in df.columns:
             volume_mean = df['거래량'].mean()
             volume_std = df['거래량'].std()
-            volume_spike = df[df['거래량'] > volume_mean + 3*volume_std]
+            volume_spike = df[df['거래량'] > volume_mean + VOLUME_SPIKE_SIGMA*volume_std]
             patterns['거래량폭등일수'] = len(volume_spike)
             patterns['평균거래량'] = volume_mean
             patterns['최대거래량'] = df['거래량'].max()
@@ -63,7 +64,7 @@ class StockPatternAnalyzer:
         
         # 3. 가격 조작 의심 패턴 (연속 상한가/하한가)
         if '등락률' in df.columns:
-            upper_limit = df[df['등락률'] >= 29.5]  # 상한가 근처
+            upper_limit = df[df['등락률'] >= NEAR_LIMIT_UP_THRESHOLD]  # 상한가 근처
             lower_limit = df[df['등락률'] <= -29.5]  # 하한가 근처
             patterns['상한가근처일수'] = len(upper_limit)
             patterns['하한가근처일수'] = len(lower_limit)
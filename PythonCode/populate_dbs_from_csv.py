@@ -5,6 +5,9 @@ import glob
 import logging
 import json
 from datetime import datetime
+from columnar_store import iter_stock_frames
+from bulk_loader import BulkLoader, coerce_frame, KOREAN_COLUMNS, KOREAN_INT_COLUMNS
+from data_version import bump_data_version, COLLECTION, ANALYSIS
 
 # 로깅 설정
 logging.basicConfig(
@@ -84,6 +87,7 @@ class DBPopulator:
             
             conn.commit()
             conn.close()
+            bump_data_version(COLLECTION)
             logger.info("✅ collectList.db 데이터 삽입 완료")
             
         except Exception as e:
@@ -92,66 +96,32 @@ class DBPopulator:
     def populate_collect_complete_data(self):
         """2. collectCompleteData.db에 상세 주식 데이터 삽입"""
         try:
-            csv_files = glob.glob("Result/*.csv")
-            if not csv_files:
-                logger.warning("Result 폴더에 CSV 파일이 없습니다.")
-                return
-            
             conn = sqlite3.connect(self.db_paths['collectCompleteData'])
+            loader = BulkLoader(conn)
             
             total_inserted = 0
+            stock_count = 0
             
-            for csv_file in csv_files:
-                stock_name, stock_code = self.extract_stock_info_from_filename(csv_file)
-                if not stock_name or not stock_code:
-                    continue
-                
+            # Parquet 저장소를 우선 읽고, 저장소에 없는 종목은 CSV 파일에서 읽음
+            for stock_name, stock_code, df in iter_stock_frames():
+                stock_count += 1
                 logger.info(f"📊 {stock_name} ({stock_code}) 데이터 처리 중...")
                 
-                # CSV 파일 읽기
-                df = pd.read_csv(csv_file, index_col=0, parse_dates=True)
-                
-                # 데이터 전처리
-                processed_data = []
-                
-                for date, row in df.iterrows():
-                    date_str = date.strftime('%Y-%m-%d') if hasattr(date, 'strftime') else str(date)
-                    
-                    data_row = {
-                        '주식명': stock_name,
-                        '주식코드': stock_code,
-                        '날짜': date_str,
-                        '시가': self.safe_int(row.get('시가')),
-                        '고가': self.safe_int(row.get('고가')),
-                        '저가': self.safe_int(row.get('저가')),
-                        '종가': self.safe_int(row.get('종가')),
-                        '거래량': self.safe_int(row.get('거래량')),
-                        '등락률': self.safe_float(row.get('등락률')),
-                        '시가총액': self.safe_int(row.get('시가총액')),
-                        '거래량_cap': self.safe_int(row.get('거래량_cap')),
-                        '거래대금': self.safe_int(row.get('거래대금')),
-                        '상장주식수': self.safe_int(row.get('상장주식수')),
-                        'BPS': self.safe_float(row.get('BPS')),
-                        'PER': self.safe_float(row.get('PER')),
-                        'PBR': self.safe_float(row.get('PBR')),
-                        'EPS': self.safe_float(row.get('EPS')),
-                        'DIV': self.safe_float(row.get('DIV')),
-                        'DPS': self.safe_float(row.get('DPS')),
-                        '기관합계': self.safe_int(row.get('기관합계')),
-                        '기타법인': self.safe_int(row.get('기타법인')),
-                        '개인': self.safe_int(row.get('개인')),
-                        '외국인합계': self.safe_int(row.get('외국인합계'))
-                    }
-                    processed_data.append(data_row)
-                
-                # 배치 삽입
-                if processed_data:
-                    df_to_insert = pd.DataFrame(processed_data)
-                    df_to_insert.to_sql('completed_stocks', conn, if_exists='append', index=False, method='multi')
-                    total_inserted += len(processed_data)
-                    logger.info(f"✅ {stock_name} 데이터 {len(processed_data)}건 삽입")
+                # 컬럼 단위 타입 변환 후 일괄 삽입 (컬럼명은 수집 데이터와 같은 한글명)
+                rows = coerce_frame(
+                    df, KOREAN_COLUMNS, KOREAN_INT_COLUMNS,
+                    constants={'주식명': stock_name, '주식코드': stock_code}, date_column='날짜'
+                )
+                loader.load('completed_stocks', rows)
+                conn.commit()
+                total_inserted += len(rows)
+                logger.info(f"✅ {stock_name} 데이터 {len(rows)}건 삽입")
             
             conn.close()
+            if not stock_count:
+                logger.warning("Result 폴더에 수집 데이터가 없습니다.")
+                return
+            bump_data_version(COLLECTION)
             logger.info(f"✅ collectCompleteData.db 총 {total_inserted:,}건 데이터 삽입 완료")
             
         except Exception as e:
@@ -221,6 +191,7 @@ class DBPopulator:
             
             conn.commit()
             conn.close()
+            bump_data_version(ANALYSIS)
             
             logger.info(f"✅ anomalousList.db에 {inserted_count}개 의심 종목 삽입 완료")
             
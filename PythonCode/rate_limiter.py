@@ -0,0 +1,57 @@
+import functools
+import threading
+import time
+
+# KRX 정보데이터시스템 호출 한도 (초당 요청 수 / 순간 최대 요청 수)
+KRX_REQUESTS_PER_SECOND = 2.0
+KRX_BURST = 4
+
+
+class TokenBucketRateLimiter:
+    """여러 스레드가 공유하는 토큰 버킷 방식의 호출 속도 제한기"""
+
+    def __init__(self, rate=KRX_REQUESTS_PER_SECOND, capacity=KRX_BURST):
+        if rate <= 0:
+            raise ValueError("rate는 0보다 커야 합니다.")
+        self.rate = float(rate)
+        self.capacity = max(1, int(capacity))
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def acquire(self, tokens=1):
+        """토큰을 얻을 때까지 대기합니다."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimitedSource:
+    """데이터 소스(pykrx stock 모듈 등)의 함수를 호출하기 전에 토큰을 얻도록 감싸는 래퍼"""
+
+    def __init__(self, source, rate_limiter):
+        self.source = source
+        self.rate_limiter = rate_limiter
+
+    def __getattr__(self, name):
+        attr = getattr(self.source, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def wrapper(*args, **kwargs):
+            self.rate_limiter.acquire()
+            return attr(*args, **kwargs)
+
+        return wrapper
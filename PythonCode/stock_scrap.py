@@ -2,11 +2,28 @@ from pykrx import stock
 import pandas as pd
 from datetime import datetime, timedelta
 import logging
-import time
 import numpy as np
 import sqlite3
 import os
+import argparse
 import sys
+import threading
+from functools import partial
+from rate_limiter import TokenBucketRateLimiter, RateLimitedSource, KRX_REQUESTS_PER_SECOND, KRX_BURST
+from collection_engine import CollectionEngine, DEFAULT_WORKERS, DEFAULT_MAX_ATTEMPTS
+from job_ledger import CollectionLedger
+from db_manager import DatabaseManager
+from ticker_index import get_ticker_index
+from bulk_collector import MarketSnapshotCollector
+from krx_cache import CachedDataSource, CACHE_MODES, DEFAULT_CACHE_DIR
+from columnar_store import ParquetStockStore, DEFAULT_STORE_DIR
+from mmap_store import get_series_store
+from data_version import bump_data_version, COLLECTION
+from surge_index import refresh_surge_events, SOURCE_COLUMNS as SURGE_SOURCE_COLUMNS
+
+# API DB 게시 모듈(저장소 루트)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from pipeline_publish import get_api_engine, publish_collected_stock
 
 # 로깅 설정
 logging.basicConfig(
@@ -18,17 +35,22 @@ logger = logging.getLogger(__name__)
 class StockDataCollector:
     """주식 데이터 수집 전용 클래스"""
     
-    def __init__(self):
-        self.today = datetime.now().strftime("%Y%m%d")
+    def __init__(self, rate_limiter=None, data_source=None):
+        # 수집 기준일 (캐시 replay 모드에서는 캐시를 기록한 날)
+        self.today = getattr(data_source, "as_of", None) or datetime.now().strftime("%Y%m%d")
+        # 별도 제한기가 없으면 기존과 같이 초당 1회로 호출 간격을 유지
+        self.rate_limiter = rate_limiter or TokenBucketRateLimiter(rate=1, capacity=1)
+        # 모든 pykrx 호출은 data_source를 거침 (캐시 등으로 교체 가능)
+        self.source = data_source or RateLimitedSource(stock, self.rate_limiter)
+        # 투자자별 순매수 대안 조회용 전 종목 DataFrame (기간별로 실행 중 1회만 조회)
+        self._net_purchase_frames = {}
+        self._net_purchase_locks = {}
+        self._net_purchase_guard = threading.Lock()
         
     def get_stock_code(self, stock_name):
         """종목명으로 종목코드를 조회합니다."""
         try:
-            stock_list = stock.get_market_ticker_list(market="ALL")
-            for code in stock_list:
-                if stock.get_market_ticker_name(code) == stock_name:
-                    return code
-            return None
+            return get_ticker_index(wait=True).get_code(stock_name)
         except Exception as e:
             logger.error(f"종목코드 조회 중 오류 발생: {str(e)}")
             return None
@@ -36,7 +58,7 @@ class StockDataCollector:
     def collect_basic_data(self, stock_code, start_date):
         """기본 주가 데이터(OHLCV)를 수집합니다."""
         try:
-            df = stock.get_market_ohlcv_by_date(
+            df = self.source.get_market_ohlcv_by_date(
                 fromdate=start_date,
                 todate=self.today,
                 ticker=stock_code
@@ -50,8 +72,7 @@ class StockDataCollector:
     def collect_market_cap_data(self, stock_code, start_date):
         """시가총액 및 상장주식수 데이터를 수집합니다."""
         try:
-            time.sleep(1)  # API 호출 간격 조절
-            df = stock.get_market_cap_by_date(
+            df = self.source.get_market_cap_by_date(
                 fromdate=start_date,
                 todate=self.today,
                 ticker=stock_code
@@ -65,8 +86,7 @@ class StockDataCollector:
     def collect_fundamental_data(self, stock_code, start_date):
         """기본 재무 정보(PER, PBR, DIV 등)를 수집합니다."""
         try:
-            time.sleep(1)
-            df = stock.get_market_fundamental_by_date(
+            df = self.source.get_market_fundamental_by_date(
                 fromdate=start_date,
                 todate=self.today,
                 ticker=stock_code
@@ -80,8 +100,7 @@ class StockDataCollector:
     def collect_trading_volume_by_investor(self, stock_code, start_date):
         """투자자별 거래량 데이터를 수집합니다."""
         try:
-            time.sleep(1)
-            df = stock.get_market_trading_value_by_date(
+            df = self.source.get_market_trading_value_by_date(
                 fromdate=start_date,
                 todate=self.today,
                 ticker=stock_code,
@@ -93,12 +112,8 @@ class StockDataCollector:
             return df
         except Exception as e:
             try:
-                # 대안 방법 시도
-                df = stock.get_market_net_purchases_of_equities_by_ticker(
-                    fromdate=start_date,
-                    todate=self.today,
-                    market="ALL"
-                )
+                # 대안 방법 시도 (전 종목 DataFrame을 공유하여 종목별 재조회 방지)
+                df = self.get_market_net_purchases(start_date)
                 if stock_code in df.index:
                     stock_investor_data = df.loc[stock_code:stock_code]
                     logger.info("투자자별 순매수 데이터 수집 완료")
@@ -110,11 +125,31 @@ class StockDataCollector:
                 logger.error(f"투자자별 거래량 데이터 수집 오류: {str(e2)}")
                 return None
 
+    def get_market_net_purchases(self, start_date):
+        """기간별 전 종목 투자자 순매수 DataFrame을 한 번만 조회하여 재사용합니다."""
+        key = (start_date, self.today)
+        with self._net_purchase_guard:
+            if key in self._net_purchase_frames:
+                return self._net_purchase_frames[key]
+            key_lock = self._net_purchase_locks.setdefault(key, threading.Lock())
+        
+        # 같은 기간을 동시에 요청한 스레드는 첫 조회가 끝날 때까지 대기
+        with key_lock:
+            if key not in self._net_purchase_frames:
+                df = self.source.get_market_net_purchases_of_equities_by_ticker(
+                    fromdate=start_date,
+                    todate=self.today,
+                    market="ALL"
+                )
+                with self._net_purchase_guard:
+                    self._net_purchase_frames[key] = df
+                logger.info(f"전 종목 투자자별 순매수 데이터 조회 완료 ({start_date}~{self.today})")
+            return self._net_purchase_frames[key]
+
     def collect_shorting_data(self, stock_code, start_date):
         """공매도 잔고 데이터를 수집합니다."""
         try:
-            time.sleep(1)
-            df = stock.get_shorting_balance_by_date(
+            df = self.source.get_shorting_balance_by_date(
                 fromdate=start_date,
                 todate=self.today,
                 ticker=stock_code
@@ -125,17 +160,48 @@ class StockDataCollector:
             logger.error(f"공매도 데이터 수집 오류: {str(e)}")
             return None
 
-    def collect_comprehensive_data(self, stock_name, years=3):
+    def merge_comprehensive_data(self, basic_df, market_cap_df=None, fundamental_df=None,
+                                 trading_volume_df=None, shorting_df=None):
+        """개별 수집 데이터를 기본 주가 데이터 기준으로 병합합니다."""
+        if basic_df is None:
+            return None
+        
+        result_df = basic_df.copy()
+        
+        # 시가총액 데이터 병합
+        if market_cap_df is not None:
+            result_df = result_df.join(market_cap_df, how='left', rsuffix='_cap')
+        
+        # 기본 재무정보 병합
+        if fundamental_df is not None:
+            result_df = result_df.join(fundamental_df, how='left', rsuffix='_fund')
+        
+        # 투자자별 거래량 병합 (일부 컬럼만 선택)
+        if trading_volume_df is not None:
+            # 주요 투자자 컬럼만 선택
+            investor_cols = ['기관합계', '기타법인', '개인', '외국인합계'] if len(trading_volume_df.columns) > 0 else []
+            available_cols = [col for col in investor_cols if col in trading_volume_df.columns]
+            if available_cols:
+                result_df = result_df.join(trading_volume_df[available_cols], how='left', rsuffix='_investor')
+        
+        # 공매도 데이터 병합
+        if shorting_df is not None:
+            result_df = result_df.join(shorting_df, how='left', rsuffix='_short')
+        
+        return result_df
+
+    def collect_comprehensive_data(self, stock_name, years=3, stock_code=None):
         """종목명을 기반으로 종합적인 주식 데이터를 수집합니다."""
         try:
-            # 종목코드 조회
-            stock_code = self.get_stock_code(stock_name)
+            # 종목코드 조회 (코드가 주어지면 조회 생략)
+            if not stock_code:
+                stock_code = self.get_stock_code(stock_name)
             if not stock_code:
                 logger.error(f"종목 '{stock_name}'을 찾을 수 없습니다.")
                 return None, None
 
-            # 시작일 계산 (3년으로 변경)
-            start_date = (datetime.now() - timedelta(days=365*years)).strftime("%Y%m%d")
+            # 시작일 계산 (기준일부터 years년 전)
+            start_date = years_before(self.today, years)
             
             # 데이터 수집
             logger.info(f"'{stock_name}' 종합 데이터 수집 시작...")
@@ -156,29 +222,10 @@ class StockDataCollector:
             shorting_df = self.collect_shorting_data(stock_code, start_date)
             
             # 데이터 병합
-            if basic_df is not None:
-                result_df = basic_df.copy()
-                
-                # 시가총액 데이터 병합
-                if market_cap_df is not None:
-                    result_df = result_df.join(market_cap_df, how='left', rsuffix='_cap')
-                
-                # 기본 재무정보 병합
-                if fundamental_df is not None:
-                    result_df = result_df.join(fundamental_df, how='left', rsuffix='_fund')
-                
-                # 투자자별 거래량 병합 (일부 컬럼만 선택)
-                if trading_volume_df is not None:
-                    # 주요 투자자 컬럼만 선택
-                    investor_cols = ['기관합계', '기타법인', '개인', '외국인합계'] if len(trading_volume_df.columns) > 0 else []
-                    available_cols = [col for col in investor_cols if col in trading_volume_df.columns]
-                    if available_cols:
-                        result_df = result_df.join(trading_volume_df[available_cols], how='left', rsuffix='_investor')
-                
-                # 공매도 데이터 병합
-                if shorting_df is not None:
-                    result_df = result_df.join(shorting_df, how='left', rsuffix='_short')
-                
+            result_df = self.merge_comprehensive_data(
+                basic_df, market_cap_df, fundamental_df, trading_volume_df, shorting_df
+            )
+            if result_df is not None:
                 logger.info(f"'{stock_name}' 종합 데이터 수집 완료")
                 return result_df, stock_code
             else:
@@ -189,17 +236,21 @@ class StockDataCollector:
             logger.error(f"종합 데이터 수집 중 오류 발생: {str(e)}")
             return None, None
 
-    def save_data_to_csv(self, df, stock_name, stock_code, output_dir="Result"):
-        """데이터를 CSV 파일로 저장합니다."""
+    def save_data_to_csv(self, df, stock_name, stock_code, output_dir="Result", append=False):
+        """데이터를 CSV 파일로 저장합니다. append=True이면 기존 파일에 날짜 기준으로 병합합니다. 실패하면 False를 반환합니다."""
         try:
             os.makedirs(output_dir, exist_ok=True)
             filename = f"{output_dir}/{stock_name}_{stock_code}.csv"
+            if append and os.path.exists(filename):
+                existing_df = pd.read_csv(filename, index_col=0, parse_dates=True)
+                df = pd.concat([existing_df, df])
+                df = df[~df.index.duplicated(keep='last')].sort_index()
             df.to_csv(filename, encoding='utf-8-sig')
             logger.info(f"{filename} 저장 완료")
             return filename
         except Exception as e:
             logger.error(f"CSV 저장 오류: {str(e)}")
-            return None
+            return False
 
     def collect_stock_data(self, stock_name, years=1):
         """기존 호환성을 위한 메서드 (기본 데이터만 수집)"""
@@ -208,8 +259,7 @@ class StockDataCollector:
     def collect_intraday_data(self, stock_code, interval='1'):
         """분봉 데이터를 수집합니다. (당일 데이터만)"""
         try:
-            time.sleep(1)
-            df = stock.get_market_ohlcv_by_ticker(
+            df = self.source.get_market_ohlcv_by_ticker(
                 date=self.today,
                 market="KOSPI"
             )
@@ -228,9 +278,8 @@ class StockDataCollector:
     def collect_sector_data(self, stock_code):
         """업종 정보 데이터를 수집합니다."""
         try:
-            time.sleep(1)
             # 업종 정보는 따로 API가 있지만, 기본 정보에서 추출
-            sectors = stock.get_market_ticker_list(market="ALL")
+            sectors = self.source.get_market_ticker_list(market="ALL")
             if stock_code in sectors:
                 logger.info("업종 데이터 수집 완료")
                 return {"업종": "정보수집완료"}  # 실제로는 더 상세한 업종 정보 가능
@@ -280,32 +329,191 @@ def get_stocks_from_db():
             ("SK하이닉스", "000660")
         ]
 
-def main():
+def get_collect_db_path():
+    """collectCompleteData.db 경로를 반환합니다."""
+    # PythonCode 폴더에서 실행할 때 상위 폴더의 DB 접근
+    return "../DB/collectCompleteData.db" if os.path.exists("../DB/collectCompleteData.db") else "DB/collectCompleteData.db"
+
+def years_before(today, years):
+    """기준일(YYYYMMDD)에서 years년 전 날짜를 반환합니다."""
+    return (datetime.strptime(today, "%Y%m%d") - timedelta(days=365*years)).strftime("%Y%m%d")
+
+def get_incremental_start_dates(stocks, today=None):
+    """종목별 마지막 저장일 다음 날을 수집 시작일로 계산합니다.
+
+    저장된 데이터가 없는 종목은 결과에서 빠지며(전체 기간 수집),
+    이미 오늘까지 저장된 종목은 up_to_date 목록으로 반환합니다.
+    """
+    today = today or datetime.now().strftime("%Y%m%d")
+    db_manager = DatabaseManager(db_path=get_collect_db_path())
+    start_dates = {}
+    up_to_date = []
+    
+    for stock_name, stock_code in stocks:
+        _, latest_date = db_manager.check_existing_data(stock_code)
+        if not latest_date:
+            continue
+        start_date = (pd.to_datetime(latest_date) + timedelta(days=1)).strftime("%Y%m%d")
+        if start_date > today:
+            up_to_date.append(stock_code)
+        else:
+            start_dates[stock_code] = start_date
+    
+    return start_dates, up_to_date
+
+def get_latest_collected_dates():
+    """completed_stocks의 종목별 마지막 저장일을 {종목코드: 날짜}로 반환합니다."""
+    try:
+        conn = sqlite3.connect(get_collect_db_path())
+        cursor = conn.cursor()
+        cursor.execute("SELECT stock_code, MAX(date) FROM completed_stocks GROUP BY stock_code")
+        latest_dates = dict(cursor.fetchall())
+        conn.close()
+        return latest_dates
+    except Exception as e:
+        logger.error(f"최근 저장일 조회 실패: {str(e)}")
+        return {}
+
+def save_rows_after(start_dates, sink, df, stock_name, stock_code):
+    """종목의 증분 시작일(start_dates) 이전 행을 뺀 뒤 sink에 저장합니다. 시작일이 없는 종목은 전체를 저장합니다."""
+    start_date = start_dates.get(stock_code)
+    if start_date:
+        df = df[df.index >= pd.to_datetime(start_date)]
+        if df.empty:
+            return True
+    return sink(df, stock_name, stock_code)
+
+def run_bulk_collection(args, data_source, sinks, today):
+    """거래일별 시장 스냅샷으로 전 종목(또는 지정 종목)을 수집합니다.
+
+    증분 모드에서는 종목별 마지막 저장일 다음 날 중 가장 이른 날부터 수집하고
+    (저장된 데이터가 없는 대상 종목이 있으면 전체 기간), 종목마다 이미 저장된 날짜는 건너뜁니다.
+    """
+    start_date = years_before(today, args.years)
+    stock_codes = [args.stock_code] if args.stock_code else None
+    if args.incremental:
+        start_dates = {
+            stock_code: (pd.to_datetime(latest_date) + timedelta(days=1)).strftime("%Y%m%d")
+            for stock_code, latest_date in get_latest_collected_dates().items()
+        }
+        if stock_codes:
+            candidates = [start_dates.get(stock_code, start_date) for stock_code in stock_codes]
+        else:
+            candidates = list(start_dates.values()) or [start_date]
+        start_date = max(min(candidates), start_date)
+        if start_date > today:
+            logger.info("이미 최신 데이터입니다.")
+            return []
+        sinks = [partial(save_rows_after, start_dates, sink) for sink in sinks]
+    
+    bulk_collector = MarketSnapshotCollector(
+        workers=args.workers,
+        include_investor=args.with_investor,
+        data_source=data_source
+    )
+    return bulk_collector.run(start_date, today, sinks, stock_codes=stock_codes)
+
+def parse_args(argv=None):
+    """명령행 인자를 해석합니다."""
+    parser = argparse.ArgumentParser(description="주식 종합 데이터 수집")
+    parser.add_argument("stock_code", nargs="?", help="단일 종목코드 (생략 시 DB 전체 종목)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"동시 수집 작업자 수 (기본값: {DEFAULT_WORKERS})")
+    parser.add_argument("--rate", type=float, default=KRX_REQUESTS_PER_SECOND,
+                        help=f"초당 KRX 요청 수 (기본값: {KRX_REQUESTS_PER_SECOND})")
+    parser.add_argument("--burst", type=int, default=KRX_BURST,
+                        help=f"순간 최대 KRX 요청 수 (기본값: {KRX_BURST})")
+    parser.add_argument("--years", type=int, default=3, help="수집 기간(년)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="마지막 저장일 이후 거래일만 수집하여 (종목코드, 날짜) 기준으로 갱신")
+    parser.add_argument("--bulk", action="store_true",
+                        help="거래일별 전 종목 스냅샷으로 수집 (전체 시장 스캔용)")
+    parser.add_argument("--with-investor", action="store_true",
+                        help="대량 수집 시 투자자별 순매수도 수집 (거래일당 4회 추가 호출)")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help=f"데이터셋별 최대 시도 횟수 (기본값: {DEFAULT_MAX_ATTEMPTS})")
+    parser.add_argument("--reset-ledger", action="store_true",
+                        help="오늘자 수집 원장을 지우고 처음부터 다시 수집")
+    parser.add_argument("--no-ledger", action="store_true",
+                        help="수집 원장 없이 항상 새로 수집 (API 작업 큐의 단일 종목 수집용)")
+    parser.add_argument("--publish", action="store_true",
+                        help="수집 결과를 API DB(PostgreSQL, DATABASE_URL)에도 저장 (API 작업 큐가 사용)")
+    parser.add_argument("--cache", choices=CACHE_MODES, default=os.getenv("KRX_CACHE_MODE", "readwrite"),
+                        help="pykrx 응답 캐시 모드 (replay: 네트워크 호출 없이 캐시만 사용)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="pykrx 응답 캐시 경로")
+    parser.add_argument("--format", choices=("parquet", "csv", "both"), default="parquet",
+                        help="수집 결과 파일 형식 (parquet: 컬럼형 저장소, csv: 기존 CSV)")
+    parser.add_argument("--store-dir", default=DEFAULT_STORE_DIR, help="Parquet 저장소 경로")
+    args = parser.parse_args(argv)
+    if args.publish and not os.getenv("DATABASE_URL"):
+        parser.error("--publish에는 DATABASE_URL 환경변수가 필요합니다.")
+    return args
+
+def main(argv=None):
     """메인 실행 함수"""
-    collector = StockDataCollector()
+    args = parse_args(argv)
+    
+    # 모든 종목·데이터셋이 하나의 속도 제한기를 공유
+    rate_limiter = TokenBucketRateLimiter(rate=args.rate, capacity=args.burst)
+    data_source = RateLimitedSource(stock, rate_limiter)
+    if args.cache != "off":
+        # 캐시 적중 시에는 속도 제한 토큰을 쓰지 않도록 제한기 바깥에서 캐시
+        data_source = CachedDataSource(data_source, cache_dir=args.cache_dir, mode=args.cache)
+    collector = StockDataCollector(rate_limiter=rate_limiter, data_source=data_source)
+    sinks = []
+    if args.format in ("parquet", "both"):
+        store = ParquetStockStore(args.store_dir)
+        sinks.append(partial(store.write, append=args.incremental))
+    if args.format in ("csv", "both"):
+        sinks.append(partial(collector.save_data_to_csv, append=args.incremental))
+    # 차트 API가 DB 없이 읽는 메모리 맵 시계열 저장소
+    sinks.append(partial(get_series_store().write, append=args.incremental))
+    sinks.append(partial(save_to_collectcompletedata_db, incremental=args.incremental))
+    sinks.append(partial(save_surge_events, incremental=args.incremental))
+    if args.publish:
+        # API가 조회하는 DB에 반영 (실패하면 저장 실패로 보아 재시도)
+        sinks.append(partial(save_to_api_db, get_api_engine()))
+    
+    # 수집 원장: 재시작 시 같은 기준일·시작일에 끝나지 않은 (종목, 데이터셋)만 다시 수집
+    ledger = None if args.no_ledger else CollectionLedger(pipeline="stock_scrap")
+    if ledger is not None and args.reset_ledger:
+        ledger.reset(collector.today)
+    engine = CollectionEngine(
+        collector,
+        workers=args.workers,
+        sinks=sinks,
+        ledger=ledger,
+        max_attempts=args.max_attempts
+    )
+    
+    # 시장 스냅샷 대량 수집
+    if args.bulk:
+        run_bulk_collection(args, data_source, sinks, collector.today)
+        return
     
     # 명령행 인자로 종목코드가 전달된 경우 단일 종목 처리
-    if len(sys.argv) > 1:
-        stock_code = sys.argv[1]
+    if args.stock_code:
+        stock_code = args.stock_code
         try:
             # 종목명 조회
-            stock_name = stock.get_market_ticker_name(stock_code)
+            stock_name = get_ticker_index(wait=True).get_name(stock_code)
             if not stock_name:
                 logger.error(f"종목코드 {stock_code}에 해당하는 종목을 찾을 수 없습니다.")
                 return
             
             logger.info(f"단일 종목 데이터 수집 시작: {stock_name} ({stock_code})")
             
-            # 3년치 데이터 수집
-            df, _ = collector.collect_comprehensive_data(stock_name, years=3)
+            stocks = [(stock_name, stock_code)]
+            start_dates = None
+            if args.incremental:
+                start_dates, up_to_date = get_incremental_start_dates(stocks, collector.today)
+                if up_to_date:
+                    logger.info(f"이미 최신 데이터입니다: {stock_name} ({stock_code})")
+                    return
             
-            if df is not None and not df.empty:
-                # CSV 파일 저장
-                filename = collector.save_data_to_csv(df, stock_name, stock_code)
-                
-                # DB에 저장
-                save_to_collectcompletedata_db(df, stock_name, stock_code)
-                
+            results = engine.run(stocks, years=args.years, start_dates=start_dates)
+            
+            if results and results[0]['success']:
                 logger.info(f"단일 종목 데이터 수집 완료: {stock_name} ({stock_code})")
             else:
                 logger.error(f"데이터 수집 실패: {stock_name} ({stock_code})")
@@ -321,94 +529,71 @@ def main():
         logger.warning("DB에서 종목 목록을 가져올 수 없습니다.")
         return
     
+    start_dates = None
+    if args.incremental:
+        start_dates, up_to_date = get_incremental_start_dates(stocks, collector.today)
+        if up_to_date:
+            logger.info(f"이미 최신 데이터인 {len(up_to_date)}개 종목은 건너뜁니다.")
+            stocks = [(name, code) for name, code in stocks if code not in up_to_date]
+    
     logger.info(f"총 {len(stocks)}개 종목의 데이터 수집을 시작합니다.")
     
-    for i, (stock_name, stock_code) in enumerate(stocks, 1):
-        try:
-            logger.info(f"[{i}/{len(stocks)}] {stock_name} ({stock_code}) 데이터 수집 중...")
-            
-            # 3년치 데이터 수집
-            df, _ = collector.collect_comprehensive_data(stock_name, years=3)
-            
-            if df is not None and not df.empty:
-                # CSV 파일 저장
-                filename = collector.save_data_to_csv(df, stock_name, stock_code)
-                
-                # DB에 저장
-                save_to_collectcompletedata_db(df, stock_name, stock_code)
-                
-                logger.info(f"[{i}/{len(stocks)}] {stock_name} 데이터 수집 완료")
-            else:
-                logger.error(f"[{i}/{len(stocks)}] {stock_name} 데이터 수집 실패")
-                
-        except Exception as e:
-            logger.error(f"[{i}/{len(stocks)}] {stock_name} 처리 중 오류: {str(e)}")
-            continue
+    results = engine.run(stocks, years=args.years, start_dates=start_dates)
     
-    logger.info("모든 종목 데이터 수집 완료")
+    failed = [r for r in results if not r['success']]
+    for result in failed:
+        logger.error(f"{result['stock_name']} ({result['stock_code']}) 데이터 수집 실패")
+    
+    logger.info(f"모든 종목 데이터 수집 완료 (실패 {len(failed)}개)")
+    if ledger is not None:
+        logger.info(f"수집 원장 현황: {ledger.summary(collector.today)}")
+
+def save_to_collectcompletedata_db(df, stock_name, stock_code, incremental=False):
+    """collectCompleteData.db에 데이터 저장
 
-def save_to_collectcompletedata_db(df, stock_name, stock_code):
-    """collectCompleteData.db에 데이터 저장"""
+    incremental=True이면 기존 데이터를 지우지 않고 (stock_code, date) 기준으로 upsert합니다.
+    실패하면 False를 반환하여 수집 원장이 종목을 완료로 기록하지 않게 합니다.
+    """
     try:
-        # 데이터 전처리
-        df_copy = df.copy()
-        df_copy.reset_index(inplace=True)
-        
-        # 컬럼명 매핑
-        column_mapping = {
-            '날짜': 'date',
-            '시가': 'open_price',
-            '고가': 'high_price', 
-            '저가': 'low_price',
-            '종가': 'close_price',
-            '거래량': 'volume',
-            '등락률': 'change_rate',
-            '시가총액': 'market_cap',
-            '거래량_cap': 'volume_cap',
-            '거래대금': 'trading_value',
-            '상장주식수': 'shares_outstanding',
-            'BPS': 'bps',
-            'PER': 'per',
-            'PBR': 'pbr',
-            'EPS': 'eps',
-            'DIV': 'div',
-            'DPS': 'dps',
-            '기관합계': 'institutional_total',
-            '기타법인': 'other_corporate',
-            '개인': 'individual',
-            '외국인합계': 'foreign_total'
-        }
-        
-        # 컬럼명 변경
-        df_copy.rename(columns=column_mapping, inplace=True)
-        
-        # 필수 컬럼 추가
-        df_copy['stock_name'] = stock_name
-        df_copy['stock_code'] = stock_code
+        # 테이블이 없거나 이전 스키마(volume_cap 등, UNIQUE 없음)이면 저장 전에 현재 스키마로 맞춤
+        saved = DatabaseManager(get_collect_db_path()).save_completed_stocks(df, stock_name, stock_code, incremental=incremental)
+        # 같은 종목의 시계열 저장소 쓰기도 이 싱크보다 먼저 끝나므로 함께 반영됨
+        bump_data_version(COLLECTION)
         
-        # 등락률 계산 (없는 경우)
-        if 'change_rate' not in df_copy.columns:
-            df_copy['change_rate'] = ((df_copy['close_price'] - df_copy['open_price']) / df_copy['open_price'] * 100).round(2)
-        
-        # DB 경로 설정 (PythonCode 폴더에서 실행할 때 상위 폴더의 DB 접근)
-        db_path = "../DB/collectCompleteData.db" if os.path.exists("../DB/collectCompleteData.db") else "DB/collectCompleteData.db"
-        
-        # DB 연결 및 저장
-        conn = sqlite3.connect(db_path)
-        
-        # 기존 데이터 삭제 (중복 방지)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM completed_stocks WHERE stock_code = ?", (stock_code,))
-        
-        # 새 데이터 삽입
-        df_copy.to_sql('completed_stocks', conn, if_exists='append', index=False)
-        conn.commit()
-        conn.close()
-        
-        logger.info(f"{stock_name} ({stock_code}) DB 저장 완료")
+        logger.info(f"{stock_name} ({stock_code}) DB 저장 완료 ({saved}건{', 증분' if incremental else ''})")
+        return True
         
     except Exception as e:
         logger.error(f"DB 저장 오류: {str(e)}")
+        return False
+
+def save_to_api_db(engine, df, stock_name, stock_code):
+    """API DB(PostgreSQL)의 completed_stocks·stock_daily_data·surge_events에 수집 데이터를 반영합니다.
+
+    실패하면 False를 반환하여 수집 원장이 종목을 완료로 기록하지 않게 합니다.
+    """
+    try:
+        published = publish_collected_stock(engine, df, stock_name, stock_code)
+        logger.info(f"{stock_name} ({stock_code}) API DB 반영 완료 ({published}건)")
+        return True
+    except Exception as e:
+        logger.error(f"API DB 반영 오류: {str(e)}")
+        return False
+
+def save_surge_events(df, stock_name, stock_code, incremental=False):
+    """collectCompleteData.db의 급등 이벤트 색인(surge_events)을 갱신합니다.
+
+    거래량 급증 기준(전체 평균·표준편차)을 계산하려면 전체 이력이 필요하므로
+    증분 수집이면 시계열 저장소에 저장된 전체 이력으로 다시 계산합니다.
+    전체 이력이 없으면 증분 구간만으로 기존 색인을 덮어쓰지 않고 건너뜁니다.
+    """
+    if incremental:
+        history = get_series_store().read_frame(stock_code, columns=SURGE_SOURCE_COLUMNS)
+        if history is None or history.empty:
+            logger.warning(f"{stock_name} ({stock_code}) 시계열 저장소에 전체 이력이 없어 급등 이벤트 색인 갱신을 건너뜁니다.")
+            return
+        df = history
+    refresh_surge_events(stock_code, df, db_path=get_collect_db_path())
 
 if __name__ == "__main__":
     main()
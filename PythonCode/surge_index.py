@@ -0,0 +1,175 @@
+import logging
+import os
+import sqlite3
+
+import numpy as np
+
+from data_version import bump_data_version, COLLECTION
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "DB", "collectCompleteData.db")
+TABLE = "surge_events"
+
+# 이벤트 종류
+SURGE = "surge"                  # 등락률이 기준 이상인 날 (magnitude: 등락률 %)
+VOLUME_SPIKE = "volume_spike"    # 거래량이 평균 + k·표준편차를 넘은 날 (magnitude: 거래량 z-score)
+NEAR_LIMIT_UP = "near_limit_up"  # 상한가 근처까지 오른 날 (magnitude: 등락률 %)
+EVENT_TYPES = (SURGE, VOLUME_SPIKE, NEAR_LIMIT_UP)
+
+# 색인에 넣는 최소 기준. 조회 시에는 이 값 이상의 임의 기준으로 magnitude를 거를 수 있음
+SURGE_BASE_THRESHOLD = float(os.getenv("SURGE_BASE_THRESHOLD", "5.0"))
+VOLUME_SPIKE_SIGMA = 3.0
+NEAR_LIMIT_UP_THRESHOLD = 29.5
+BASE_THRESHOLDS = {
+    SURGE: SURGE_BASE_THRESHOLD,
+    VOLUME_SPIKE: VOLUME_SPIKE_SIGMA,
+    NEAR_LIMIT_UP: NEAR_LIMIT_UP_THRESHOLD,
+}
+
+# 탐지에 필요한 수집 데이터 컬럼
+SOURCE_COLUMNS = ['등락률', '종가', '거래량']
+EVENT_COLUMNS = ['stock_code', 'date', 'event_type', 'magnitude', 'change_rate', 'close_price', 'volume']
+
+
+def detect_surge_events(df, stock_code):
+    """날짜 인덱스 수집 DataFrame에서 급등·거래량 급증·상한가 근처 이벤트를 찾습니다.
+
+    거래량 급증은 주어진 기간 전체의 평균·표준편차(표본) 기준이므로 종목의 전체 이력을 넘겨야 합니다.
+    """
+    # API는 기준값만 불러오므로 pandas는 탐지할 때 불러옴
+    import pandas as pd
+
+    if df is None or df.empty:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+
+    dates = pd.to_datetime(df.index).strftime('%Y-%m-%d')
+    change_rate = pd.to_numeric(df['등락률'], errors='coerce') if '등락률' in df.columns else pd.Series(np.nan, index=df.index)
+    close_price = pd.to_numeric(df['종가'], errors='coerce') if '종가' in df.columns else pd.Series(np.nan, index=df.index)
+    volume = pd.to_numeric(df['거래량'], errors='coerce') if '거래량' in df.columns else pd.Series(np.nan, index=df.index)
+
+    volume_std = volume.std()
+    if volume_std and not np.isnan(volume_std):
+        volume_z = (volume - volume.mean()) / volume_std
+    else:
+        volume_z = pd.Series(np.nan, index=df.index)
+
+    frames = []
+    for event_type, magnitude in ((SURGE, change_rate), (NEAR_LIMIT_UP, change_rate), (VOLUME_SPIKE, volume_z)):
+        # 거래량 급증은 기존 분석 기준(평균 + 3σ 초과)과 같게 경계값을 제외
+        if event_type == VOLUME_SPIKE:
+            mask = (magnitude > BASE_THRESHOLDS[event_type]).to_numpy()
+        else:
+            mask = (magnitude >= BASE_THRESHOLDS[event_type]).to_numpy()
+        if not mask.any():
+            continue
+        frames.append(pd.DataFrame({
+            'stock_code': stock_code,
+            'date': dates[mask],
+            'event_type': event_type,
+            'magnitude': magnitude.to_numpy()[mask],
+            'change_rate': change_rate.to_numpy()[mask],
+            'close_price': close_price.to_numpy()[mask],
+            'volume': volume.to_numpy()[mask],
+        }))
+    if not frames:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+class SurgeEventStore:
+    """surge_events 테이블을 관리합니다. (SQLite / PostgreSQL(psycopg2) 연결 모두 지원)
+
+    종목 단위로 이벤트를 지우고 다시 넣으며, 트랜잭션 커밋은 호출하는 쪽에서 합니다.
+    """
+
+    def __init__(self, conn):
+        from bulk_loader import BulkLoader
+
+        self.conn = conn
+        self.loader = BulkLoader(conn)
+
+    @property
+    def _placeholder(self):
+        return "?" if self.loader.is_sqlite else "%s"
+
+    def ensure_table(self):
+        id_column = "id INTEGER PRIMARY KEY AUTOINCREMENT" if self.loader.is_sqlite else "id SERIAL PRIMARY KEY"
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {TABLE} (
+                {id_column},
+                stock_code TEXT NOT NULL,
+                date DATE NOT NULL,
+                event_type TEXT NOT NULL,
+                magnitude REAL,
+                change_rate REAL,
+                close_price REAL,
+                volume BIGINT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (stock_code, date, event_type)
+            )
+        ''')
+        # 종목별 조회(임의 기준)와 날짜별 전 종목 조회용 색인
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_stock_type_magnitude ON {TABLE} (stock_code, event_type, magnitude)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_type_date ON {TABLE} (event_type, date)")
+
+    def replace(self, stock_code, events):
+        """종목의 이벤트를 모두 지우고 events로 교체합니다. 넣은 이벤트 수를 반환합니다."""
+        cursor = self.conn.cursor()
+        cursor.execute(f"DELETE FROM {TABLE} WHERE stock_code = {self._placeholder}", (stock_code,))
+        if events is None or events.empty:
+            return 0
+        import pandas as pd
+
+        rows = events[EVENT_COLUMNS].copy()
+        rows['volume'] = pd.array(np.trunc(rows['volume'].to_numpy(dtype='float64')), dtype='Int64')
+        return self.loader.load(TABLE, rows)
+
+    def refresh(self, stock_code, df):
+        """수집 데이터 전체 이력으로 종목의 이벤트를 다시 계산해 교체합니다."""
+        return self.replace(stock_code, detect_surge_events(df, stock_code))
+
+
+def refresh_surge_events(stock_code, df, db_path=DEFAULT_DB_PATH):
+    """collectCompleteData.db의 surge_events에서 종목의 이벤트를 갱신합니다.
+
+    수집·분석 파이프라인에서 호출하며, 실패해도 예외를 올리지 않습니다.
+    """
+    try:
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = sqlite3.connect(db_path)
+        try:
+            store = SurgeEventStore(conn)
+            store.ensure_table()
+            count = store.refresh(stock_code, df)
+            conn.commit()
+        finally:
+            conn.close()
+        bump_data_version(COLLECTION)
+        logger.info(f"{stock_code} 급등 이벤트 색인 갱신 ({count}건)")
+        return count
+    except Exception as e:
+        logger.error(f"{stock_code} 급등 이벤트 색인 갱신 실패: {str(e)}")
+        return 0
+
+
+def main():
+    """Parquet 저장소와 CSV 파일로부터 모든 종목의 급등 이벤트 색인을 다시 만듭니다."""
+    from columnar_store import iter_stock_frames
+
+    total = 0
+    stock_count = 0
+    for stock_name, stock_code, df in iter_stock_frames(columns=SOURCE_COLUMNS):
+        stock_count += 1
+        total += refresh_surge_events(stock_code, df)
+    logger.info(f"급등 이벤트 색인 생성 완료: {stock_count}개 종목, {total}건")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+import bisect
+import contextlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from datetime import datetime
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "DB", "ticker_index.json")
+MARKETS = ("KOSPI", "KOSDAQ", "KONEX")
+
+_CORP_SUFFIX_PATTERN = re.compile(r"\(주\)|㈜|주식회사")
+_SPACE_PATTERN = re.compile(r"\s+")
+
+# 한글 음절(가~힣)의 초성 순서 (호환용 자모)
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_CHOSEONG_CHARS = set(CHOSEONG)
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+_JUNGSEONG_JONGSEONG_COUNT = 21 * 28
+
+# 검색 결과 일치 종류 (정렬 순서)
+EXACT = "exact"
+PREFIX = "prefix"
+INFIX = "infix"
+_MATCH_RANK = {EXACT: 0, PREFIX: 1, INFIX: 2}
+# 색인 문자열에서 종목명 사이 구분자 (검색어에는 나오지 않는 문자)
+_SEPARATOR = "\x00"
+
+
+def normalize_stock_name(name):
+    """공백·법인 표기·전각 문자·대소문자 차이를 없앤 검색용 종목명을 반환합니다."""
+    if not name:
+        return ""
+    name = unicodedata.normalize("NFKC", name)
+    name = _CORP_SUFFIX_PATTERN.sub("", name)
+    name = _SPACE_PATTERN.sub("", name)
+    return name.casefold()
+
+
+def to_choseong(name):
+    """정규화된 종목명의 한글 음절을 초성으로 바꿉니다. (한글이 아닌 문자는 그대로)"""
+    chars = []
+    for char in name:
+        code = ord(char)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            chars.append(CHOSEONG[(code - _HANGUL_BASE) // _JUNGSEONG_JONGSEONG_COUNT])
+        else:
+            chars.append(char)
+    return "".join(chars)
+
+
+def is_choseong_query(query):
+    """검색어가 초성(ㄱ~ㅎ)만으로 이루어졌는지 확인합니다. (공백 무시)"""
+    query = _SPACE_PATTERN.sub("", query or "")
+    return bool(query) and all(char in _CHOSEONG_CHARS for char in query)
+
+
+def _build_blob(keys):
+    """종목별 검색 키를 구분자로 이은 문자열과 각 키의 시작 위치 목록을 만듭니다."""
+    offsets = []
+    position = 0
+    for key in keys:
+        offsets.append(position)
+        position += len(key) + len(_SEPARATOR)
+    return _SEPARATOR.join(keys), offsets
+
+
+def _find_matches(blob, offsets, key):
+    """blob에서 key를 포함하는 종목 번호 → 종목 키 안에서의 첫 일치 위치"""
+    matches = {}
+    position = blob.find(key)
+    while position != -1:
+        entry = bisect.bisect_right(offsets, position) - 1
+        matches[entry] = position - offsets[entry]
+        # 같은 종목에서 다시 찾지 않도록 다음 종목 키부터 이어서 검색
+        if entry + 1 >= len(offsets):
+            break
+        position = blob.find(key, offsets[entry + 1])
+    return matches
+
+
+def fetch_listed_entries():
+    """pykrx로 상장 종목 목록을 조회합니다. 반환: ({종목코드: {"name", "market"}}, 기준 거래일)"""
+    from pykrx import stock
+
+    trading_date = stock.get_nearest_business_day_in_a_week()
+    entries = {}
+    for market in MARKETS:
+        for code in stock.get_market_ticker_list(trading_date, market=market):
+            entries[code] = {"name": stock.get_market_ticker_name(code), "market": market}
+
+    if not entries:
+        raise RuntimeError("상장 종목 목록이 비어 있습니다.")
+    return entries, trading_date
+
+
+class TickerIndex:
+    """종목코드↔종목명 양방향 색인
+
+    거래일마다 한 번 pykrx 상장 종목 목록으로 생성하여 JSON 파일로 보관하고,
+    이후에는 파일을 읽어 딕셔너리 조회(O(1))로 응답합니다.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self.trading_date = None
+        self.built_on = None
+        self.code_to_name = {}
+        self.code_to_market = {}
+        self.name_to_code = {}
+        self.normalized_to_code = {}
+        self._sorted_names = []
+        # 부분·초성 검색용 색인 (항목 목록, 종목명 색인 문자열·시작 위치, 초성 색인 문자열·시작 위치, 종목코드 목록)
+        # 색인을 다시 만드는 동안에도 검색이 일관되도록 한 번에 교체
+        self._search = ((), "", [], "", [], [])
+        self._build_attempted_on = None
+
+    def _set_entries(self, entries, trading_date, built_on):
+        self.trading_date = trading_date
+        self.built_on = built_on
+        self.code_to_name = {code: entry["name"] for code, entry in entries.items()}
+        self.code_to_market = {code: entry.get("market") for code, entry in entries.items()}
+        self.name_to_code = {entry["name"]: code for code, entry in entries.items()}
+        self.normalized_to_code = {}
+        for code, entry in entries.items():
+            self.normalized_to_code.setdefault(normalize_stock_name(entry["name"]), code)
+        self._sorted_names = sorted(self.normalized_to_code.items())
+
+        # 종목코드 순으로 정렬된 (종목코드, 종목명, 시장, 정규화된 종목명)
+        search_entries = tuple(sorted(
+            (code, entry["name"], entry.get("market"), normalize_stock_name(entry["name"]))
+            for code, entry in entries.items()
+        ))
+        names_blob, name_offsets = _build_blob([entry[3] for entry in search_entries])
+        initials_blob, initial_offsets = _build_blob([to_choseong(entry[3]) for entry in search_entries])
+        self._search = (search_entries, names_blob, name_offsets, initials_blob, initial_offsets,
+                        [entry[0] for entry in search_entries])
+
+    @property
+    def is_loaded(self):
+        return bool(self.code_to_name)
+
+    def is_stale(self, today=None):
+        """오늘 생성된 색인이 아니면 True를 반환합니다."""
+        today = today or datetime.now().strftime("%Y%m%d")
+        return self.built_on != today
+
+    def load(self):
+        """디스크에 저장된 색인을 읽습니다."""
+        try:
+            if not os.path.exists(self.path):
+                return False
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._set_entries(data["entries"], data.get("trading_date"), data.get("built_on"))
+            return True
+        except Exception as e:
+            logger.error(f"종목 색인 로딩 실패 ({self.path}): {str(e)}")
+            return False
+
+    def save(self):
+        """색인을 디스크에 저장합니다. (임시 파일 작성 후 교체)"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {
+            "trading_date": self.trading_date,
+            "built_on": self.built_on,
+            "entries": {
+                code: {"name": name, "market": self.code_to_market.get(code)}
+                for code, name in self.code_to_name.items()
+            },
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def build(self, lock=None):
+        """pykrx 상장 종목 목록으로 색인을 새로 생성하고 저장합니다.
+
+        lock이 주어지면 pykrx 조회(수천 건)는 잠금 없이 하고 결과를 교체·저장할 때만 잠급니다.
+        """
+        entries, trading_date = fetch_listed_entries()
+        with lock or contextlib.nullcontext():
+            self._set_entries(entries, trading_date, datetime.now().strftime("%Y%m%d"))
+            self.save()
+        logger.info(f"종목 색인 생성 완료: {len(entries)}개 종목 (기준일 {trading_date})")
+
+    def get_name(self, stock_code):
+        """종목코드로 종목명을 조회합니다."""
+        return self.code_to_name.get(stock_code)
+
+    def get_code(self, stock_name):
+        """종목명(정확히 일치 또는 정규화 일치)으로 종목코드를 조회합니다."""
+        if stock_name in self.name_to_code:
+            return self.name_to_code[stock_name]
+        return self.normalized_to_code.get(normalize_stock_name(stock_name))
+
+    def search_prefix(self, prefix, limit=20):
+        """정규화된 종목명이 prefix로 시작하는 (종목코드, 종목명) 목록을 반환합니다."""
+        key = normalize_stock_name(prefix)
+        if not key:
+            return []
+        results = []
+        start = bisect.bisect_left(self._sorted_names, (key, ""))
+        for normalized, code in self._sorted_names[start:]:
+            if not normalized.startswith(key) or len(results) >= limit:
+                break
+            results.append((code, self.code_to_name[code]))
+        return results
+
+    def search(self, query, limit=20):
+        """종목명 앞부분·부분 일치, 초성 일치, 종목코드 앞부분 일치로 종목을 찾습니다.
+
+        반환: [{"stock_code", "stock_name", "market", "match"}] (완전 일치 → 앞부분 → 부분 일치 순,
+        같은 순위는 짧은 종목명 순). DB나 pykrx 없이 메모리 색인만 조회합니다.
+        """
+        entries, names_blob, name_offsets, initials_blob, initial_offsets, codes = self._search
+        query = (query or "").strip()
+        if not query:
+            return []
+
+        if query.isdigit():
+            # 종목코드 순으로 정렬되어 있으므로 앞부분 일치 구간만 읽음
+            start = bisect.bisect_left(codes, query)
+            hits = []
+            for position in range(start, min(start + limit, len(codes))):
+                if not codes[position].startswith(query):
+                    break
+                hits.append((position, EXACT if codes[position] == query else PREFIX))
+        else:
+            if is_choseong_query(query):
+                # NFKC 정규화는 호환용 자모를 바꾸므로 초성 검색어는 공백만 제거
+                key = _SPACE_PATTERN.sub("", query)
+                blob, offsets = initials_blob, initial_offsets
+            else:
+                key = normalize_stock_name(query)
+                blob, offsets = names_blob, name_offsets
+            if not key:
+                return []
+            hits = []
+            for position, offset in _find_matches(blob, offsets, key).items():
+                if offset:
+                    kind = INFIX
+                elif len(entries[position][3]) == len(key):
+                    kind = EXACT
+                else:
+                    kind = PREFIX
+                hits.append((position, kind))
+            hits.sort(key=lambda hit: (_MATCH_RANK[hit[1]], len(entries[hit[0]][1]), entries[hit[0]][1]))
+
+        return [
+            {"stock_code": entries[position][0], "stock_name": entries[position][1],
+             "market": entries[position][2], "match": kind}
+            for position, kind in hits[:limit]
+        ]
+
+
+_index = None
+# 색인 객체 생성·파일 로딩과 재생성 결과 교체에만 사용 (pykrx 조회 중에는 잡지 않음)
+_index_lock = threading.Lock()
+_rebuild_thread = None
+
+
+def _rebuild(index):
+    try:
+        index.build(lock=_index_lock)
+    except Exception as e:
+        logger.error(f"종목 색인 생성 실패, 기존 색인 사용: {str(e)}")
+
+
+def _start_rebuild(index):
+    """오늘자 색인이 아니면 백그라운드 재생성을 시작합니다. (_index_lock을 잡은 상태에서 호출)
+
+    반환: 진행 중인 재생성 스레드 (없으면 None). 생성에 실패해도 같은 날 다시 시도하지 않습니다.
+    """
+    global _rebuild_thread
+    if _rebuild_thread is not None and _rebuild_thread.is_alive():
+        return _rebuild_thread
+    today = datetime.now().strftime("%Y%m%d")
+    if not index.is_stale(today) or index._build_attempted_on == today:
+        return None
+    index._build_attempted_on = today
+    _rebuild_thread = threading.Thread(target=_rebuild, args=(index,), name="ticker-index-rebuild", daemon=True)
+    _rebuild_thread.start()
+    return _rebuild_thread
+
+
+def _loaded_index():
+    """프로세스 공용 색인 객체를 준비합니다. (_index_lock을 잡은 상태에서 호출)"""
+    global _index
+    if _index is None:
+        _index = TickerIndex()
+    if not _index.is_loaded:
+        _index.load()
+    return _index
+
+
+def get_ticker_index(wait=False):
+    """프로세스 공용 색인을 반환합니다.
+
+    날짜가 바뀌면 백그라운드에서 다시 만들고, 그동안은 기존(전날) 색인으로 응답합니다.
+    wait=True이면 재생성이 끝날 때까지 기다립니다. (수집 파이프라인용, 색인이 아예 없을 때도 기다림)
+    """
+    with _index_lock:
+        index = _loaded_index()
+        rebuild = _start_rebuild(index)
+    if rebuild is not None and (wait or not index.is_loaded):
+        rebuild.join()
+    return index
+
+
+def start_ticker_index_refresh():
+    """저장된 색인이 없거나 오늘자가 아니면 백그라운드 재생성을 시작하고 바로 반환합니다. (API 시작 시 호출)"""
+    with _index_lock:
+        _start_rebuild(_loaded_index())
+
+
+def get_search_index():
+    """검색용 프로세스 공용 색인을 반환합니다.
+
+    저장된 색인 파일만 읽으며, 오래된 색인이어도 pykrx로 다시 만들지 않습니다.
+    (재생성은 start_ticker_index_refresh()·get_ticker_index()의 백그라운드 스레드에서 수행)
+    """
+    # 불러온 뒤에는 잠금 없이 반환
+    index = _index
+    if index is not None and index.is_loaded:
+        return index
+    with _index_lock:
+        return _loaded_index()
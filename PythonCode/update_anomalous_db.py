@@ -3,6 +3,7 @@ import json
 import logging
 import glob
 import os
+from data_version import bump_data_version, ANALYSIS
 
 # 로깅 설정
 logging.basicConfig(
@@ -141,6 +142,7 @@ def update_anomalous_db_structure():
         
         conn.commit()
         conn.close()
+        bump_data_version(ANALYSIS)
         
         logger.info(f"✅ anomalousList.db에 {inserted_count}개 종목 상세 데이터 삽입 완료")
         
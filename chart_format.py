@@ -0,0 +1,101 @@
+from datetime import date
+from typing import Optional
+
+import msgpack
+import numpy as np
+import orjson
+from fastapi import HTTPException, Request
+from starlette.responses import Response
+
+# 응답 형식
+#  - rows: 행마다 dict인 기존 JSON 목록 (기본값)
+#  - columnar: {"date": [...], 필드: [...]} 형태의 열 단위 JSON
+#  - msgpack: columnar와 같은 구조의 MessagePack
+#  - arrow: Arrow IPC 스트림 (필드별 컬럼, date는 date32)
+ROWS = "rows"
+COLUMNAR = "columnar"
+MSGPACK = "msgpack"
+ARROW = "arrow"
+
+MEDIA_TYPES = {
+    ROWS: "application/json",
+    COLUMNAR: "application/json",
+    MSGPACK: "application/x-msgpack",
+    ARROW: "application/vnd.apache.arrow.stream",
+}
+
+# format 파라미터가 없을 때 Accept 헤더로 고르는 형식
+ACCEPT_FORMATS = {
+    "application/vnd.kstock.columnar+json": COLUMNAR,
+    "application/x-msgpack": MSGPACK,
+    "application/msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    "application/vnd.apache.arrow.stream": ARROW,
+}
+
+DATE_FIELD = "date"
+
+
+def get_chart_format(request: Request, format: Optional[str] = None) -> str:
+    """format 쿼리 파라미터, 없으면 Accept 헤더로 응답 형식을 정합니다. (FastAPI 의존성)"""
+    if format:
+        if format not in MEDIA_TYPES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported format: {format} (choose from {', '.join(MEDIA_TYPES)})"
+            )
+        return format
+    for media_range in request.headers.get("accept", "").split(","):
+        chosen = ACCEPT_FORMATS.get(media_range.split(";")[0].strip().lower())
+        if chosen:
+            return chosen
+    return ROWS
+
+
+def result_to_columns(keys, rows):
+    """DB 조회 결과(컬럼명, 행 목록)를 필드별 값 목록 dict로 변환합니다.
+
+    날짜는 YYYY-MM-DD, 일시는 ISO 8601 문자열로 바꿉니다. (첫 값이 NULL인 컬럼도 값마다 확인)
+    """
+    columns = {key: list(values) for key, values in zip(keys, zip(*rows))} if rows else {key: [] for key in keys}
+    for key, values in columns.items():
+        if any(isinstance(value, date) for value in values):
+            columns[key] = [value.isoformat() if isinstance(value, date) else value for value in values]
+    return columns
+
+
+def _to_arrow(columns):
+    # Arrow 형식 요청에서만 필요하므로 처음 사용할 때 불러옴
+    import pyarrow as pa
+
+    arrays = {}
+    for field, values in columns.items():
+        if field == DATE_FIELD:
+            arrays[field] = pa.array(np.array(values, dtype="datetime64[D]"))
+        else:
+            arrays[field] = pa.array(values)
+    table = pa.table(arrays)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def render_rows(rows, envelope=None):
+    """행 dict 목록을 orjson으로 직렬화한 JSON 응답으로 만듭니다."""
+    payload = {envelope: rows} if envelope else rows
+    return Response(content=orjson.dumps(payload), media_type=MEDIA_TYPES[ROWS])
+
+
+def render_columns(columns, fmt, envelope=None):
+    """필드별 값 목록을 요청한 형식의 응답으로 만듭니다.
+
+    envelope가 주어지면 JSON/MessagePack 본문을 {envelope: columns}로 감쌉니다.
+    (기존 응답이 {"data": [...]} 형태인 엔드포인트용, Arrow는 테이블 자체를 반환)
+    """
+    if fmt == ARROW:
+        body = _to_arrow(columns)
+    else:
+        payload = {envelope: columns} if envelope else columns
+        body = msgpack.packb(payload) if fmt == MSGPACK else orjson.dumps(payload)
+    return Response(content=body, media_type=MEDIA_TYPES[fmt])
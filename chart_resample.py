@@ -0,0 +1,163 @@
+import numpy as np
+
+from mmap_store import DATE_FIELD, FIELDS
+
+DAILY = "daily"
+WEEKLY = "weekly"
+MONTHLY = "monthly"
+AUTO = "auto"
+RESOLUTIONS = (DAILY, WEEKLY, MONTHLY, AUTO)
+RESOLUTION_PATTERN = f"^({'|'.join(RESOLUTIONS)})$"
+
+# 주·월 봉으로 묶을 때 필드별 집계 방법 (정의되지 않은 필드는 기간의 마지막 값)
+#  - first/last: 기간의 첫/마지막 거래일 값, max/min: 최댓값/최솟값, sum: 합계
+#  - compound: 일별 등락률(%)을 복리로 누적한 기간 등락률
+AGGREGATIONS = {
+    'open_price': 'first',
+    'high_price': 'max',
+    'low_price': 'min',
+    'close_price': 'last',
+    'volume': 'sum',
+    'trading_value': 'sum',
+    'change_rate': 'compound',
+    'institution_total': 'sum',
+    'other_corporation': 'sum',
+    'individual': 'sum',
+    'foreign_total': 'sum',
+}
+
+# 선 차트 다운샘플링 기준 필드
+LTTB_FIELD = 'close_price'
+
+
+def series_from_rows(keys, rows):
+    """DB 조회 결과를 시계열 저장소 read()와 같은 {필드: 배열} dict로 변환합니다.
+
+    날짜와 시계열 필드(mmap_store.FIELDS)만 남기며 날짜 오름차순으로 정렬합니다.
+    """
+    columns = dict(zip(keys, zip(*rows))) if rows else {key: () for key in keys}
+    dates = np.array([str(value)[:10] for value in columns[DATE_FIELD]], dtype='datetime64[D]')
+    order = np.argsort(dates, kind='stable')
+    series = {DATE_FIELD: dates[order]}
+    for field in keys:
+        if field in FIELDS:
+            series[field] = np.array(columns[field], dtype='float64')[order]
+    return series
+
+
+def _period_keys(dates, resolution):
+    days = dates.astype('int64')
+    if resolution == WEEKLY:
+        # 1970-01-01은 목요일이므로 3일을 더해 월요일 기준 주 번호로 변환
+        return (days + 3) // 7
+    return dates.astype('datetime64[M]').astype('int64')
+
+
+def _nan_reduceat(ufunc, values, starts):
+    """결측을 제외하고 구간별로 집계합니다. 구간의 값이 모두 결측이면 NaN"""
+    valid = ~np.isnan(values)
+    counts = np.add.reduceat(valid.astype('int64'), starts)
+    if ufunc.identity is not None:
+        # 합·곱은 결측을 항등원으로 바꿔 집계 (fmax/fmin은 결측을 스스로 무시)
+        values = np.where(valid, values, float(ufunc.identity))
+    result = ufunc.reduceat(values, starts)
+    result[counts == 0] = np.nan
+    return result
+
+
+def resample_ohlc(series, resolution):
+    """일봉 시계열을 주봉/월봉으로 집계합니다. 각 봉의 날짜는 기간의 첫 거래일입니다."""
+    dates = series[DATE_FIELD]
+    if resolution == DAILY or len(dates) == 0:
+        return series
+    keys = _period_keys(dates, resolution)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    ends = np.concatenate((starts[1:], [len(dates)])) - 1
+
+    resampled = {DATE_FIELD: dates[starts]}
+    for field, values in series.items():
+        if field == DATE_FIELD:
+            continue
+        method = AGGREGATIONS.get(field, 'last')
+        if method == 'first':
+            resampled[field] = values[starts]
+        elif method == 'max':
+            resampled[field] = _nan_reduceat(np.fmax, values, starts)
+        elif method == 'min':
+            resampled[field] = _nan_reduceat(np.fmin, values, starts)
+        elif method == 'sum':
+            resampled[field] = _nan_reduceat(np.add, values, starts)
+        elif method == 'compound':
+            growth = _nan_reduceat(np.multiply, 1.0 + np.asarray(values) / 100.0, starts)
+            resampled[field] = (growth - 1.0) * 100.0
+        else:
+            resampled[field] = values[ends]
+    return resampled
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets로 선택한 점의 인덱스를 반환합니다. (첫 점과 마지막 점 포함)"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # 결측은 직전 값으로 채우고, 앞부분 결측은 첫 유효값으로 채움
+    y = np.asarray(y, dtype='float64')
+    missing = np.isnan(y)
+    if missing.all():
+        y = np.zeros(n)
+    elif missing.any():
+        filled = np.where(missing, 0, np.arange(n))
+        np.maximum.accumulate(filled, out=filled)
+        y = y[filled]
+        y[:np.argmax(~missing)] = y[np.argmax(~missing)]
+    x = np.asarray(x, dtype='float64')
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype('int64')
+    selected = np.empty(threshold, dtype='int64')
+    selected[0] = 0
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # 다음 버킷의 평균점 (마지막 버킷은 마지막 점)
+        if i + 2 < len(edges):
+            next_end = edges[i + 2]
+            avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return selected
+
+
+def reduce_series(series, points=None, resolution=DAILY):
+    """시계열을 요청한 해상도로 집계하고, points보다 많으면 LTTB로 줄입니다.
+
+    resolution='auto'이면 points 안에 들어오는 가장 촘촘한 해상도(일→주→월)를 고릅니다.
+    """
+    if resolution == AUTO:
+        if points:
+            for candidate in (DAILY, WEEKLY, MONTHLY):
+                resampled = resample_ohlc(series, candidate)
+                if len(resampled[DATE_FIELD]) <= points:
+                    break
+            series = resampled
+    else:
+        series = resample_ohlc(series, resolution)
+
+    if points and len(series[DATE_FIELD]) > points:
+        y = series.get(LTTB_FIELD)
+        if y is None:
+            # 기준 필드가 없으면 첫 번째 값 필드를 사용
+            y = next((values for field, values in series.items() if field != DATE_FIELD), None)
+        if y is None:
+            indices = np.linspace(0, len(series[DATE_FIELD]) - 1, points).astype('int64')
+        else:
+            indices = lttb_indices(series[DATE_FIELD].astype('int64'), y, points)
+        series = {field: values[indices] for field, values in series.items()}
+    return series
@@ -0,0 +1,92 @@
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+
+from data_version import bump_data_version, shared_version_bump, ANALYSIS
+
+VIEW = "dashboard_summary"
+
+# 고위험 종목 기준 (manipulation_stocks.위험도점수)
+HIGH_RISK_SCORE = 7
+# 최근 이상 종목 목록 길이
+NEWEST_ANOMALIES_LIMIT = 10
+
+# 대시보드 요약 한 행 (summary: 응답 본문 그대로의 JSON)
+#  - risk_distribution: 종목별 최신 분석의 위험도 등급별 종목 수
+#  - category_counts: 작전주 분류별 종목 수
+#  - newest_anomalies: 최신 분석이 NORMAL이 아닌 종목 중 최근 분석순
+SUMMARY_SELECT = f"""
+    WITH latest AS (
+        SELECT DISTINCT ON (stock_code)
+               stock_code, stock_name, risk_level, risk_score, manipulation_type, created_at
+        FROM manipulation_analysis
+        ORDER BY stock_code, created_at DESC
+    )
+    SELECT 1 AS id, jsonb_build_object(
+        'total_stocks', (SELECT COUNT(*) FROM manipulation_stocks),
+        'high_risk_stocks', (SELECT COUNT(*) FROM manipulation_stocks WHERE 위험도점수 >= {HIGH_RISK_SCORE}),
+        'collected_stocks', (SELECT COUNT(*) FROM collection_stocks),
+        'analyzed_stocks', (SELECT COUNT(*) FROM latest),
+        'risk_distribution', COALESCE((
+            SELECT jsonb_object_agg(risk_level, stock_count)
+            FROM (SELECT COALESCE(risk_level, 'UNKNOWN') AS risk_level, COUNT(*) AS stock_count
+                  FROM latest GROUP BY 1) levels
+        ), '{{}}'::jsonb),
+        'category_counts', COALESCE((
+            SELECT jsonb_object_agg(category, stock_count)
+            FROM (SELECT COALESCE(category, '미분류') AS category, COUNT(*) AS stock_count
+                  FROM manipulation_stocks GROUP BY 1) categories
+        ), '{{}}'::jsonb),
+        'latest_analysis_date', (SELECT to_char(MAX(created_at), 'YYYY-MM-DD') FROM manipulation_analysis),
+        'latest_collection_date', (SELECT to_char(MAX(date), 'YYYY-MM-DD') FROM stock_daily_data),
+        'newest_anomalies', COALESCE((
+            SELECT jsonb_agg(anomaly ORDER BY anomaly.analyzed_at DESC)
+            FROM (SELECT stock_code, stock_name, risk_level, risk_score, manipulation_type,
+                         to_char(created_at, 'YYYY-MM-DD"T"HH24:MI:SS') AS analyzed_at
+                  FROM latest
+                  WHERE risk_level IS NOT NULL AND risk_level <> 'NORMAL'
+                  ORDER BY created_at DESC
+                  LIMIT {NEWEST_ANOMALIES_LIMIT}) anomaly
+        ), '[]'::jsonb),
+        'refreshed_at', to_char(now(), 'YYYY-MM-DD"T"HH24:MI:SS')
+    ) AS summary
+"""
+
+CREATE_VIEW_SQL = f"CREATE MATERIALIZED VIEW IF NOT EXISTS {VIEW} AS {SUMMARY_SELECT}"
+# 동시 갱신(CONCURRENTLY)에 필요한 고유 인덱스
+CREATE_INDEX_SQL = f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{VIEW}_id ON {VIEW} (id)"
+# 갱신 중에도 조회를 막지 않음
+REFRESH_SQL = f"REFRESH MATERIALIZED VIEW CONCURRENTLY {VIEW}"
+
+
+def create_dashboard_summary(connection):
+    """요약 구체화 뷰와 인덱스를 만듭니다. (동기 연결, init_db.py에서 호출)"""
+    connection.execute(text(CREATE_VIEW_SQL))
+    connection.execute(text(CREATE_INDEX_SQL))
+
+
+def refresh_dashboard_summary_sync(engine):
+    """요약을 다시 집계합니다. (동기 엔진, 마이그레이션 스크립트용)"""
+    with engine.begin() as connection:
+        connection.execute(text(REFRESH_SQL))
+        connection.execute(*shared_version_bump(ANALYSIS))
+    bump_data_version(ANALYSIS)
+
+
+async def refresh_dashboard_summary(db):
+    """요약을 다시 집계하고 분석 데이터 버전을 올립니다. (비동기 세션)"""
+    await db.execute(text(REFRESH_SQL))
+    await db.execute(*shared_version_bump(ANALYSIS))
+    await db.commit()
+    bump_data_version(ANALYSIS)
+
+
+async def read_dashboard_summary(db):
+    """요약 JSON 문자열을 반환합니다.
+
+    구체화 뷰 한 행만 읽으며, 뷰가 아직 없으면 같은 집계를 바로 실행합니다.
+    """
+    try:
+        return (await db.execute(text(f"SELECT summary::text FROM {VIEW} WHERE id = 1"))).scalar()
+    except ProgrammingError:
+        await db.rollback()
+        return (await db.execute(text(f"SELECT summary::text FROM ({SUMMARY_SELECT}) live"))).scalar()
@@ -1,5 +1,7 @@
 import os
+import re
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -24,9 +26,27 @@ else:
 if not SQLALCHEMY_DATABASE_URL:
     raise RuntimeError("DATABASE_URL environment variable not set")
 
+# 비동기 엔드포인트용 연결 풀 크기
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+def make_async_url(url):
+    """동기 드라이버 URL을 asyncpg URL로 변환합니다."""
+    url = re.sub(r"^postgres(ql)?(\+\w+)?://", "postgresql+asyncpg://", url)
+    # asyncpg는 sslmode 대신 ssl 파라미터를 사용
+    return url.replace("sslmode=", "ssl=")
+
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    make_async_url(SQLALCHEMY_DATABASE_URL),
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
 Base = declarative_base()
 
 # DB 세션 생성 함수
@@ -36,3 +56,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# 비동기 DB 세션 생성 함수 (조회 엔드포인트용)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
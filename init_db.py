@@ -0,0 +1,44 @@
+from sqlalchemy.schema import CreateIndex
+
+from database import Base, engine
+import models  # noqa: F401  모델을 Base 메타데이터에 등록
+from dashboard_summary import create_dashboard_summary, VIEW
+from schema_upgrades import run_column_upgrades, run_pre_index_upgrades
+
+
+def create_indexes(bind):
+    """models.py에 선언된 모든 인덱스를 없을 때만 만들고, 확인한 인덱스 이름 목록을 반환합니다.
+
+    create_all은 이미 있는 테이블의 인덱스를 만들지 않으므로, 기존 테이블에 나중에 추가한
+    인덱스(키셋 페이지 조회용 등)는 여기서 CREATE INDEX IF NOT EXISTS로 따로 만듭니다.
+    """
+    names = []
+    with bind.begin() as connection:
+        run_pre_index_upgrades(connection)
+        for table in Base.metadata.sorted_tables:
+            for index in sorted(table.indexes, key=lambda ix: ix.name):
+                connection.execute(CreateIndex(index, if_not_exists=True))
+                names.append(index.name)
+    return names
+
+
+def init_db():
+    """models.py의 테이블과 인덱스를 PostgreSQL에 생성합니다.
+
+    없는 테이블은 인덱스와 함께 만들고, 이미 있는 테이블에는 컬럼 기본값·타입을 맞추고 빠진 인덱스만 추가합니다.
+    API 시작 경로에서 원격 DB 왕복을 없애기 위해 배포 단계에서 한 번 실행합니다.
+    """
+    Base.metadata.create_all(bind=engine)
+    print(f"✅ 테이블 확인/생성 완료: {', '.join(sorted(Base.metadata.tables))}")
+    with engine.begin() as connection:
+        run_column_upgrades(connection)
+    print("✅ 컬럼 기본값·타입 확인 완료")
+    indexes = create_indexes(engine)
+    print(f"✅ 인덱스 확인/생성 완료: {len(indexes)}개")
+    with engine.begin() as connection:
+        create_dashboard_summary(connection)
+    print(f"✅ 구체화 뷰 확인/생성 완료: {VIEW}")
+
+
+if __name__ == "__main__":
+    init_db()
@@ -0,0 +1,308 @@
+import asyncio
+import os
+import socket
+import sys
+from collections import deque
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from database import AsyncSessionLocal, SQLALCHEMY_DATABASE_URL
+from data_version import bump_data_version, shared_version_bump, COLLECTION
+
+PYTHON_CODE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "PythonCode")
+
+# 동시에 실행하는 작업 수 / 대기 작업 확인 주기(초) / 단계별 제한 시간(초)
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "2"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "5"))
+JOB_STEP_TIMEOUT = float(os.getenv("JOB_STEP_TIMEOUT", "1800"))
+# 실행 중 작업의 생존 신호 주기와, 신호가 끊긴 작업을 다른 작업자가 다시 가져가는 기준(초)
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "10"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "120"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# 작업 단계
+#  - resolve_name: 종목명이 없으면 종목 색인으로 조회해 collection_stocks에 기록
+#  - collect: stock_scrap.py <종목코드> --no-ledger --publish
+#             (수집 원장 없이 항상 새로 수집해 API DB completed_stocks·stock_daily_data·surge_events에 반영)
+#  - analyze: analyze_patterns.py <종목코드> --publish
+#             (패턴 분석 결과를 API DB manipulation_analysis에 추가하고 대시보드 요약 갱신)
+#  - verify: 이번 작업이 쓴 completed_stocks·manipulation_analysis 행이 API DB에 있는지 확인
+#            (스크립트의 로컬 파일은 배포 환경에서 사라질 수 있으므로 API가 읽는 DB 기준으로 성공 판정)
+RESOLVE_NAME = "resolve_name"
+COLLECT = "collect"
+ANALYZE = "analyze"
+VERIFY = "verify"
+
+# 작업 종류 → 실행할 단계 목록
+ADD_STOCK = "add_stock"
+REFRESH_STOCK = "refresh_stock"
+JOB_STEPS = {
+    ADD_STOCK: (RESOLVE_NAME, COLLECT, ANALYZE, VERIFY),
+    REFRESH_STOCK: (COLLECT, ANALYZE, VERIFY),
+}
+
+# 단계 → (스크립트, 종목코드 뒤에 붙일 인자)
+# 같은 날 이미 수집한 종목도 갱신 요청이면 다시 수집해야 하므로 collect는 원장을 쓰지 않음
+STEP_SCRIPTS = {
+    COLLECT: ("stock_scrap.py", "--no-ledger", "--publish"),
+    ANALYZE: ("analyze_patterns.py", "--publish"),
+}
+
+# 작업 시작 이후 API DB에 쓰인 종목 행이 있는지 (게시 시각은 DB 기본값·CURRENT_TIMESTAMP로 기록됨)
+VERIFY_SQL = """
+    SELECT
+        EXISTS (
+            SELECT 1 FROM completed_stocks c
+            WHERE c.stock_code = j.stock_code AND c.updated_at >= j.started_at
+        ) AS collected,
+        EXISTS (
+            SELECT 1 FROM manipulation_analysis a
+            WHERE a.stock_code = j.stock_code AND a.created_at >= j.started_at
+        ) AS analyzed
+    FROM background_jobs j
+    WHERE j.id = :id
+"""
+
+# 작업 메시지로 남기는 마지막 출력 줄 길이 / 실패 시 오류로 남기는 출력 줄 수
+MESSAGE_MAX_LENGTH = 500
+ERROR_TAIL_LINES = 20
+
+JOB_COLUMNS = """
+    id, job_type, stock_code, stock_name, status, step, progress, message, error,
+    attempts, created_at, started_at, finished_at, updated_at
+"""
+
+
+class StepFailed(Exception):
+    pass
+
+
+async def enqueue_job(db, job_type, stock_code, stock_name=None):
+    """작업을 대기열에 넣고 작업 id를 반환합니다. (커밋은 호출하는 쪽에서)"""
+    result = await db.execute(text("""
+        INSERT INTO background_jobs (job_type, stock_code, stock_name, status, progress, attempts, created_at, updated_at)
+        VALUES (:job_type, :stock_code, :stock_name, :status, 0, 0, now(), now())
+        RETURNING id
+    """), {"job_type": job_type, "stock_code": stock_code, "stock_name": stock_name, "status": QUEUED})
+    return result.scalar_one()
+
+
+async def get_job(db, job_id):
+    result = await db.execute(text(f"SELECT {JOB_COLUMNS} FROM background_jobs WHERE id = :id"), {"id": job_id})
+    row = result.first()
+    return dict(row._mapping) if row else None
+
+
+async def list_jobs(db, status=None, stock_code=None, limit=50):
+    """최근 작업 목록 (최신순)"""
+    conditions = []
+    params = {"limit": limit}
+    if status:
+        conditions.append("status = :status")
+        params["status"] = status
+    if stock_code:
+        conditions.append("stock_code = :stock_code")
+        params["stock_code"] = stock_code
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    result = await db.execute(
+        text(f"SELECT {JOB_COLUMNS} FROM background_jobs {where} ORDER BY id DESC LIMIT :limit"), params
+    )
+    return [dict(row._mapping) for row in result]
+
+
+class JobQueue:
+    """background_jobs 테이블을 대기열로 쓰는 프로세스 내 작업 실행기
+
+    작업자 JOB_CONCURRENCY개가 대기 작업을 FOR UPDATE SKIP LOCKED로 하나씩 가져가므로
+    API 프로세스가 여러 개여도 한 작업은 한 곳에서만 실행됩니다.
+    수집·분석 단계는 기존 스크립트를 비동기 자식 프로세스로 실행해 API 작업자를 막지 않으며,
+    실행 중에는 updated_at을 주기적으로 갱신하고, 갱신이 끊긴 작업(프로세스 종료 등)은
+    JOB_STALE_SECONDS 뒤 다른 작업자가 현재 단계부터 다시 실행합니다.
+    """
+
+    def __init__(self, resolve_name=None, concurrency=JOB_CONCURRENCY):
+        # resolve_name: 종목코드 → 종목명 (동기 함수, 스레드풀에서 실행)
+        self.resolve_name = resolve_name
+        self.concurrency = concurrency
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._wakeup = None
+        self._tasks = []
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """새 작업이 들어왔음을 작업자에게 알립니다. (다음 확인 주기를 기다리지 않음)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _worker(self):
+        while True:
+            try:
+                job = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"작업 대기열 조회 실패: {str(e)}")
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _claim(self):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(text("""
+                UPDATE background_jobs
+                SET status = :running, attempts = attempts + 1, worker = :worker,
+                    started_at = COALESCE(started_at, now()), updated_at = now()
+                WHERE id = (
+                    SELECT id FROM background_jobs
+                    WHERE status = :queued
+                       OR (status = :running AND updated_at < now() - make_interval(secs => :stale))
+                    ORDER BY id
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, job_type, stock_code, stock_name, step, attempts
+            """), {"running": RUNNING, "queued": QUEUED, "worker": self.worker_id, "stale": JOB_STALE_SECONDS})
+            row = result.first()
+            await db.commit()
+            return dict(row._mapping) if row else None
+
+    async def _update(self, job_id, **values):
+        assignments = ", ".join(f"{column} = :{column}" for column in values)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                text(f"UPDATE background_jobs SET {assignments}, updated_at = now() WHERE id = :id"),
+                {**values, "id": job_id}
+            )
+            await db.commit()
+
+    async def _run(self, job):
+        job_id = job["id"]
+        steps = JOB_STEPS.get(job["job_type"], ())
+        if job["attempts"] > JOB_MAX_ATTEMPTS:
+            await self._finish(job_id, FAILED, error=f"최대 시도 횟수({JOB_MAX_ATTEMPTS}) 초과")
+            return
+        # 다시 가져온 작업은 중단된 단계부터 실행 (각 단계는 다시 실행해도 결과가 같음)
+        start = steps.index(job["step"]) if job["step"] in steps else 0
+        try:
+            for index in range(start, len(steps)):
+                step = steps[index]
+                await self._update(job_id, step=step, progress=int(index * 100 / len(steps)), message=None)
+                if step == RESOLVE_NAME:
+                    await self._resolve_name(job)
+                elif step == VERIFY:
+                    await self._verify(job)
+                else:
+                    script, *args = STEP_SCRIPTS[step]
+                    await self._run_script(job_id, script, job["stock_code"], *args)
+            await self._finish(job_id, SUCCEEDED)
+        except asyncio.CancelledError:
+            # 서버 종료: 상태를 running으로 남겨 두면 다른 작업자가 JOB_STALE_SECONDS 뒤 이어서 실행
+            raise
+        except Exception as e:
+            await self._finish(job_id, FAILED, error=str(e))
+
+    async def _finish(self, job_id, status, error=None):
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("""
+                UPDATE background_jobs
+                SET status = :status, error = :error, progress = COALESCE(CAST(:progress AS INTEGER), progress),
+                    finished_at = now(), updated_at = now()
+                WHERE id = :id
+            """), {"status": status, "error": error, "progress": 100 if status == SUCCEEDED else None, "id": job_id})
+            await db.commit()
+
+    async def _resolve_name(self, job):
+        if job["stock_name"] or self.resolve_name is None:
+            return
+        # 종목 색인을 처음 만드는 동안에도 오래된 작업으로 보이지 않도록 생존 신호를 남김
+        lookup = asyncio.ensure_future(run_in_threadpool(self.resolve_name, job["stock_code"]))
+        while True:
+            done, _ = await asyncio.wait({lookup}, timeout=JOB_HEARTBEAT_INTERVAL)
+            if done:
+                break
+            await self._update(job["id"], message="종목 색인 준비 중")
+        stock_name = lookup.result()
+        if not stock_name:
+            raise StepFailed(f"종목코드 {job['stock_code']}의 종목명을 찾을 수 없습니다.")
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("""
+                UPDATE collection_stocks SET stock_name = :stock_name, updated_at = CURRENT_TIMESTAMP
+                WHERE stock_code = :stock_code
+            """), {"stock_name": stock_name, "stock_code": job["stock_code"]})
+            await db.execute(text("UPDATE background_jobs SET stock_name = :stock_name WHERE id = :id"),
+                             {"stock_name": stock_name, "id": job["id"]})
+            await db.execute(*shared_version_bump(COLLECTION))
+            await db.commit()
+        job["stock_name"] = stock_name
+        bump_data_version(COLLECTION)
+
+    async def _verify(self, job):
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(text(VERIFY_SQL), {"id": job["id"]})).first()
+        if row is None or not row.collected:
+            raise StepFailed(f"종목코드 {job['stock_code']}의 수집 데이터가 API DB(completed_stocks)에 반영되지 않았습니다.")
+        if not row.analyzed:
+            raise StepFailed(f"종목코드 {job['stock_code']}의 분석 결과가 API DB(manipulation_analysis)에 반영되지 않았습니다.")
+
+    async def _run_script(self, job_id, script, stock_code, *args):
+        """PythonCode의 스크립트를 자식 프로세스로 실행하며 마지막 출력 줄을 작업 메시지로 남깁니다."""
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, script, stock_code, *args,
+            cwd=PYTHON_CODE_DIR,
+            # --publish 단계가 API와 같은 DB에 쓰도록 연결 정보를 명시적으로 전달
+            env={**os.environ, "DATABASE_URL": SQLALCHEMY_DATABASE_URL},
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        tail = deque(maxlen=ERROR_TAIL_LINES)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + JOB_STEP_TIMEOUT
+        last_heartbeat = loop.time()
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise StepFailed(f"{script} 실행 시간 초과 ({JOB_STEP_TIMEOUT:.0f}초)")
+                try:
+                    line = await asyncio.wait_for(process.stdout.readline(), min(remaining, JOB_HEARTBEAT_INTERVAL))
+                except asyncio.TimeoutError:
+                    line = None
+                if line == b"":
+                    break
+                if line:
+                    decoded = line.decode("utf-8", errors="replace").strip()
+                    if decoded:
+                        tail.append(decoded)
+                # 출력이 많아도 DB 갱신은 생존 신호 주기마다 한 번
+                if loop.time() - last_heartbeat >= JOB_HEARTBEAT_INTERVAL:
+                    await self._update(job_id, message=tail[-1][:MESSAGE_MAX_LENGTH] if tail else None)
+                    last_heartbeat = loop.time()
+            returncode = await process.wait()
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+        if returncode != 0:
+            raise StepFailed(f"{script} 실패 (종료 코드 {returncode})\n" + "\n".join(tail))
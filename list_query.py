@@ -0,0 +1,147 @@
+import base64
+import binascii
+import os
+from typing import Optional
+
+import orjson
+from fastapi import HTTPException, Query
+from sqlalchemy import text
+
+# 목록 한 페이지의 기본 / 최대 행 수
+LIST_DEFAULT_LIMIT = int(os.getenv("LIST_DEFAULT_LIMIT", "100"))
+LIST_MAX_LIMIT = int(os.getenv("LIST_MAX_LIMIT", "1000"))
+
+# 페이지 행에 덧붙여 조회하는 커서 값 컬럼 (응답에서는 제거)
+_CURSOR_SORT = "_cursor_sort"
+_CURSOR_KEY = "_cursor_key"
+
+
+class ListSpec:
+    """목록 엔드포인트 하나의 조회 정의
+
+    source: FROM 절, fields: 응답 필드 → SQL 식 (fields= 허용 목록이자 기본 응답 필드)
+    sorts: 정렬 키 → NULL이 나오지 않는 SQL 식 (커서 행 비교용), default_sort: 기본 정렬 (-는 내림차순)
+    key: 행마다 고유한 정수 식 (같은 정렬 값 사이의 순서), search: q로 검색할 (종목명 식, 종목코드 식)
+    filters: 쿼리 파라미터 → 조건 SQL (같은 이름의 바인드 파라미터 사용)
+    """
+
+    def __init__(self, source, fields, sorts, default_sort, key, search=None, filters=None):
+        self.source = source
+        self.fields = fields
+        self.sorts = sorts
+        self.default_sort = default_sort
+        self.key = key
+        self.search = search
+        self.filters = filters or {}
+
+
+class ListParams:
+    """목록 공통 쿼리 파라미터 (FastAPI 의존성)
+
+    cursor: 이전 응답의 next_cursor, limit: 페이지 크기, fields: 쉼표로 구분한 응답 필드,
+    sort: 정렬 키 (-는 내림차순), q: 종목명 부분 일치 또는 종목코드 앞부분 일치
+    """
+
+    def __init__(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = Query(LIST_DEFAULT_LIMIT, ge=1, le=LIST_MAX_LIMIT),
+        fields: Optional[str] = None,
+        sort: Optional[str] = None,
+        q: Optional[str] = None,
+    ):
+        self.cursor = cursor
+        self.limit = limit
+        self.fields = fields
+        self.sort = sort
+        self.q = q
+
+
+def encode_cursor(sort, value, key):
+    """마지막 행의 (정렬 키, 정렬 값, 고유 키)를 URL에 쓸 수 있는 커서 문자열로 만듭니다."""
+    return base64.urlsafe_b64encode(orjson.dumps([sort, value, key])).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, sort):
+    """커서 문자열을 (정렬 값, 고유 키)로 되돌립니다. 다른 정렬로 만든 커서면 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, key = orjson.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_sort != sort:
+        raise HTTPException(status_code=400, detail=f"Cursor was issued for sort={cursor_sort}")
+    return value, key
+
+
+def _split(value):
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_list_query(spec, params, filters=None):
+    """목록 한 페이지의 조회 계획 (쿼리, 바인드 파라미터, 응답 필드, 정렬, 페이지 크기)을 만듭니다.
+
+    요청한 필드만 SELECT하고, 정렬·필터·커서 조건은 모두 SQL에서 처리합니다.
+    (정렬 식, 고유 키) 행 비교로 다음 페이지를 찾으므로 몇 번째 페이지든 비용이 같습니다.
+    """
+    fields = list(dict.fromkeys(_split(params.fields))) or list(spec.fields)
+    invalid = [field for field in fields if field not in spec.fields]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(invalid)}")
+
+    sort = params.sort or spec.default_sort
+    descending = sort.startswith("-")
+    sort_key = sort[1:] if descending else sort
+    if sort_key not in spec.sorts:
+        raise HTTPException(
+            status_code=400, detail=f"Unsupported sort: {sort} (choose from {', '.join(spec.sorts)})"
+        )
+    sort_expr = spec.sorts[sort_key]
+
+    conditions = []
+    bind = {"limit": params.limit + 1}
+    for name, value in (filters or {}).items():
+        if value is not None:
+            conditions.append(spec.filters[name])
+            bind[name] = value
+    if params.q and spec.search:
+        name_expr, code_expr = spec.search
+        conditions.append(f"({name_expr} ILIKE :q_contains OR {code_expr} LIKE :q_prefix)")
+        bind["q_contains"] = f"%{_escape_like(params.q.strip())}%"
+        bind["q_prefix"] = f"{_escape_like(params.q.strip())}%"
+    if params.cursor:
+        bind["cursor_sort"], bind["cursor_key"] = decode_cursor(params.cursor, sort)
+        conditions.append(f"({sort_expr}, {spec.key}) {'<' if descending else '>'} (:cursor_sort, :cursor_key)")
+
+    direction = "DESC" if descending else "ASC"
+    projection = ", ".join(f'{spec.fields[field]} AS "{field}"' for field in fields)
+    query = text(f"""
+        SELECT {projection}, {sort_expr} AS {_CURSOR_SORT}, {spec.key} AS {_CURSOR_KEY}
+        FROM {spec.source}
+        {f"WHERE {' AND '.join(conditions)}" if conditions else ""}
+        ORDER BY {sort_expr} {direction}, {spec.key} {direction}
+        LIMIT :limit
+    """)
+    return query, bind, fields, sort, params.limit
+
+
+async def fetch_list_page(db, plan):
+    """build_list_query()로 만든 계획으로 목록 한 페이지를 조회합니다.
+
+    반환: {"data": [...], "next_cursor": 다음 페이지 커서 (마지막 페이지면 None)}
+    """
+    query, bind, fields, sort, limit = plan
+    # 한 행을 더 읽어 다음 페이지가 있는지 확인
+    rows = (await db.execute(query, bind)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    data = [dict(zip(fields, row)) for row in rows]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor(sort, last[_CURSOR_SORT], last[_CURSOR_KEY])
+    return {"data": data, "next_cursor": next_cursor}
@@ -1,25 +1,99 @@
-from fastapi import FastAPI, HTTPException, Depends
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Depends, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
-import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+import anyio
+import asyncio
 import json
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+import orjson
+from typing import List, Dict, Any, Optional
+from datetime import date, datetime, timedelta
+from functools import partial
 import os
 from pydantic import BaseModel
-import subprocess
-import yfinance as yf
-from pykrx import stock
 import re
-from database import get_db, engine, Base
+import sys
+from database import get_db, get_async_db, async_engine, engine, AsyncSessionLocal
 from sqlalchemy import text
 
+# 수집 모듈(PythonCode)의 종목 색인 공유
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "PythonCode"))
+from ticker_index import get_ticker_index, get_search_index, start_ticker_index_refresh
+from mmap_store import get_series_store, to_records, to_columns
+from data_version import bump_data_version, shared_version_bump, shared_versions, COLLECTION, ANALYSIS
+from response_cache import ResponseCache, ResponseCacheMiddleware
+from metrics import StartupTimer, MetricsMiddleware, instrument_engine, register_pool_collector, metrics_response
+from chart_format import get_chart_format, result_to_columns, render_rows, render_columns, ROWS, COLUMNAR, ARROW
+from chart_resample import reduce_series, series_from_rows, DAILY, RESOLUTION_PATTERN
+from job_queue import JobQueue, enqueue_job, get_job, list_jobs, ADD_STOCK, REFRESH_STOCK, QUEUED, RUNNING, SUCCEEDED, FAILED
+from stock_export import iter_export, resolve_export_fields, EXPORT_MEDIA_TYPES, EXPORT_EXTENSIONS, EXPORT_FORMAT_PATTERN, EXPORT_TABLE, NDJSON
+from list_query import ListSpec, ListParams, build_list_query, fetch_list_page
+from dashboard_summary import read_dashboard_summary, refresh_dashboard_summary
+from surge_events import EVENT_MAGNITUDE_SQL, rebuild_surge_events
+from surge_index import EVENT_TYPES, BASE_THRESHOLDS, SURGE, VOLUME_SPIKE
+
+# 콜드 스타트 단계별 소요 시간 (/metrics의 app_startup_phase_seconds, 첫 요청 후 로그)
+startup_timer = StartupTimer(_import_started)
+startup_timer.mark("imports")
+
 app = FastAPI(title="K-Stock Pattern API", description="주가 패턴 분석 API")
 
-# PostgreSQL에 테이블 생성
-Base.metadata.create_all(bind=engine)
+# 테이블 생성은 배포 단계의 `python init_db.py`에서 수행 (시작 시 원격 DB 왕복 제거)
+# 로컬 개발 등에서 시작 시 생성하려면 AUTO_CREATE_SCHEMA=1
+AUTO_CREATE_SCHEMA = os.getenv("AUTO_CREATE_SCHEMA", "0") == "1"
+
+# 동기 작업(동기 세션 엔드포인트, 종목 색인 갱신 등)을 실행하는 스레드풀 크기
+BLOCKING_THREADS = int(os.getenv("BLOCKING_THREADS", "8"))
+
+@app.on_event("startup")
+async def configure_threadpool():
+    # 동기 엔드포인트와 run_in_threadpool이 공유하는 기본 스레드 제한을 환경변수 크기로 고정
+    anyio.to_thread.current_default_thread_limiter().total_tokens = BLOCKING_THREADS
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
+# 조회 응답 캐시 (경로 접두사 → 의존하는 데이터 범위)
+# 수집·분석 작업이 커밋 후 데이터 버전을 올리면 해당 범위의 항목이 무효화됨
+# CORS 헤더가 캐시된 응답에도 붙도록 CORS 미들웨어보다 먼저 등록(안쪽에 위치)
+CACHED_ROUTE_SCOPES = {
+    "/api/stocks": (COLLECTION, ANALYSIS),
+    "/api/dashboard/summary": (ANALYSIS,),
+    "/api/anomalous-stocks": (ANALYSIS,),
+    "/api/stock-detail/": (ANALYSIS,),
+    "/api/manipulation-criteria/": (ANALYSIS,),
+    "/api/suspect-stocks": (ANALYSIS,),
+    "/api/historical-manipulation-stocks": (ANALYSIS,),
+    "/api/collect-stocks": (COLLECTION,),
+    "/api/collect-stock-data/": (COLLECTION,),
+    "/api/collect-stock-chart/": (COLLECTION,),
+    "/api/stock-surge-dates/": (COLLECTION,),
+    "/api/surge-events": (COLLECTION,),
+    "/api/stock-data/batch": (COLLECTION,),
+}
+response_cache = ResponseCache()
+app.add_middleware(ResponseCacheMiddleware, route_scopes=CACHED_ROUTE_SCOPES, cache=response_cache)
+
+# 다른 프로세스·호스트(수집 서버, 작업 대기열 자식 프로세스, 마이그레이션)의 쓰기는
+# data_versions 테이블로 전달되므로 백그라운드에서 주기적으로 읽어 둠 (시작을 막지 않음)
+data_version_poller = None
+
+@app.on_event("startup")
+async def start_data_version_poller():
+    global data_version_poller
+    data_version_poller = asyncio.create_task(shared_versions.poll(AsyncSessionLocal))
+
+@app.on_event("shutdown")
+async def stop_data_version_poller():
+    if data_version_poller is not None:
+        data_version_poller.cancel()
 
 # CORS 설정
 app.add_middleware(
@@ -37,6 +111,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 라우트별 처리 시간·응답 크기·DB 쿼리 수/시간 계측 (캐시 적중 응답도 포함하도록 가장 바깥에 등록)
+app.add_middleware(MetricsMiddleware, startup_timer=startup_timer)
+instrument_engine(engine, "sync")
+instrument_engine(async_engine, "async")
+register_pool_collector({"sync": engine, "async": async_engine}, response_cache=response_cache)
+
 # Vue.js 정적 파일 서빙 (dist 폴더가 있을 때만)
 if os.path.exists("stock-pattern-viewer/dist"):
     app.mount("/assets", StaticFiles(directory="stock-pattern-viewer/dist/assets"), name="assets")
@@ -47,6 +127,119 @@ class AddStockRequest(BaseModel):
     stock_code: str
     stock_name: str = ""
 
+# 차트 응답 필드 (메모리 맵 시계열 저장소 필드명과 DB 컬럼명이 같음)
+CHART_FIELDS = [
+    "open_price", "high_price", "low_price", "close_price", "volume",
+    "change_rate", "market_cap", "trading_value"
+]
+INVESTOR_FIELDS = ["institution_total", "other_corporation", "individual", "foreign_total"]
+
+# 목록 엔드포인트 정의 (응답 필드 → SQL 식, 정렬 키 → NULL 없는 SQL 식, 필터 → 조건)
+# 정렬 식은 models.py의 목록 인덱스와 같은 식을 사용
+def _columns(alias, names):
+    return {name: f"{alias}.{name}" for name in names}
+
+MANIPULATION_STOCKS_LIST = ListSpec(
+    # 종목별 최신 패턴 분석만 붙임 (페이지에 포함된 종목만 조회)
+    source="""
+        manipulation_stocks m
+        LEFT JOIN LATERAL (
+            SELECT pa.risk_level, pa.risk_score FROM pattern_analysis pa
+            WHERE pa.stock_code = m.stock_code
+            ORDER BY pa.created_at DESC
+            LIMIT 1
+        ) p ON true
+    """,
+    fields={
+        **_columns("m", [
+            "id", "stock_name", "stock_code", "category", "manipulation_period", "max_rise_rate",
+            "manipulation_type", "description", "급등빈발_일수", "급등빈발_기간", "극심한급등_최대등락률",
+            "극심한급등_기간", "거래량급증빈발_일수", "거래량급증빈발_기간", "상한가근처_일수", "상한가근처_기간",
+            "평균회전율", "위험도점수", "created_at", "updated_at",
+        ]),
+        **_columns("p", ["risk_level", "risk_score"]),
+    },
+    sorts={
+        "stock_name": "COALESCE(m.stock_name, '')",
+        "stock_code": "COALESCE(m.stock_code, '')",
+        "위험도점수": "COALESCE(m.위험도점수, 0)",
+    },
+    default_sort="stock_name",
+    key="m.id",
+    search=("m.stock_name", "m.stock_code"),
+    filters={
+        "category": "m.category = :category",
+        "manipulation_type": "m.manipulation_type = :manipulation_type",
+        "risk_level": "p.risk_level = :risk_level",
+        "min_risk_score": "m.위험도점수 >= :min_risk_score",
+    },
+)
+COLLECTION_STOCKS_LIST = ListSpec(
+    source="collection_stocks c",
+    fields=_columns("c", ["id", "stock_name", "stock_code", "created_at", "updated_at"]),
+    sorts={
+        "stock_name": "COALESCE(c.stock_name, '')",
+        "stock_code": "COALESCE(c.stock_code, '')",
+    },
+    default_sort="stock_name",
+    key="c.id",
+    search=("c.stock_name", "c.stock_code"),
+)
+SUSPECT_STOCKS_LIST = ListSpec(
+    source="suspect_stocks s",
+    fields=_columns("s", [
+        "id", "stock_name", "stock_code", "suspected_period", "theme_reason", "main_issue", "active_duration",
+        "buy_side_pattern", "price_3y_ago", "price_peak", "price_current",
+    ]),
+    sorts={
+        "stock_name": "COALESCE(s.stock_name, '')",
+        "stock_code": "COALESCE(s.stock_code, '')",
+    },
+    default_sort="stock_name",
+    key="s.id",
+    search=("s.stock_name", "s.stock_code"),
+)
+HISTORICAL_MANIPULATION_STOCKS_LIST = ListSpec(
+    source="historical_manipulation_stocks h",
+    fields=_columns("h", [
+        "id", "stock_name", "stock_code", "category", "manipulation_period", "max_rise_rate",
+        "manipulation_type", "description", "created_at",
+    ]),
+    sorts={
+        "manipulation_period": "COALESCE(h.manipulation_period, '')",
+        "stock_name": "COALESCE(h.stock_name, '')",
+        "stock_code": "COALESCE(h.stock_code, '')",
+    },
+    default_sort="-manipulation_period",
+    key="h.id",
+    search=("h.stock_name", "h.stock_code"),
+    filters={
+        "category": "h.category = :category",
+        "manipulation_type": "h.manipulation_type = :manipulation_type",
+    },
+)
+
+# 차트 다운샘플링 파라미터 (points: 목표 점 개수, resolution: daily / weekly / monthly / auto)
+POINTS_QUERY = Query(None, ge=3, le=10000)
+RESOLUTION_QUERY = Query(DAILY, pattern=RESOLUTION_PATTERN)
+
+def render_series(series, fmt, envelope=None, descending=False):
+    """시계열({필드: 배열})을 요청한 형식의 응답으로 만듭니다. descending이면 최신 날짜부터"""
+    if fmt == ROWS:
+        records = to_records(series)
+        if descending:
+            records.reverse()
+        return render_rows(records, envelope=envelope)
+    columns = to_columns(series)
+    if descending:
+        columns = {field: values[::-1] for field, values in columns.items()}
+    return render_columns(columns, fmt, envelope=envelope)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus 형식 지표 (요청 처리 시간, 응답 크기, DB 쿼리, 연결 풀, 응답 캐시)"""
+    return metrics_response()
+
 @app.get("/")
 async def read_root():
     if os.path.exists("stock-pattern-viewer/dist/index.html"):
@@ -54,22 +247,30 @@ async def read_root():
     else:
         return {"message": "K-Stock Pattern API is running", "version": "1.0.0"}
 
-@app.get("/api/stocks", response_model=List[Dict[str, Any]])
-async def get_manipulation_stocks(db: Session = Depends(get_db)):
-    """등록된 작전주 목록을 반환합니다."""
+@app.get("/api/stocks")
+async def get_manipulation_stocks(
+    page: ListParams = Depends(),
+    category: Optional[str] = None,
+    manipulation_type: Optional[str] = None,
+    risk_level: Optional[str] = None,
+    min_risk_score: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """등록된 작전주 목록을 한 페이지씩 반환합니다. ({"data": [...], "next_cursor": ...})
+
+    정렬: stock_name(기본) / stock_code / 위험도점수, 필터: category, manipulation_type, risk_level, min_risk_score
+    """
+    plan = build_list_query(MANIPULATION_STOCKS_LIST, page, {
+        "category": category, "manipulation_type": manipulation_type,
+        "risk_level": risk_level, "min_risk_score": min_risk_score,
+    })
     try:
-        query = text("""
-        SELECT m.*, p.risk_level, p.risk_score 
-        FROM manipulation_stocks m 
-        LEFT JOIN pattern_analysis p ON m.stock_code = p.stock_code
-        """)
-        result = db.execute(query)
-        return [dict(row._mapping) for row in result]
+        return render_rows(await fetch_list_page(db, plan))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/stocks/{stock_code}/data")
-async def get_stock_data(stock_code: str, days: int = 365, db: Session = Depends(get_db)):
+async def get_stock_data(stock_code: str, days: int = 365, db: AsyncSession = Depends(get_async_db)):
     """특정 종목의 일별 데이터를 반환합니다."""
     try:
         # 날짜 범위 계산
@@ -82,9 +283,9 @@ async def get_stock_data(stock_code: str, days: int = 365, db: Session = Depends
         ORDER BY date ASC
         """)
         
-        result = db.execute(
+        result = await db.execute(
             query, 
-            {"stock_code": stock_code, "start_date": start_date.strftime('%Y-%m-%d')}
+            {"stock_code": stock_code, "start_date": start_date.date()}
         )
         
         rows = [dict(row._mapping) for row in result]
@@ -96,7 +297,7 @@ async def get_stock_data(stock_code: str, days: int = 365, db: Session = Depends
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/stocks/{stock_code}/pattern")
-async def get_stock_pattern(stock_code: str, db: Session = Depends(get_db)):
+async def get_stock_pattern(stock_code: str, db: AsyncSession = Depends(get_async_db)):
     """특정 종목의 패턴 분석 결과를 반환합니다."""
     try:
         query = text("""
@@ -106,7 +307,7 @@ async def get_stock_pattern(stock_code: str, db: Session = Depends(get_db)):
         LIMIT 1
         """)
         
-        result = db.execute(query, {"stock_code": stock_code}).first()
+        result = (await db.execute(query, {"stock_code": stock_code})).first()
         
         if not result:
             raise HTTPException(status_code=404, detail="Pattern analysis not found")
@@ -124,120 +325,113 @@ async def get_stock_pattern(stock_code: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/dashboard/summary")
-async def get_dashboard_summary(db: Session = Depends(get_db)):
+async def get_dashboard_summary(db: AsyncSession = Depends(get_async_db)):
+    """대시보드 요약 (종목 수, 위험도 분포, 분류별 종목 수, 최근 분석일, 최근 이상 종목)
+
+    분석 작업이 갱신하는 dashboard_summary 구체화 뷰의 한 행을 그대로 반환합니다. (종목 수와 무관하게 쿼리 1회)
+    """
     try:
-        # 작전주 통계 정보 가져오기
-        total_query = text("SELECT COUNT(*) FROM manipulation_stocks")
-        high_risk_query = text("SELECT COUNT(*) FROM manipulation_stocks WHERE 위험도점수 >= 7")
-        
-        total_anomalous = db.execute(total_query).scalar()
-        high_risk = db.execute(high_risk_query).scalar()
-        
-        return {
-            "total_stocks": total_anomalous,
-            "high_risk_stocks": high_risk,
-            "latest_analysis_date": "2024-01-15"
-        }
+        summary = await read_dashboard_summary(db)
+        return Response(content=summary, media_type="application/json")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/dashboard/summary/refresh")
+async def refresh_dashboard_summary_view(db: AsyncSession = Depends(get_async_db)):
+    """대시보드 요약을 다시 집계합니다. (파이프라인 밖에서 데이터를 바꾼 경우)"""
+    try:
+        await refresh_dashboard_summary(db)
+        return {"success": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/anomalous-stocks")
-async def get_anomalous_stocks(db: Session = Depends(get_db)):
+async def get_anomalous_stocks(db: AsyncSession = Depends(get_async_db)):
     """작전주 의심 종목 목록 가져오기"""
     try:
-        # 기본 정보 가져오기
-        base_query = text("""
-            SELECT stock_name, stock_code, manipulation_type, 급등빈발_일수, 
-                   급등빈발_기간, 극심한급등_최대등락률, 극심한급등_기간,
-                   거래량급증빈발_일수, 거래량급증빈발_기간, 위험도점수, description
-            FROM manipulation_stocks
-            ORDER BY 위험도점수 DESC
+        # 종목별 최신 분석 패턴을 DISTINCT ON으로 한 번에 조인 (종목 수와 무관하게 쿼리 1회)
+        query = text("""
+            SELECT m.stock_name, m.stock_code, m.manipulation_type, m.급등빈발_일수, 
+                   m.급등빈발_기간, m.극심한급등_최대등락률, m.극심한급등_기간,
+                   m.거래량급증빈발_일수, m.거래량급증빈발_기간, m.위험도점수, m.description,
+                   latest.analysis_patterns
+            FROM manipulation_stocks m
+            LEFT JOIN (
+                SELECT DISTINCT ON (stock_code) stock_code, analysis_patterns
+                FROM manipulation_analysis
+                ORDER BY stock_code, created_at DESC
+            ) latest ON latest.stock_code = m.stock_code
+            ORDER BY m.위험도점수 DESC
         """)
         
-        results = db.execute(base_query)
+        results = await db.execute(query)
         
         stocks = []
         for row in results:
             stock_data = dict(row._mapping)
-            stock_code = stock_data['stock_code']
-            
-            # 상세 패턴 정보 조회
-            pattern_query = text("""
-                SELECT analysis_patterns
-                FROM manipulation_analysis
-                WHERE stock_code = :stock_code
-                ORDER BY created_at DESC
-                LIMIT 1
-            """)
-            
-            pattern_result = db.execute(pattern_query, {"stock_code": stock_code}).first()
-            
-            if pattern_result and pattern_result.analysis_patterns:
-                stock_data['patterns'] = json.loads(pattern_result.analysis_patterns)
-            else:
-                stock_data['patterns'] = []
-            
+            analysis_patterns = stock_data.pop('analysis_patterns')
+            stock_data['patterns'] = json.loads(analysis_patterns) if analysis_patterns else []
             stocks.append(stock_data)
         
         return stocks
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def get_stock_with_latest_pattern(db: AsyncSession, stock_code: str):
+    """작전주 기본 정보와 최신 패턴 분석 결과를 한 번의 쿼리로 조회해 병합합니다. 없으면 None"""
+    # 두 테이블의 컬럼명이 겹치므로 행 전체를 JSON으로 받아 패턴 분석 값이 우선하도록 병합
+    query = text("""
+        SELECT to_jsonb(m) AS stock, to_jsonb(p) AS pattern
+        FROM manipulation_stocks m
+        LEFT JOIN LATERAL (
+            SELECT * FROM pattern_analysis 
+            WHERE stock_code = m.stock_code 
+            ORDER BY analysis_date DESC 
+            LIMIT 1
+        ) p ON true
+        WHERE m.stock_code = :stock_code
+        LIMIT 1
+    """)
+    row = (await db.execute(query, {"stock_code": stock_code})).first()
+    if not row:
+        return None
+    
+    stock_data = json.loads(row.stock) if isinstance(row.stock, str) else dict(row.stock)
+    if row.pattern:
+        pattern_data = json.loads(row.pattern) if isinstance(row.pattern, str) else dict(row.pattern)
+        if pattern_data.get('warnings'):
+            pattern_data['warnings'] = json.loads(pattern_data['warnings'])
+        if pattern_data.get('patterns'):
+            pattern_data['patterns'] = json.loads(pattern_data['patterns'])
+        stock_data.update(pattern_data)
+    return stock_data
+
 @app.get("/api/stock-detail/{stock_code}")
-async def get_stock_detail(stock_code: str, db: Session = Depends(get_db)):
+async def get_stock_detail(stock_code: str, db: AsyncSession = Depends(get_async_db)):
     """특정 종목의 상세 정보를 반환합니다."""
     try:
-        # 기본 정보 조회
-        base_query = text("""
-            SELECT * FROM manipulation_stocks 
-            WHERE stock_code = :stock_code
-        """)
-        
-        stock = db.execute(base_query, {"stock_code": stock_code}).first()
-        if not stock:
+        stock_data = await get_stock_with_latest_pattern(db, stock_code)
+        if not stock_data:
             raise HTTPException(status_code=404, detail="Stock not found")
         
-        stock_data = dict(stock._mapping)
-        
-        # 패턴 분석 정보 조회
-        pattern_query = text("""
-            SELECT * FROM pattern_analysis 
-            WHERE stock_code = :stock_code 
-            ORDER BY analysis_date DESC 
-            LIMIT 1
-        """)
-        
-        pattern = db.execute(pattern_query, {"stock_code": stock_code}).first()
-        if pattern:
-            pattern_data = dict(pattern._mapping)
-            if pattern_data.get('warnings'):
-                pattern_data['warnings'] = json.loads(pattern_data['warnings'])
-            if pattern_data.get('patterns'):
-                pattern_data['patterns'] = json.loads(pattern_data['patterns'])
-            stock_data.update(pattern_data)
-        
         return stock_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/stocks")
-async def get_stocks(db: Session = Depends(get_db)):
-    """모든 종목 목록을 반환합니다."""
-    try:
-        query = text("SELECT * FROM collection_stocks")
-        result = db.execute(query)
-        return [dict(row._mapping) for row in result]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
 @app.get("/api/stocks/{stock_code}/chart")
-async def get_stock_chart_data(stock_code: str, days: int = 90, db: Session = Depends(get_db)):
-    """특정 종목의 차트 데이터를 반환합니다."""
+async def get_stock_chart_data(stock_code: str, days: int = 90,
+                               points: Optional[int] = POINTS_QUERY, resolution: str = RESOLUTION_QUERY,
+                               fmt: str = Depends(get_chart_format), db: AsyncSession = Depends(get_async_db)):
+    """특정 종목의 차트 데이터를 반환합니다. (format: rows / columnar / msgpack / arrow)
+
+    resolution으로 주봉/월봉 집계, points로 LTTB 다운샘플링한 결과를 받을 수 있습니다.
+    """
     try:
         # 날짜 범위 계산
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
         
+        # 시계열 저장소는 수집 데이터(completed_stocks) 기준이므로 stock_daily_data를 읽는 이 엔드포인트에서는 사용하지 않음
         query = text("""
             SELECT date, open_price, high_price, low_price, close_price, volume, 
                    change_rate, market_cap, trading_value
@@ -246,32 +440,41 @@ async def get_stock_chart_data(stock_code: str, days: int = 90, db: Session = De
             ORDER BY date ASC
         """)
         
-        result = db.execute(
+        result = await db.execute(
             query, 
-            {"stock_code": stock_code, "start_date": start_date.strftime('%Y-%m-%d')}
+            {"stock_code": stock_code, "start_date": start_date.date()}
         )
         
-        rows = [dict(row._mapping) for row in result]
+        keys = list(result.keys())
+        rows = result.all()
         if not rows:
             raise HTTPException(status_code=404, detail="Chart data not found")
         
-        return rows
+        if points or resolution != DAILY:
+            return render_series(reduce_series(series_from_rows(keys, rows), points, resolution), fmt)
+        if fmt == ROWS:
+            return render_rows([dict(zip(keys, row)) for row in rows])
+        return render_columns(result_to_columns(keys, rows), fmt)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/collect-stocks")
-async def get_collect_stocks(db: Session = Depends(get_db)):
-    """수집 대상 종목 목록을 반환합니다."""
+async def get_collect_stocks(page: ListParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """수집 대상 종목 목록을 한 페이지씩 반환합니다. ({"data": [...], "next_cursor": ...})"""
+    plan = build_list_query(COLLECTION_STOCKS_LIST, page)
     try:
-        query = text("SELECT * FROM collection_stocks ORDER BY stock_name")
-        result = db.execute(query)
-        return [dict(row._mapping) for row in result]
+        return render_rows(await fetch_list_page(db, plan))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/collect-stock-data/{stock_code}")
-async def get_collect_stock_data(stock_code: str, limit: int = 100, db: Session = Depends(get_db)):
-    """특정 종목의 수집된 데이터를 반환합니다."""
+async def get_collect_stock_data(stock_code: str, response: Response, limit: int = 100,
+                                 points: Optional[int] = POINTS_QUERY, resolution: str = RESOLUTION_QUERY,
+                                 fmt: str = Depends(get_chart_format), db: AsyncSession = Depends(get_async_db)):
+    """특정 종목의 수집된 데이터를 반환합니다. (format: rows / columnar / msgpack / arrow)
+
+    points나 resolution을 지정하면 최근 limit건을 집계·다운샘플링하며, 날짜와 시계열 필드만 반환합니다.
+    """
     try:
         # 먼저 completed_stocks에서 조회
         query = text("""
@@ -281,8 +484,9 @@ async def get_collect_stock_data(stock_code: str, limit: int = 100, db: Session
             LIMIT :limit
         """)
         
-        result = db.execute(query, {"stock_code": stock_code, "limit": limit})
-        rows = [dict(row._mapping) for row in result]
+        result = await db.execute(query, {"stock_code": stock_code, "limit": limit})
+        keys = list(result.keys())
+        rows = result.all()
         
         # completed_stocks에 데이터가 없으면 stock_daily_data에서 조회
         if not rows:
@@ -304,26 +508,44 @@ async def get_collect_stock_data(stock_code: str, limit: int = 100, db: Session
                 LIMIT :limit
             """)
             
-            result = db.execute(query, {"stock_code": stock_code, "limit": limit})
-            rows = [dict(row._mapping) for row in result]
+            result = await db.execute(query, {"stock_code": stock_code, "limit": limit})
+            keys = list(result.keys())
+            rows = result.all()
         
         if not rows:
             print(f"API 에러 - 종목코드: {stock_code}, 오류: 데이터 없음")
             return {"data": [], "message": f"종목코드 {stock_code}에 대한 데이터가 없습니다."}
         
-        return {"data": rows}
+        if points or resolution != DAILY:
+            series = reduce_series(series_from_rows(keys, rows), points, resolution)
+            return render_series(series, fmt, envelope="data", descending=True)
+        if fmt == ROWS:
+            return render_rows([dict(zip(keys, row)) for row in rows], envelope="data")
+        return render_columns(result_to_columns(keys, rows), fmt, envelope="data")
     except Exception as e:
         print(f"API 에러 - 종목코드: {stock_code}, 오류: {str(e)}")
+        # 일시적인 오류 응답은 캐시하지 않음
+        response.headers["Cache-Control"] = "no-store"
         return {"data": [], "error": str(e)}
 
 @app.get("/api/collect-stock-chart/{stock_code}")
-async def get_collect_stock_chart(stock_code: str, days: int = 90, db: Session = Depends(get_db)):
-    """특정 종목의 수집된 차트 데이터를 반환합니다."""
+async def get_collect_stock_chart(stock_code: str, days: int = 90,
+                                  points: Optional[int] = POINTS_QUERY, resolution: str = RESOLUTION_QUERY,
+                                  fmt: str = Depends(get_chart_format), db: AsyncSession = Depends(get_async_db)):
+    """특정 종목의 수집된 차트 데이터를 반환합니다. (format: rows / columnar / msgpack / arrow)
+
+    resolution으로 주봉/월봉 집계, points로 LTTB 다운샘플링한 결과를 받을 수 있습니다.
+    """
     try:
         # 날짜 범위 계산
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
         
+        # 시계열 저장소에 있으면 DB를 거치지 않고 메모리 맵에서 바로 응답
+        series = get_series_store().read(stock_code, start_date=start_date, fields=CHART_FIELDS + INVESTOR_FIELDS)
+        if series is not None and len(series["date"]):
+            return render_series(reduce_series(series, points, resolution), fmt)
+        
         query = text("""
             SELECT date, open_price, high_price, low_price, close_price, volume, 
                    change_rate, market_cap, trading_value, institution_total, 
@@ -333,83 +555,447 @@ async def get_collect_stock_chart(stock_code: str, days: int = 90, db: Session =
             ORDER BY date ASC
         """)
         
-        result = db.execute(
+        result = await db.execute(
             query, 
-            {"stock_code": stock_code, "start_date": start_date.strftime('%Y-%m-%d')}
+            {"stock_code": stock_code, "start_date": start_date.date()}
         )
         
-        rows = [dict(row._mapping) for row in result]
+        keys = list(result.keys())
+        rows = result.all()
         if not rows:
             raise HTTPException(status_code=404, detail="Chart data not found")
         
-        return rows
+        if points or resolution != DAILY:
+            return render_series(reduce_series(series_from_rows(keys, rows), points, resolution), fmt)
+        if fmt == ROWS:
+            return render_rows([dict(zip(keys, row)) for row in rows])
+        return render_columns(result_to_columns(keys, rows), fmt)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/suspect-stocks")
-async def get_suspect_stocks(db: Session = Depends(get_db)):
-    """의심 종목 목록을 반환합니다."""
+async def get_suspect_stocks(page: ListParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """의심 종목 목록을 한 페이지씩 반환합니다. ({"data": [...], "next_cursor": ...})"""
+    plan = build_list_query(SUSPECT_STOCKS_LIST, page)
     try:
-        query = text("SELECT * FROM suspect_stocks ORDER BY stock_name")
-        result = db.execute(query)
-        return [dict(row._mapping) for row in result]
+        return render_rows(await fetch_list_page(db, plan))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/historical-manipulation-stocks")
-async def get_historical_manipulation_stocks(db: Session = Depends(get_db)):
-    """과거 작전주 목록을 반환합니다."""
+async def get_historical_manipulation_stocks(
+    page: ListParams = Depends(),
+    category: Optional[str] = None,
+    manipulation_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """과거 작전주 목록을 한 페이지씩 반환합니다. (기본 정렬: 작전 기간 내림차순)"""
+    plan = build_list_query(HISTORICAL_MANIPULATION_STOCKS_LIST, page, {
+        "category": category, "manipulation_type": manipulation_type,
+    })
     try:
-        query = text("""
-            SELECT * FROM historical_manipulation_stocks 
-            ORDER BY manipulation_period DESC
-        """)
-        result = db.execute(query)
-        return [dict(row._mapping) for row in result]
+        return render_rows(await fetch_list_page(db, plan))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/stock-surge-dates/{stock_code}")
-async def get_stock_surge_dates(stock_code: str, db: Session = Depends(get_db)):
-    """특정 종목의 급등 발생일들을 반환합니다."""
-    try:
-        # stock_daily_data에서 해당 종목의 모든 데이터 조회
+# 급등일 기준: 일일 상승률이 5% 이상인 날
+SURGE_THRESHOLD = 5.0
+
+EVENT_TYPE_PATTERN = f"^({'|'.join(EVENT_TYPES)})$"
+
+def surge_event_row(row):
+    """surge_events / stock_daily_data 조회 행을 급등일 응답 항목으로 변환합니다."""
+    return {
+        'date': row['date'].strftime('%Y-%m-%d') if hasattr(row['date'], 'strftime') else str(row['date']),
+        'change_rate': float(row['change_rate']) if row['change_rate'] is not None else 0,
+        'close_price': float(row['close_price']) if row['close_price'] else 0,
+        'volume': int(row['volume']) if row['volume'] else 0,
+        'magnitude': float(row['magnitude']) if row['magnitude'] is not None else None
+    }
+
+async def query_surge_events(db: AsyncSession, stock_code: str, event_type: str, threshold: float):
+    """종목의 이벤트를 조회합니다. 반환: (행 목록, 조회 경로 'index' / 'scan')
+
+    기준이 색인 최소 기준 이상이고 종목이 색인되어 있으면 surge_events 색인을,
+    아니면 stock_daily_data에서 같은 정의로 계산해 SQL에서 거릅니다.
+    """
+    if threshold >= BASE_THRESHOLDS[event_type]:
         query = text("""
-            SELECT date, change_rate, close_price, volume
-            FROM stock_daily_data 
-            WHERE stock_code = :stock_code 
+            SELECT date, change_rate, close_price, volume, magnitude
+            FROM surge_events
+            WHERE stock_code = :stock_code AND event_type = :event_type AND magnitude >= :threshold
             ORDER BY date ASC
         """)
-        
-        result = db.execute(query, {"stock_code": stock_code})
-        rows = [dict(row._mapping) for row in result]
-        
-        if not rows:
-            return {"surge_dates": [], "message": f"종목코드 {stock_code}에 대한 데이터가 없습니다."}
-        
-        # 급등일 기준: 일일 상승률이 5% 이상인 날
-        surge_threshold = 5.0
-        surge_dates = []
-        
-        for row in rows:
-            if row['change_rate'] and float(row['change_rate']) >= surge_threshold:
-                surge_dates.append({
-                    'date': row['date'].strftime('%Y-%m-%d') if hasattr(row['date'], 'strftime') else str(row['date']),
-                    'change_rate': float(row['change_rate']),
-                    'close_price': float(row['close_price']) if row['close_price'] else 0,
-                    'volume': int(row['volume']) if row['volume'] else 0
-                })
-        
+        params = {"stock_code": stock_code, "event_type": event_type, "threshold": threshold}
+        rows = [dict(row._mapping) for row in await db.execute(query, params)]
+        if rows:
+            return rows, "index"
+        indexed = await db.execute(
+            text("SELECT 1 FROM surge_events WHERE stock_code = :stock_code LIMIT 1"),
+            {"stock_code": stock_code}
+        )
+        if indexed.first() is not None:
+            return rows, "index"
+
+    if event_type == VOLUME_SPIKE:
+        query = text(f"""
+            SELECT date, change_rate, close_price, volume, volume_z AS magnitude
+            FROM ({EVENT_MAGNITUDE_SQL.format(where="WHERE d.stock_code = :stock_code")}) e
+            WHERE volume_z >= :threshold
+            ORDER BY date ASC
+        """)
+    else:
+        query = text("""
+            SELECT date, change_rate, close_price, volume, change_rate AS magnitude
+            FROM stock_daily_data
+            WHERE stock_code = :stock_code AND change_rate >= :threshold
+            ORDER BY date ASC
+        """)
+    result = await db.execute(query, {"stock_code": stock_code, "threshold": threshold})
+    return [dict(row._mapping) for row in result], "scan"
+
+async def query_surge_dates_batch(db: AsyncSession, stock_codes, start_date=None, end_date=None,
+                                  threshold: float = SURGE_THRESHOLD):
+    """여러 종목의 급등일을 /api/stock-surge-dates와 같은 원본·정의로 한 번에 조회합니다. 반환: {종목코드: 급등일 목록}
+
+    색인된 종목은 surge_events에서, 색인이 없는 종목은 stock_daily_data에서 같은 쿼리로 읽습니다.
+    start_date/end_date가 있으면 그 기간의 급등일만 반환합니다.
+    """
+    params = {"codes": list(stock_codes), "event_type": SURGE, "threshold": threshold}
+    period = ""
+    if start_date:
+        period += " AND date >= :start_date"
+        params["start_date"] = start_date
+    if end_date:
+        period += " AND date <= :end_date"
+        params["end_date"] = end_date
+    scan = f"""
+        SELECT stock_code, date, change_rate, close_price, volume, change_rate AS magnitude
+        FROM stock_daily_data d
+        WHERE stock_code = ANY(:codes) AND change_rate >= :threshold{period}
+    """
+    if threshold >= BASE_THRESHOLDS[SURGE]:
+        query = text(f"""
+            SELECT stock_code, date, change_rate, close_price, volume, magnitude
+            FROM surge_events
+            WHERE stock_code = ANY(:codes) AND event_type = :event_type AND magnitude >= :threshold{period}
+            UNION ALL
+            {scan}
+              AND NOT EXISTS (SELECT 1 FROM surge_events e WHERE e.stock_code = d.stock_code)
+            ORDER BY stock_code, date
+        """)
+    else:
+        query = text(f"{scan} ORDER BY stock_code, date")
+    surges = {}
+    for row in await db.execute(query, params):
+        surges.setdefault(row.stock_code, []).append(surge_event_row(row._mapping))
+    return surges
+
+@app.get("/api/stock-surge-dates/{stock_code}")
+async def get_stock_surge_dates(
+    stock_code: str,
+    response: Response,
+    threshold: float = SURGE_THRESHOLD,
+    event_type: str = Query(SURGE, pattern=EVENT_TYPE_PATTERN),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """특정 종목의 급등 발생일들을 반환합니다.
+
+    threshold: 기준 (surge/near_limit_up은 등락률 %, volume_spike는 거래량 z-score)
+    event_type: surge(기본) / volume_spike / near_limit_up
+    """
+    try:
+        rows, source = await query_surge_events(db, stock_code, event_type, threshold)
+        if not rows and source == "scan":
+            exists = await db.execute(
+                text("SELECT 1 FROM stock_daily_data WHERE stock_code = :stock_code LIMIT 1"),
+                {"stock_code": stock_code}
+            )
+            if exists.first() is None:
+                return {"surge_dates": [], "message": f"종목코드 {stock_code}에 대한 데이터가 없습니다."}
+
+        surge_dates = [surge_event_row(row) for row in rows]
+
         return {
             "surge_dates": surge_dates,
             "total_surge_days": len(surge_dates),
-            "threshold": surge_threshold
+            "threshold": threshold,
+            "event_type": event_type,
+            "source": source
         }
         
     except Exception as e:
         print(f"급등일 조회 에러 - 종목코드: {stock_code}, 오류: {str(e)}")
+        response.headers["Cache-Control"] = "no-store"
         return {"surge_dates": [], "error": str(e)}
 
+@app.get("/api/surge-events")
+async def get_surge_events(
+    event_date: Optional[date] = Query(None, alias="date"),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    event_type: str = Query(SURGE, pattern=EVENT_TYPE_PATTERN),
+    threshold: Optional[float] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """특정 날짜(또는 기간)에 이벤트가 발생한 전 종목을 magnitude 내림차순으로 반환합니다.
+
+    surge_events 색인에서 조회하므로 threshold는 색인 최소 기준 이상만 의미가 있습니다.
+    """
+    if event_date is not None:
+        start_date = end_date = event_date.isoformat()
+    if not start_date:
+        raise HTTPException(status_code=400, detail="date or start_date is required")
+    if threshold is None:
+        threshold = BASE_THRESHOLDS[event_type]
+    try:
+        query = text(f"""
+            SELECT e.stock_code, cs.stock_name, e.date, e.event_type, e.magnitude,
+                   e.change_rate, e.close_price, e.volume
+            FROM surge_events e
+            LEFT JOIN collection_stocks cs ON cs.stock_code = e.stock_code
+            WHERE e.event_type = :event_type
+              AND e.date >= :start_date
+              {"AND e.date <= :end_date" if end_date else ""}
+              AND e.magnitude >= :threshold
+            ORDER BY e.date DESC, e.magnitude DESC
+            LIMIT :limit
+        """)
+        params = {
+            "event_type": event_type,
+            "start_date": datetime.strptime(start_date, '%Y-%m-%d').date(),
+            "threshold": threshold,
+            "limit": limit,
+        }
+        if end_date:
+            params["end_date"] = datetime.strptime(end_date, '%Y-%m-%d').date()
+        result = await db.execute(query, params)
+        rows = [dict(row._mapping) for row in result]
+        return render_rows({
+            "events": rows,
+            "total": len(rows),
+            "event_type": event_type,
+            "threshold": threshold
+        })
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+    except Exception as e:
+        print(f"급등 이벤트 조회 에러 - 날짜: {start_date}, 오류: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/surge-events/refresh")
+def refresh_surge_events_index(codes: Optional[str] = None, db: Session = Depends(get_db)):
+    """stock_daily_data로부터 surge_events 색인을 집합 연산 한 번으로 다시 만듭니다.
+
+    codes: 쉼표로 구분한 종목코드 (없으면 전 종목)
+    """
+    stock_codes = split_param(codes) if codes else None
+    try:
+        count = rebuild_surge_events(db, stock_codes)
+        db.execute(*shared_version_bump(COLLECTION))
+        db.commit()
+        bump_data_version(COLLECTION)
+        return {"message": "Surge event index refreshed", "events": count}
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+# 일괄 조회 한 번에 요청할 수 있는 최대 종목 수
+BATCH_MAX_CODES = int(os.getenv("BATCH_MAX_CODES", "200"))
+# 일괄 조회 원본 테이블과 테이블에 있는 필드 (completed_stocks에 없는 종목은 stock_daily_data에서 조회)
+BATCH_SOURCES = [
+    ("completed_stocks", set(CHART_FIELDS + INVESTOR_FIELDS)),
+    ("stock_daily_data", set(CHART_FIELDS)),
+]
+
+def split_param(value: Optional[str]) -> List[str]:
+    """쉼표로 구분된 쿼리 파라미터를 목록으로 나눕니다."""
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+def build_batch_query(table, available, codes, fields, start_date, end_date, limit):
+    """여러 종목의 기간 데이터를 한 번에 조회하는 (쿼리, 파라미터)를 만듭니다. (종목코드, 날짜 오름차순)
+
+    limit이 있으면 종목별 최근 limit건만 남깁니다. 테이블에 없는 필드는 NULL로 채웁니다.
+    필드명은 호출 전에 허용 목록으로 검증되어 있어야 합니다.
+    """
+    columns = ", ".join(field if field in available else f"NULL AS {field}" for field in fields)
+    conditions = ["stock_code = ANY(:codes)"]
+    params = {"codes": list(codes)}
+    if start_date:
+        conditions.append("date >= :start_date")
+        params["start_date"] = start_date
+    if end_date:
+        conditions.append("date <= :end_date")
+        params["end_date"] = end_date
+    if limit:
+        params["limit"] = limit
+    query = text(f"""
+        SELECT stock_code, date, {columns}
+        FROM (
+            SELECT stock_code, date, {columns},
+                   ROW_NUMBER() OVER (PARTITION BY stock_code ORDER BY date DESC) AS rn
+            FROM {table}
+            WHERE {" AND ".join(conditions)}
+        ) ranked
+        {"WHERE rn <= :limit" if limit else ""}
+        ORDER BY stock_code, date
+    """)
+    return query, params
+
+async def iter_batch_series(db: AsyncSession, codes, fields, start_date=None, end_date=None, limit=None):
+    """종목별 (종목코드, 컬럼명, 행 목록)을 DB에서 읽는 대로 차례로 내보냅니다.
+
+    원본 테이블마다 쿼리는 한 번이며, 앞 테이블에서 찾지 못한 종목만 다음 테이블에서 조회합니다.
+    컬럼명과 행에는 stock_code가 빠져 있습니다.
+    """
+    remaining = list(codes)
+    for table, available in BATCH_SOURCES:
+        if not remaining:
+            break
+        query, params = build_batch_query(table, available, remaining, fields, start_date, end_date, limit)
+        result = await db.stream(query, params)
+        keys = list(result.keys())[1:]
+        found = set()
+        current, rows = None, []
+        async for row in result:
+            if row[0] != current:
+                if rows:
+                    yield current, keys, rows
+                current, rows = row[0], []
+                found.add(current)
+            rows.append(tuple(row[1:]))
+        if rows:
+            yield current, keys, rows
+        remaining = [code for code in remaining if code not in found]
+
+def render_batch_payload(keys, rows, fmt):
+    """일괄 조회 한 종목의 데이터를 rows(dict 목록) 또는 columnar 형태로 만듭니다."""
+    if fmt == ROWS:
+        return [dict(zip(keys, row)) for row in rows]
+    return result_to_columns(keys, rows)
+
+@app.get("/api/stock-data/batch")
+async def get_stock_data_batch(
+    codes: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    include_surges: bool = False,
+    stream: bool = False,
+    fmt: str = Depends(get_chart_format),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """여러 종목의 일별 데이터를 한 번의 요청·쿼리로 반환합니다.
+
+    codes: 쉼표로 구분한 종목코드, fields: 쉼표로 구분한 필드 (기본: 차트 필드)
+    limit: 종목별 최근 limit건, include_surges: 종목별 급등일 포함 (/api/stock-surge-dates와 같은 원본, 기간 내 전체)
+    stream=true이면 종목마다 한 줄씩 NDJSON으로 스트리밍합니다.
+    응답 형식(format)은 rows / columnar / msgpack / arrow (arrow는 stock_code 컬럼이 있는 한 테이블)
+    """
+    stock_codes = list(dict.fromkeys(split_param(codes)))
+    if not stock_codes:
+        raise HTTPException(status_code=400, detail="codes is required")
+    if len(stock_codes) > BATCH_MAX_CODES:
+        raise HTTPException(status_code=400, detail=f"Too many codes (max {BATCH_MAX_CODES})")
+    
+    requested = split_param(fields) or CHART_FIELDS
+    allowed = CHART_FIELDS + INVESTOR_FIELDS
+    invalid = [field for field in requested if field not in allowed]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(invalid)}")
+    query_fields = list(dict.fromkeys(requested))
+    if stream and fmt not in (ROWS, COLUMNAR):
+        raise HTTPException(status_code=400, detail="stream supports rows or columnar format only")
+    
+    if stream:
+        async def generate():
+            found = set()
+            try:
+                # 응답을 보내는 동안 연결을 쥐고 있으므로 스트림 전용 세션 사용
+                async with AsyncSessionLocal() as session:
+                    if include_surges:
+                        surges = await query_surge_dates_batch(session, stock_codes, start_date, end_date)
+                    async for code, keys, rows in iter_batch_series(session, stock_codes, query_fields,
+                                                                    start_date, end_date, limit):
+                        found.add(code)
+                        line = {"stock_code": code, "data": render_batch_payload(keys, rows, fmt)}
+                        if include_surges:
+                            line["surge_dates"] = surges.get(code, [])
+                        yield orjson.dumps(line) + b"\n"
+                missing = [code for code in stock_codes if code not in found]
+                yield orjson.dumps({"missing": missing}) + b"\n"
+            except Exception as e:
+                print(f"일괄 조회 스트리밍 에러 - 오류: {str(e)}")
+                yield orjson.dumps({"error": str(e)}) + b"\n"
+        
+        # 스트리밍 응답은 응답 캐시에 담지 않음
+        return StreamingResponse(generate(), media_type="application/x-ndjson",
+                                 headers={"Cache-Control": "no-store"})
+    
+    try:
+        data = {}
+        long_keys, long_rows = None, []
+        async for code, keys, rows in iter_batch_series(db, stock_codes, query_fields, start_date, end_date, limit):
+            if fmt == ARROW:
+                long_keys = ["stock_code"] + keys
+                long_rows.extend((code,) + row for row in rows)
+            else:
+                data[code] = render_batch_payload(keys, rows, fmt)
+        
+        if fmt == ARROW:
+            if long_keys is None:
+                long_keys = ["stock_code", "date"] + query_fields
+            return render_columns(result_to_columns(long_keys, long_rows), fmt)
+        
+        found = set(data)
+        payload = {"data": data, "missing": [code for code in stock_codes if code not in found]}
+        if include_surges:
+            surges = await query_surge_dates_batch(db, found, start_date, end_date)
+            payload["surge_dates"] = {code: surges.get(code, []) for code in data}
+        if fmt == ROWS:
+            return render_rows(payload)
+        return render_columns(payload, fmt)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/export/completed-stocks")
+async def export_completed_stocks(
+    format: str = Query(NDJSON, pattern=EXPORT_FORMAT_PATTERN),
+    codes: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    fields: Optional[str] = None
+):
+    """completed_stocks 전체 이력을 서버 측 커서로 읽으며 스트리밍으로 내보냅니다.
+
+    format: ndjson / csv / arrow, codes: 쉼표로 구분한 종목코드 (없으면 전 종목)
+    fields: 쉼표로 구분한 컬럼 (stock_code, date는 항상 포함, 기본: 전체 컬럼)
+    종목코드·날짜 순으로 EXPORT_CHUNK_ROWS행씩 보내므로 전체 테이블도 일정한 메모리로 내보냅니다.
+    """
+    columns = resolve_export_fields(split_param(fields))
+    stock_codes = list(dict.fromkeys(split_param(codes)))
+    
+    async def generate():
+        try:
+            # 응답을 보내는 동안 연결을 쥐고 있으므로 스트림 전용 세션 사용
+            async for chunk in iter_export(AsyncSessionLocal, format, columns, stock_codes, start_date, end_date):
+                yield chunk
+        except Exception as e:
+            print(f"내보내기 스트리밍 에러 - 오류: {str(e)}")
+            if format == NDJSON:
+                yield orjson.dumps({"error": str(e)}) + b"\n"
+            else:
+                # CSV·Arrow는 오류 줄을 넣을 수 없으므로 연결을 끊어 불완전한 파일임을 알림
+                raise
+    
+    filename = f"{EXPORT_TABLE}.{EXPORT_EXTENSIONS[format]}"
+    return StreamingResponse(generate(), media_type=EXPORT_MEDIA_TYPES[format], headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "no-store",
+    })
+
 def validate_korean_stock_name(stock_name: str) -> bool:
     """한국 주식 종목명인지 검증합니다."""
     if not stock_name:
@@ -424,12 +1010,17 @@ def validate_korean_stock_name(stock_name: str) -> bool:
     korean_pattern = r'[가-힣]'
     return bool(re.search(korean_pattern, stock_name))
 
-def get_korean_stock_name(stock_code: str) -> str:
-    """pykrx를 사용하여 정확한 한국 종목명을 조회합니다."""
+def get_korean_stock_name(stock_code: str, wait_for_index: bool = False) -> str:
+    """종목 색인을 사용하여 정확한 한국 종목명을 조회합니다.
+
+    기본은 이미 불러온 색인만 조회하며 재생성 스레드를 기다리지 않습니다 (요청 경로용).
+    wait_for_index=True이면 색인이 아직 없을 때 첫 생성이 끝날 때까지 기다립니다 (백그라운드 작업용).
+    """
     try:
-        # pykrx로 종목명 조회
-        stock_name = stock.get_market_ticker_name(stock_code)
-        print(f"pykrx 조회 결과 - 종목코드: {stock_code}, 종목명: {stock_name}")
+        # 거래일마다 갱신되는 종목 색인에서 조회
+        index = get_ticker_index() if wait_for_index else get_search_index()
+        stock_name = index.get_name(stock_code)
+        print(f"종목 색인 조회 결과 - 종목코드: {stock_code}, 종목명: {stock_name}")
         
         if stock_name and validate_korean_stock_name(stock_name):
             return stock_name
@@ -438,82 +1029,119 @@ def get_korean_stock_name(stock_code: str) -> str:
             return None
             
     except Exception as e:
-        print(f"pykrx 종목명 조회 실패 - 종목코드: {stock_code}, 오류: {e}")
+        print(f"종목명 조회 실패 - 종목코드: {stock_code}, 오류: {e}")
         return None
 
-@app.post("/api/add-stock")
-async def add_stock(request: AddStockRequest, db: Session = Depends(get_db)):
-    """새로운 종목을 추가합니다."""
+# 종목 추가 후 수집 → 분석을 실행하는 백그라운드 작업 대기열 (background_jobs 테이블)
+# 새 배포처럼 색인이 아직 없으면 작업 단계에서 첫 생성을 기다림 (작업 대기열이 생존 신호를 남김)
+job_runner = JobQueue(resolve_name=partial(get_korean_stock_name, wait_for_index=True))
+
+@app.on_event("startup")
+async def start_job_runner():
+    job_runner.start()
+
+@app.on_event("shutdown")
+async def stop_job_runner():
+    await job_runner.stop()
+
+class EnqueueJobRequest(BaseModel):
+    stock_code: str
+
+@app.post("/api/add-stock", status_code=202)
+async def add_stock(request: AddStockRequest, db: AsyncSession = Depends(get_async_db)):
+    """새로운 종목을 추가하고 수집 → 분석 작업을 대기열에 넣습니다.
+
+    종목명이 없으면 작업의 첫 단계에서 종목 색인으로 조회하므로 요청은 바로 반환됩니다.
+    진행 상황은 /api/jobs/{job_id}로 확인합니다.
+    """
+    # 주식 코드 형식 검증
+    if not re.match(r'^\d{6}$', request.stock_code):
+        raise HTTPException(status_code=400, detail="Invalid stock code format")
     try:
-        # 주식 코드 형식 검증
-        if not re.match(r'^\d{6}$', request.stock_code):
-            raise HTTPException(status_code=400, detail="Invalid stock code format")
-        
         # 이미 존재하는지 확인
         check_query = text("""
             SELECT 1 FROM collection_stocks 
             WHERE stock_code = :stock_code
         """)
-        exists = db.execute(check_query, {"stock_code": request.stock_code}).first()
+        exists = (await db.execute(check_query, {"stock_code": request.stock_code})).first()
         
         if exists:
             raise HTTPException(status_code=400, detail="Stock already exists")
         
-        # 주식명이 제공되지 않은 경우 API에서 조회
-        stock_name = request.stock_name
-        if not stock_name:
-            stock_name = get_korean_stock_name(request.stock_code)
+        stock_name = request.stock_name or None
         
-        # 새 종목 추가
+        # 새 종목 추가와 작업 등록을 한 트랜잭션으로 커밋
         insert_query = text("""
             INSERT INTO collection_stocks (stock_name, stock_code, created_at, updated_at)
             VALUES (:stock_name, :stock_code, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
         """)
-        
-        db.execute(
-            insert_query,
-            {"stock_name": stock_name, "stock_code": request.stock_code}
-        )
-        db.commit()
-        
-        return {"message": "Stock added successfully", "stock_code": request.stock_code, "stock_name": stock_name}
+        await db.execute(insert_query, {"stock_name": stock_name, "stock_code": request.stock_code})
+        job_id = await enqueue_job(db, ADD_STOCK, request.stock_code, stock_name)
+        await db.execute(*shared_version_bump(COLLECTION))
+        await db.commit()
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+    bump_data_version(COLLECTION)
+    job_runner.notify()
+    return {
+        "message": "Stock added successfully",
+        "stock_code": request.stock_code,
+        "stock_name": stock_name,
+        "job_id": job_id,
+        "status": QUEUED
+    }
+
+@app.post("/api/jobs", status_code=202)
+async def enqueue_refresh_job(request: EnqueueJobRequest, db: AsyncSession = Depends(get_async_db)):
+    """등록된 종목의 수집 → 분석 작업을 대기열에 넣습니다."""
+    try:
+        row = (await db.execute(
+            text("SELECT stock_name FROM collection_stocks WHERE stock_code = :stock_code"),
+            {"stock_code": request.stock_code}
+        )).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Stock not found")
+        job_id = await enqueue_job(db, REFRESH_STOCK, request.stock_code, row.stock_name)
+        await db.commit()
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    job_runner.notify()
+    return {"job_id": job_id, "status": QUEUED}
+
+@app.get("/api/jobs")
+async def get_jobs(
+    status: Optional[str] = Query(None, pattern=f"^({QUEUED}|{RUNNING}|{SUCCEEDED}|{FAILED})$"),
+    stock_code: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """최근 작업 목록과 진행 상황 (최신순)"""
+    return render_rows(await list_jobs(db, status=status, stock_code=stock_code, limit=limit))
+
+@app.get("/api/jobs/{job_id}")
+async def get_job_status(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """작업 상태 (status, 현재 단계 step, 진행률 progress, 마지막 출력 message, 오류 error)"""
+    job = await get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return render_rows(job)
+
 @app.get("/api/manipulation-criteria/{stock_code}")
-async def get_manipulation_criteria(stock_code: str, db: Session = Depends(get_db)):
+async def get_manipulation_criteria(stock_code: str, db: AsyncSession = Depends(get_async_db)):
     """특정 종목의 작전주 판단 기준을 반환합니다."""
     try:
-        # 기본 정보 조회
-        base_query = text("""
-            SELECT * FROM manipulation_stocks 
-            WHERE stock_code = :stock_code
-        """)
-        
-        stock = db.execute(base_query, {"stock_code": stock_code}).first()
-        if not stock:
+        stock_data = await get_stock_with_latest_pattern(db, stock_code)
+        if not stock_data:
             raise HTTPException(status_code=404, detail="Stock not found")
         
-        stock_data = dict(stock._mapping)
-        
-        # 패턴 분석 정보 조회
-        pattern_query = text("""
-            SELECT * FROM pattern_analysis 
-            WHERE stock_code = :stock_code 
-            ORDER BY analysis_date DESC 
-            LIMIT 1
-        """)
-        
-        pattern = db.execute(pattern_query, {"stock_code": stock_code}).first()
-        if pattern:
-            pattern_data = dict(pattern._mapping)
-            if pattern_data.get('warnings'):
-                pattern_data['warnings'] = json.loads(pattern_data['warnings'])
-            if pattern_data.get('patterns'):
-                pattern_data['patterns'] = json.loads(pattern_data['patterns'])
-            stock_data.update(pattern_data)
-        
         return {
             "criteria": {
                 "급등빈발": {
@@ -542,28 +1170,58 @@ async def get_manipulation_criteria(stock_code: str, db: Session = Depends(get_d
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.on_event("startup")
+async def load_search_index():
+    # 저장된 상장 종목 목록으로 검색 색인을 미리 준비 (pykrx 호출 없음)
+    await run_in_threadpool(get_search_index)
+    # 목록 파일이 없거나(새 배포) 오래되었으면 백그라운드에서 생성 (시작을 막지 않음)
+    start_ticker_index_refresh()
+
+@app.get("/api/search")
+async def search_stocks(
+    q: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """상장 종목을 종목명 앞부분·부분 일치, 초성(예: ㅅㅅㅈㅈ), 종목코드 앞부분으로 검색합니다.
+
+    메모리 색인만 조회하며 DB나 pykrx를 사용하지 않습니다.
+    """
+    return render_rows({"query": q, "results": get_search_index().search(q, limit)})
+
 @app.get("/api/stock-name/{stock_code}")
-async def get_stock_name(stock_code: str, db: Session = Depends(get_db)):
+async def get_stock_name(stock_code: str, db: AsyncSession = Depends(get_async_db)):
     """주식 코드로 종목명을 조회합니다."""
     try:
+        # 메모리 종목 색인에서 먼저 조회 (DB 왕복·pykrx 호출 없음, 재생성을 기다리지 않음)
+        stock_name = get_korean_stock_name(stock_code)
+        if stock_name:
+            return {"stock_name": stock_name}
+        
+        # 색인이 아직 없거나 색인에 없는 종목(상장폐지 등)은 수집 종목 테이블에서 조회
         query = text("""
             SELECT stock_name FROM collection_stocks 
             WHERE stock_code = :stock_code
         """)
-        result = db.execute(query, {"stock_code": stock_code}).first()
+        result = (await db.execute(query, {"stock_code": stock_code})).first()
         
         if result:
             return {"stock_name": result.stock_name}
         else:
-            # API에서 종목명 조회 시도
-            stock_name = get_korean_stock_name(stock_code)
-            if stock_name:
-                return {"stock_name": stock_name}
-            else:
-                raise HTTPException(status_code=404, detail="Stock not found")
+            raise HTTPException(status_code=404, detail="Stock not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.on_event("startup")
+async def finish_startup():
+    # 다른 startup 이벤트 뒤에 등록되어 마지막에 실행됨
+    startup_timer.mark("startup_events")
+    if AUTO_CREATE_SCHEMA:
+        from init_db import init_db
+        await run_in_threadpool(init_db)
+        startup_timer.mark("create_schema")
+
+startup_timer.mark("app_setup")
+
 if __name__ == "__main__":
     import os
     import uvicorn
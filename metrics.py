@@ -0,0 +1,221 @@
+import logging
+import os
+import time
+from contextvars import ContextVar
+
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from prometheus_client.core import GaugeMetricFamily, CounterMetricFamily
+from sqlalchemy import event
+from starlette.responses import Response
+from starlette.routing import Match
+
+logger = logging.getLogger(__name__)
+
+# 이 시간(초) 이상 걸린 쿼리는 느린 쿼리 로그로 남김
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", "0.5"))
+SLOW_QUERY_LOG_LENGTH = 500
+
+# 라우트와 일치하지 않는 요청(404, 정적 파일 등)은 경로 대신 이 라벨로 묶어 라벨 수를 제한
+UNMATCHED_ROUTE = "unmatched"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "요청 처리 시간", ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+RESPONSE_BYTES = Histogram(
+    "http_response_size_bytes", "응답 본문 크기", ["method", "route"], buckets=SIZE_BUCKETS
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "요청당 DB 쿼리 수", ["route"], buckets=QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "요청당 DB 쿼리 시간 합계", ["route"], buckets=LATENCY_BUCKETS
+)
+QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "DB 쿼리 실행 시간", ["engine"], buckets=LATENCY_BUCKETS
+)
+SLOW_QUERIES = Counter("db_slow_queries_total", "느린 쿼리 수", ["engine", "route"])
+STARTUP_PHASE_SECONDS = Gauge("app_startup_phase_seconds", "앱 시작 단계별 소요 시간", ["phase"])
+
+
+class StartupTimer:
+    """앱 시작 단계별 소요 시간을 기록합니다. (import / 앱 구성 / startup 이벤트 / 첫 요청)
+
+    첫 요청 처리가 끝나면 단계별 시간을 한 줄로 로그에 남깁니다.
+    """
+
+    def __init__(self, started):
+        self.started = started
+        self._last = started
+        self.phases = {}
+        self.reported = False
+
+    def mark(self, phase):
+        """직전 단계 이후 지금까지를 phase의 소요 시간으로 기록합니다."""
+        now = time.perf_counter()
+        self.record(phase, now - self._last)
+        self._last = now
+
+    def record(self, phase, seconds):
+        self.phases[phase] = seconds
+        STARTUP_PHASE_SECONDS.labels(phase).set(seconds)
+
+    def report(self):
+        self.reported = True
+        phases = ", ".join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in self.phases.items())
+        logger.info(f"시작 시간: {phases} (합계 {sum(self.phases.values()) * 1000:.0f}ms)")
+
+
+class RequestStats:
+    """요청 하나에서 실행한 DB 쿼리 수와 시간 (SQLAlchemy 이벤트에서 누적)"""
+    __slots__ = ("scope", "db_queries", "db_seconds")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+    @property
+    def route(self):
+        # 라우터가 라우트를 찾으면 같은 scope dict에 채워 넣음
+        return _route_label(self.scope)
+
+
+def _route_label(scope):
+    route = scope.get("route")
+    if route is None and "app" in scope:
+        # 응답 캐시에서 바로 반환한 요청처럼 라우터를 거치지 않은 요청은 라우트를 직접 찾음
+        for candidate in scope["app"].router.routes:
+            if candidate.matches(scope)[0] == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+# 요청 처리 중인 태스크·스레드(run_in_threadpool)·asyncpg greenlet이 같은 객체를 공유
+_request_stats: ContextVar = ContextVar("request_stats", default=None)
+
+
+class MetricsMiddleware:
+    """요청마다 라우트별 처리 시간, 응답 크기, DB 쿼리 수·시간을 기록하는 ASGI 미들웨어
+
+    라벨은 실제 경로가 아닌 라우트 템플릿(/api/stocks/{stock_code}/chart 등)을 사용합니다.
+    """
+
+    def __init__(self, app, startup_timer=None):
+        self.app = app
+        self.startup_timer = startup_timer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _request_stats.set(stats)
+        status = 500
+        size = 0
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+            route = stats.route
+            method = scope["method"]
+            REQUEST_SECONDS.labels(method, route, str(status)).observe(elapsed)
+            RESPONSE_BYTES.labels(method, route).observe(size)
+            REQUEST_DB_QUERIES.labels(route).observe(stats.db_queries)
+            REQUEST_DB_SECONDS.labels(route).observe(stats.db_seconds)
+            if self.startup_timer is not None and not self.startup_timer.reported:
+                # 첫 요청은 연결 풀의 첫 DB 연결 등 지연 초기화 비용을 포함
+                self.startup_timer.record("first_request", elapsed)
+                self.startup_timer.report()
+
+
+def instrument_engine(engine, name):
+    """엔진의 모든 쿼리 시간을 기록하고 느린 쿼리를 로그로 남깁니다. (동기·비동기 엔진 모두 지원)"""
+    target = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(target, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(target, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        QUERY_SECONDS.labels(name).observe(elapsed)
+        stats = _request_stats.get()
+        route = UNMATCHED_ROUTE
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_seconds += elapsed
+            route = stats.route
+        if elapsed >= SLOW_QUERY_SECONDS:
+            SLOW_QUERIES.labels(name, route).inc()
+            logger.warning(
+                f"느린 쿼리 {elapsed:.3f}초 ({name}): {' '.join(statement.split())[:SLOW_QUERY_LOG_LENGTH]}"
+            )
+
+    @event.listens_for(target, "handle_error")
+    def handle_error(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+
+class PoolCollector:
+    """수집 시점의 연결 풀 상태(사용 중 / 유휴 / 초과 연결 / 풀 크기)를 게이지로 내보냅니다."""
+
+    def __init__(self, engines, response_cache=None):
+        # engines: 이름 → 엔진
+        self.engines = engines
+        self.response_cache = response_cache
+
+    def collect(self):
+        gauges = {
+            "checked_out": GaugeMetricFamily("db_pool_checked_out", "사용 중인 연결 수", labels=["engine"]),
+            "checked_in": GaugeMetricFamily("db_pool_checked_in", "유휴 연결 수", labels=["engine"]),
+            "overflow": GaugeMetricFamily("db_pool_overflow", "풀 크기를 넘어 연 연결 수", labels=["engine"]),
+            "size": GaugeMetricFamily("db_pool_size", "풀 크기", labels=["engine"]),
+        }
+        for name, engine in self.engines.items():
+            pool = getattr(engine, "sync_engine", engine).pool
+            for key, method in (("checked_out", "checkedout"), ("checked_in", "checkedin"),
+                                ("overflow", "overflow"), ("size", "size")):
+                if hasattr(pool, method):
+                    gauges[key].add_metric([name], getattr(pool, method)())
+        yield from gauges.values()
+
+        if self.response_cache is not None:
+            cache = self.response_cache
+            hits = CounterMetricFamily("response_cache_hits", "응답 캐시 적중 수")
+            hits.add_metric([], cache.hits)
+            misses = CounterMetricFamily("response_cache_misses", "응답 캐시 미적중 수")
+            misses.add_metric([], cache.misses)
+            coalesced = CounterMetricFamily("response_cache_coalesced", "실행 중인 같은 요청의 결과를 함께 받은 요청 수")
+            coalesced.add_metric([], cache.coalesced)
+            yield hits
+            yield misses
+            yield coalesced
+
+
+def register_pool_collector(engines, response_cache=None):
+    REGISTRY.register(PoolCollector(engines, response_cache))
+
+
+def metrics_response():
+    """Prometheus 텍스트 형식의 /metrics 응답"""
+    return Response(content=generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
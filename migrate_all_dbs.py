@@ -1,8 +1,17 @@
-from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Float, DateTime, Date, Text, Boolean
+from sqlalchemy import create_engine, text, MetaData, Table, Column, Integer, BigInteger, String, Float, DateTime, Date, Text, Boolean
 from sqlalchemy.orm import Session
 import os
+import sys
+import pandas as pd
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "PythonCode"))
+from bulk_loader import BulkLoader
+from dashboard_summary import create_dashboard_summary, refresh_dashboard_summary_sync
+from schema_upgrades import run_column_upgrades, run_pre_index_upgrades
+from surge_events import rebuild_surge_events
+from data_version import bump_data_version, shared_version_bump, COLLECTION
+
 # PostgreSQL 연결 정보
 POSTGRES_USER = "postgres"
 POSTGRES_PASSWORD = "postgres"
@@ -23,16 +32,23 @@ sqlite_dbs = [
     "DB/named_abnormal_stocks.db"
 ]
 
-def convert_datetime(value):
-    if isinstance(value, str):
-        try:
-            return datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
-        except ValueError:
-            try:
-                return datetime.strptime(value, '%Y-%m-%d').date()
-            except ValueError:
-                return None
-    return value
+def convert_datetime_column(values):
+    """문자열 날짜 컬럼을 변환합니다. 변환할 수 없는 값은 None이 됩니다."""
+    if values.dtype != object:
+        return values
+    converted = pd.to_datetime(values, format='%Y-%m-%d %H:%M:%S', errors='coerce')
+    date_only = pd.to_datetime(values, format='%Y-%m-%d', errors='coerce')
+    return converted.fillna(date_only)
+
+# 조회 경로가 의존하는 인덱스 (models.py와 같은 이름, init_db.py도 같은 인덱스를 만듦)
+INDEX_DDL = [
+    # 종목별 최신 분석 조회(DISTINCT ON stock_code ORDER BY created_at DESC)용
+    "CREATE INDEX IF NOT EXISTS ix_manipulation_analysis_stock_code_created_at "
+    "ON manipulation_analysis (stock_code, created_at)",
+    # 종목별 기간 조회·내보내기 및 적재 시 ON CONFLICT (stock_code, date) 대상
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_completed_stocks_stock_code_date "
+    "ON completed_stocks (stock_code, date)",
+]
 
 def create_tables(engine):
     metadata = MetaData()
@@ -51,7 +67,7 @@ def create_tables(engine):
         Column('change_rate', Float),
         Column('market_cap', Float),
         Column('trading_value', Float),
-        Column('listed_shares', Integer),
+        Column('listed_shares', BigInteger),
         Column('bps', Float),
         Column('per', Float),
         Column('pbr', Float),
@@ -145,7 +161,20 @@ def create_tables(engine):
         Column('updated_at', DateTime)
     )
 
+    # 응답 캐시 무효화용 공유 데이터 버전 (PythonCode/data_version.py)
+    Table('data_versions', metadata,
+        Column('scope', String, primary_key=True),
+        Column('version', BigInteger, nullable=False, default=0),
+        Column('updated_at', DateTime)
+    )
+
     metadata.create_all(engine)
+    # create_all은 이미 있는 테이블에 인덱스를 추가하지 않으므로 조회용 인덱스는 따로 확인·생성
+    with engine.begin() as connection:
+        run_column_upgrades(connection)
+        run_pre_index_upgrades(connection)
+        for statement in INDEX_DDL:
+            connection.execute(text(statement))
 
 def migrate_db(sqlite_path, postgres_engine):
     print(f"\n🔄 Migrating {sqlite_path} to PostgreSQL...")
@@ -164,32 +193,20 @@ def migrate_db(sqlite_path, postgres_engine):
     for table_name in sqlite_metadata.tables:
         print(f"  ⏳ Migrating table: {table_name}")
         try:
-            # SQLite 테이블에서 데이터 읽기
+            # SQLite 테이블에서 데이터 읽기 (날짜 컬럼은 컬럼 단위로 변환)
             sqlite_table = Table(table_name, sqlite_metadata, autoload_with=sqlite_engine)
             with sqlite_engine.connect() as sqlite_conn:
-                result = sqlite_conn.execute(sqlite_table.select())
-                columns = [col.name for col in sqlite_table.columns]
-                data = []
-                for row in result:
-                    row_dict = {}
-                    for idx, column in enumerate(columns):
-                        value = row[idx]
-                        if isinstance(value, str) and ('date' in column.lower() or 'created_at' in column.lower() or 'updated_at' in column.lower()):
-                            value = convert_datetime(value)
-                        row_dict[column] = value
-                    data.append(row_dict)
+                data = pd.read_sql(sqlite_table.select(), sqlite_conn)
+            for column in data.columns:
+                if 'date' in column.lower() or 'created_at' in column.lower() or 'updated_at' in column.lower():
+                    data[column] = convert_datetime_column(data[column])
             
-            if not data:
+            if data.empty:
                 print(f"  ✅ Successfully migrated 0 rows from {table_name}")
                 continue
             
-            # PostgreSQL에 데이터 삽입
-            postgres_table = Table(table_name, postgres_metadata, autoload_with=postgres_engine)
-            with postgres_engine.connect() as postgres_conn:
-                postgres_conn.execute(postgres_table.delete())
-                if data:
-                    postgres_conn.execute(postgres_table.insert(), data)
-                postgres_conn.commit()
+            # PostgreSQL에 COPY로 일괄 삽입
+            copy_to_postgres(postgres_engine, table_name, data)
             
             print(f"  ✅ Successfully migrated {len(data)} rows from {table_name}")
             
@@ -198,16 +215,25 @@ def migrate_db(sqlite_path, postgres_engine):
             try:
                 # 테이블 재생성 시도
                 create_tables(postgres_engine)
-                with postgres_engine.connect() as postgres_conn:
-                    postgres_table = Table(table_name, postgres_metadata, autoload_with=postgres_engine)
-                    postgres_conn.execute(postgres_table.delete())
-                    if data:
-                        postgres_conn.execute(postgres_table.insert(), data)
-                    postgres_conn.commit()
+                copy_to_postgres(postgres_engine, table_name, data)
                 print(f"  ✅ Successfully migrated {len(data)} rows from {table_name} after recreation")
             except Exception as e2:
                 print(f"  ❌ Error setting up table {table_name}: {str(e2)}")
 
+def copy_to_postgres(engine, table_name, data):
+    """기존 행을 지우고 COPY로 데이터를 일괄 삽입합니다."""
+    raw_conn = engine.raw_connection()
+    try:
+        cursor = raw_conn.cursor()
+        cursor.execute(f"DELETE FROM {table_name}")
+        BulkLoader(raw_conn).load(table_name, data)
+        raw_conn.commit()
+    except Exception:
+        raw_conn.rollback()
+        raise
+    finally:
+        raw_conn.close()
+
 def main():
     # PostgreSQL 테이블 생성
     create_tables(postgres_engine)
@@ -219,6 +245,20 @@ def main():
         else:
             print(f"\n⚠️ Warning: {sqlite_db} not found, skipping...")
     
+    # 급등 이벤트 색인은 API가 조회하는 stock_daily_data 기준으로 다시 만듦
+    # (SQLite에서 옮긴 색인은 다른 원본(completed_stocks)으로 만든 것이라 그대로 쓰지 않음)
+    with postgres_engine.begin() as connection:
+        count = rebuild_surge_events(connection)
+        connection.execute(*shared_version_bump(COLLECTION))
+    bump_data_version(COLLECTION)
+    print(f"\n📈 Surge event index rebuilt ({count} events)")
+    
+    # 옮긴 데이터로 대시보드 요약 다시 집계
+    with postgres_engine.begin() as connection:
+        create_dashboard_summary(connection)
+    refresh_dashboard_summary_sync(postgres_engine)
+    print("\n📊 Dashboard summary refreshed")
+    
     print("\n✨ Migration process completed!")
 
 if __name__ == "__main__":
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Text, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, Date, Text, Boolean, Index, UniqueConstraint, text
 from sqlalchemy.sql import func
 from database import Base
 
 class CompletedStock(Base):
     __tablename__ = "completed_stocks"
+    # 종목별 기간 조회와 내보내기(ORDER BY stock_code, date)용, 적재 시 ON CONFLICT (stock_code, date) 대상
+    __table_args__ = (
+        Index("uq_completed_stocks_stock_code_date", "stock_code", "date", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     stock_name = Column(String)
@@ -17,7 +21,7 @@ class CompletedStock(Base):
     change_rate = Column(Float)
     market_cap = Column(Float)
     trading_value = Column(Float)
-    listed_shares = Column(Integer)
+    listed_shares = Column(BigInteger)
     bps = Column(Float)
     per = Column(Float)
     pbr = Column(Float)
@@ -35,6 +39,10 @@ class CompletedStock(Base):
 
 class ManipulationStock(Base):
     __tablename__ = "manipulation_stocks"
+    # 목록 기본 정렬(COALESCE(stock_name, ''), id) 키셋 페이지 조회용
+    __table_args__ = (
+        Index("ix_manipulation_stocks_list_name", text("COALESCE(stock_name, '')"), "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     stock_name = Column(String)
@@ -59,6 +67,10 @@ class ManipulationStock(Base):
 
 class CollectionStock(Base):
     __tablename__ = "collection_stocks"
+    # 목록 기본 정렬(COALESCE(stock_name, ''), id) 키셋 페이지 조회용
+    __table_args__ = (
+        Index("ix_collection_stocks_list_name", text("COALESCE(stock_name, '')"), "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     stock_name = Column(String)
@@ -68,6 +80,10 @@ class CollectionStock(Base):
 
 class SuspectStock(Base):
     __tablename__ = "suspect_stocks"
+    # 목록 기본 정렬(COALESCE(stock_name, ''), id) 키셋 페이지 조회용
+    __table_args__ = (
+        Index("ix_suspect_stocks_list_name", text("COALESCE(stock_name, '')"), "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     stock_name = Column(String)
@@ -99,6 +115,10 @@ class StockDailyData(Base):
 
 class ManipulationAnalysis(Base):
     __tablename__ = "manipulation_analysis"
+    # 종목별 최신 분석 조회(DISTINCT ON stock_code ORDER BY created_at DESC)용
+    __table_args__ = (
+        Index("ix_manipulation_analysis_stock_code_created_at", "stock_code", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     stock_name = Column(String)
@@ -117,6 +137,10 @@ class ManipulationAnalysis(Base):
 
 class HistoricalManipulationStock(Base):
     __tablename__ = "historical_manipulation_stocks"
+    # 목록 기본 정렬(COALESCE(manipulation_period, '') DESC, id DESC) 키셋 페이지 조회용
+    __table_args__ = (
+        Index("ix_historical_manipulation_stocks_list_period", text("COALESCE(manipulation_period, '')"), "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     stock_name = Column(String)
@@ -127,3 +151,56 @@ class HistoricalManipulationStock(Base):
     manipulation_type = Column(String)
     description = Column(Text)
     created_at = Column(DateTime, server_default=func.now())
+
+class SurgeEvent(Base):
+    """급등·거래량 급증·상한가 근처 이벤트 색인 (PythonCode/surge_index.py와 같은 구조)"""
+    __tablename__ = "surge_events"
+    __table_args__ = (
+        UniqueConstraint("stock_code", "date", "event_type", name="uq_surge_events_stock_date_type"),
+        # 종목별 임의 기준 조회 / 날짜별 전 종목 조회
+        Index("ix_surge_events_stock_type_magnitude", "stock_code", "event_type", "magnitude"),
+        Index("ix_surge_events_type_date", "event_type", "date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    stock_code = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
+    event_type = Column(String, nullable=False)
+    magnitude = Column(Float)
+    change_rate = Column(Float)
+    close_price = Column(Float)
+    volume = Column(BigInteger)
+    created_at = Column(DateTime, server_default=func.now())
+
+class BackgroundJob(Base):
+    """종목 추가 후 수집 → 분석을 실행하는 백그라운드 작업 (job_queue.py)"""
+    __tablename__ = "background_jobs"
+    __table_args__ = (
+        # 대기 작업 조회 / 종목별 작업 조회
+        Index("ix_background_jobs_status_id", "status", "id"),
+        Index("ix_background_jobs_stock_code", "stock_code"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String, nullable=False)
+    stock_code = Column(String, nullable=False)
+    stock_name = Column(String)
+    status = Column(String, nullable=False, default="queued")  # queued / running / succeeded / failed
+    step = Column(String)  # 현재 단계 (resolve_name / collect / analyze / verify)
+    progress = Column(Integer, default=0)  # 0~100
+    message = Column(Text)  # 실행 중인 단계의 마지막 출력
+    error = Column(Text)
+    attempts = Column(Integer, default=0)
+    worker = Column(String)  # 실행 중인 작업자 (호스트:PID)
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime, server_default=func.now())
+
+class DataVersion(Base):
+    """응답 캐시 무효화용 데이터 범위별 공유 버전 (PythonCode/data_version.py)"""
+    __tablename__ = "data_versions"
+
+    scope = Column(String, primary_key=True)  # collection / analysis
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now())
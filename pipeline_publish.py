@@ -0,0 +1,83 @@
+import os
+import sys
+
+from sqlalchemy import create_engine, text
+
+# 수집·분석 스크립트(PythonCode)가 API DB(PostgreSQL)에 결과를 게시할 때 사용
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "PythonCode"))
+from bulk_loader import BulkLoader, coerce_frame, COMPLETED_STOCKS_COLUMNS, COMPLETED_STOCKS_INT_COLUMNS, DAILY_DATA_COLUMNS
+from data_version import bump_data_version, shared_version_bump, COLLECTION, ANALYSIS
+from dashboard_summary import refresh_dashboard_summary_sync
+from surge_events import rebuild_surge_events
+
+# API DB completed_stocks(models.CompletedStock)에는 거래량_cap 컬럼이 없음
+API_COMPLETED_STOCKS_COLUMNS = {
+    source: target for source, target in COMPLETED_STOCKS_COLUMNS.items() if target != 'trading_volume_cap'
+}
+
+ANALYSIS_COLUMNS = [
+    "stock_name", "stock_code", "category", "manipulation_period", "max_rise_rate",
+    "manipulation_type", "risk_level", "risk_score", "description", "analysis_patterns", "warnings",
+]
+
+# 분석 이력은 누적하며 API는 종목별 최신 행(created_at)을 조회
+INSERT_ANALYSIS_SQL = f"""
+    INSERT INTO manipulation_analysis ({', '.join(ANALYSIS_COLUMNS)}, created_at, updated_at)
+    VALUES ({', '.join(f':{column}' for column in ANALYSIS_COLUMNS)}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+"""
+
+
+def get_api_engine(url=None):
+    """API DB 동기 엔진을 반환합니다. url이 없으면 DATABASE_URL을 사용하며, 둘 다 없으면 None"""
+    url = url or os.getenv("DATABASE_URL")
+    return create_engine(url) if url else None
+
+
+def publish_collected_stock(engine, df, stock_name, stock_code):
+    """수집 DataFrame(날짜 인덱스)을 API DB에 반영하고 반영한 일자 수를 반환합니다.
+
+    한 트랜잭션에서 completed_stocks는 (stock_code, date) 기준 upsert,
+    stock_daily_data는 수집 기간의 기존 행을 지운 뒤 삽입하고,
+    종목의 급등 이벤트 색인을 다시 만든 뒤 수집 데이터 버전을 올립니다.
+    """
+    completed = coerce_frame(
+        df, API_COMPLETED_STOCKS_COLUMNS, COMPLETED_STOCKS_INT_COLUMNS,
+        constants={'stock_name': stock_name, 'stock_code': stock_code}
+    )
+    if completed.empty:
+        return 0
+    daily = coerce_frame(df, DAILY_DATA_COLUMNS, {'volume'}, constants={'stock_code': stock_code})
+    with engine.begin() as connection:
+        loader = BulkLoader(connection.connection.driver_connection)
+        loader.load('completed_stocks', completed, upsert_keys=['stock_code', 'date'], touch_columns=['updated_at'])
+        # stock_daily_data에는 (종목, 날짜) 고유 키가 없으므로 수집 기간의 행을 바꿔 넣음
+        connection.execute(
+            text("DELETE FROM stock_daily_data WHERE stock_code = :stock_code AND date >= :start_date"),
+            {"stock_code": stock_code, "start_date": daily['date'].min()}
+        )
+        loader.load('stock_daily_data', daily)
+        # 색인 재생성 SQL은 PostgreSQL 전용 (LATERAL, ANY)
+        if connection.dialect.name == "postgresql":
+            rebuild_surge_events(connection, [stock_code])
+        connection.execute(*shared_version_bump(COLLECTION))
+    bump_data_version(COLLECTION)
+    return len(completed)
+
+
+def publish_analysis_results(engine, rows):
+    """분석 결과 행(ANALYSIS_COLUMNS dict 목록)을 API DB manipulation_analysis에 추가하고 대시보드 요약을 다시 집계합니다.
+
+    행 추가와 분석 데이터 버전 증가는 한 트랜잭션에서 하며 추가한 행 수를 반환합니다.
+    """
+    if not rows:
+        return 0
+    with engine.begin() as connection:
+        connection.execute(text(INSERT_ANALYSIS_SQL), rows)
+        connection.execute(*shared_version_bump(ANALYSIS))
+    bump_data_version(ANALYSIS)
+    # 요약 갱신 실패(뷰 미생성 등)는 게시 실패로 보지 않음 (요약 조회는 실시간 집계로 대체됨)
+    try:
+        refresh_dashboard_summary_sync(engine)
+    except Exception as e:
+        print(f"대시보드 요약 갱신 실패: {str(e)}")
+    return len(rows)
@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from data_version import get_data_version
+
+# 캐시 항목 최대 개수와 유효 시간(초). 공유 데이터 버전을 읽지 못하는 동안을 대비해 유효 시간으로도 만료
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+
+# 브라우저는 응답을 저장하되 매번 ETag로 재검증
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(body):
+    """응답 본문으로 강한 ETag를 만듭니다."""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match 헤더 값이 etag와 일치하는지 확인합니다."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+class ResponseCache:
+    """GET 응답 본문을 (경로, 쿼리, Accept) 단위로 보관하는 LRU 캐시
+
+    항목은 저장 시점의 데이터 버전(data_version)을 함께 보관하며,
+    조회 시 버전이 바뀌었거나 유효 시간이 지났으면 버립니다.
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttl=RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # 키 → (데이터 버전, 저장 시각, 본문, ETag, 미디어 타입)
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # 실행 중인 같은 요청의 결과를 함께 받은 요청 수
+        self.coalesced = 0
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version or time.monotonic() - entry[1] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2:]
+
+    def put(self, key, version, body, etag, media_type):
+        with self._lock:
+            self._entries[key] = (version, time.monotonic(), body, etag, media_type)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """조회 엔드포인트 응답을 캐시하고 ETag / 304 Not Modified를 처리합니다.
+
+    route_scopes: 경로 접두사 → 응답이 의존하는 데이터 범위 목록.
+    가장 긴 접두사가 일치하는 GET 요청만 캐시하며, 200 응답 중
+    Cache-Control: no-store가 지정된 응답(오류 본문 등)은 저장하지 않습니다.
+
+    캐시에 없는 같은 요청(같은 캐시 키, 같은 데이터 버전)이 동시에 들어오면 첫 요청만
+    엔드포인트를 실행하고 나머지는 그 결과(직렬화된 본문)를 함께 받습니다. (single-flight)
+    첫 요청의 응답을 저장할 수 없었으면 기다리던 요청은 각자 엔드포인트를 실행합니다.
+    """
+
+    def __init__(self, app, route_scopes, cache=None):
+        super().__init__(app)
+        self.route_scopes = sorted(route_scopes.items(), key=lambda item: len(item[0]), reverse=True)
+        self.cache = cache or ResponseCache()
+        # (캐시 키, 데이터 버전) → 실행 중인 첫 요청의 결과 Future
+        self._inflight = {}
+
+    def _scopes_for(self, path):
+        for prefix, scopes in self.route_scopes:
+            if path.startswith(prefix):
+                return scopes
+        return None
+
+    def _response(self, request, body, etag, media_type):
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type=media_type, headers=headers)
+
+    async def dispatch(self, request, call_next):
+        scopes = self._scopes_for(request.url.path) if request.method == "GET" else None
+        if not scopes:
+            return await call_next(request)
+
+        # 같은 경로도 Accept 헤더에 따라 응답 형식이 달라질 수 있음
+        key = f"{request.url.path}?{request.url.query}|{request.headers.get('accept', '')}"
+        # 엔드포인트 실행 전에 버전을 읽어 두어, 실행 중에 커밋된 쓰기는 다음 요청에서 반영
+        version = get_data_version(scopes)
+        cached = self.cache.get(key, version)
+        if cached is not None:
+            return self._response(request, *cached)
+
+        flight_key = (key, version)
+        pending = self._inflight.get(flight_key)
+        if pending is not None:
+            # 같은 요청이 실행 중이면 결과를 기다림 (취소되어도 첫 요청은 계속 실행)
+            shared = await asyncio.shield(pending)
+            if shared is not None:
+                self.cache.coalesced += 1
+                return self._response(request, *shared)
+            return await call_next(request)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[flight_key] = future
+        try:
+            response = await call_next(request)
+            if response.status_code != 200 or "no-store" in response.headers.get("cache-control", ""):
+                return response
+
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            etag = make_etag(body)
+            media_type = response.headers.get("content-type", "application/json")
+            self.cache.put(key, version, body, etag, media_type)
+            future.set_result((body, etag, media_type))
+            return self._response(request, body, etag, media_type)
+        finally:
+            if not future.done():
+                future.set_result(None)
+            self._inflight.pop(flight_key, None)
@@ -0,0 +1,49 @@
+from sqlalchemy import text
+
+# 기존 테이블을 models.py의 인덱스 선언에 맞추는 사전 작업 (인덱스 생성 전에 실행, 여러 번 실행해도 결과가 같음)
+PRE_INDEX_SQL = [
+    # (stock_code, date) 고유 인덱스를 처음 만들 때만 중복 행 정리 (가장 나중에 넣은 행 유지)
+    """
+    DO $$
+    BEGIN
+        IF to_regclass('uq_completed_stocks_stock_code_date') IS NULL THEN
+            DELETE FROM completed_stocks a USING completed_stocks b
+            WHERE a.stock_code = b.stock_code AND a.date = b.date AND a.id < b.id;
+        END IF;
+    END $$
+    """,
+    # 고유 인덱스로 대체된 이전 인덱스
+    "DROP INDEX IF EXISTS ix_completed_stocks_stock_code_date",
+]
+
+
+# 기존 테이블의 컬럼을 models.py에 맞추는 작업 (여러 번 실행해도 결과가 같음)
+COLUMN_UPGRADE_SQL = [
+    # migrate_all_dbs.py로 만든 테이블에는 기본값이 없어 게시한 행의 시각이 비어 있었음
+    # (작업 대기열의 verify 단계가 이 시각으로 이번 작업이 쓴 행인지 확인)
+    "ALTER TABLE completed_stocks ALTER COLUMN created_at SET DEFAULT now(), ALTER COLUMN updated_at SET DEFAULT now()",
+    "ALTER TABLE stock_daily_data ALTER COLUMN created_at SET DEFAULT now()",
+    "ALTER TABLE manipulation_analysis ALTER COLUMN created_at SET DEFAULT now(), ALTER COLUMN updated_at SET DEFAULT now()",
+    # 상장주식수는 integer 범위를 넘는 종목이 있음 (삼성전자 약 59억 주)
+    """
+    DO $$
+    BEGIN
+        IF (SELECT data_type FROM information_schema.columns
+            WHERE table_name = 'completed_stocks' AND column_name = 'listed_shares') = 'integer' THEN
+            ALTER TABLE completed_stocks ALTER COLUMN listed_shares TYPE BIGINT;
+        END IF;
+    END $$
+    """,
+]
+
+
+def run_column_upgrades(connection):
+    """COLUMN_UPGRADE_SQL을 차례로 실행합니다. (동기 연결, 테이블 생성 뒤 init_db.py·migrate_all_dbs.py에서 호출)"""
+    for statement in COLUMN_UPGRADE_SQL:
+        connection.execute(text(statement))
+
+
+def run_pre_index_upgrades(connection):
+    """PRE_INDEX_SQL을 차례로 실행합니다. (동기 연결, init_db.py·migrate_all_dbs.py에서 호출)"""
+    for statement in PRE_INDEX_SQL:
+        connection.execute(text(statement))
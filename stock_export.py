@@ -0,0 +1,173 @@
+import csv
+import io
+import os
+
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from chart_format import ARROW
+
+# 내보내기 형식
+#  - ndjson: 행마다 JSON 객체 한 줄
+#  - csv: 첫 줄 헤더, 날짜는 YYYY-MM-DD, NULL은 빈 칸
+#  - arrow: Arrow IPC 스트림 (청크마다 레코드 배치 하나)
+NDJSON = "ndjson"
+CSV = "csv"
+
+EXPORT_MEDIA_TYPES = {
+    NDJSON: "application/x-ndjson",
+    CSV: "text/csv; charset=utf-8",
+    ARROW: "application/vnd.apache.arrow.stream",
+}
+EXPORT_EXTENSIONS = {NDJSON: "ndjson", CSV: "csv", ARROW: "arrows"}
+EXPORT_FORMAT_PATTERN = f"^({'|'.join(EXPORT_MEDIA_TYPES)})$"
+
+# 서버 측 커서에서 한 번에 가져와 내보내는 행 수 (API 서버 메모리 사용량의 상한)
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))
+
+EXPORT_TABLE = "completed_stocks"
+# 항상 앞에 오는 식별 컬럼
+KEY_FIELDS = ["stock_code", "date"]
+# fields로 고를 수 있는 completed_stocks 컬럼 (기본: 전체)
+EXPORT_FIELDS = [
+    "stock_name", "open_price", "high_price", "low_price", "close_price", "volume", "change_rate",
+    "market_cap", "trading_value", "listed_shares", "bps", "per", "pbr", "eps", "div", "dps",
+    "institution_total", "other_corporation", "individual", "foreign_total", "short_balance", "short_ratio",
+]
+# Arrow 스키마용 컬럼 종류 (나머지는 float64)
+_TEXT_FIELDS = {"stock_code", "stock_name"}
+_INTEGER_FIELDS = {"volume", "listed_shares"}
+
+
+def resolve_export_fields(fields):
+    """요청한 필드 목록을 검증하고 (식별 컬럼 + 필드) 컬럼 목록을 반환합니다."""
+    requested = list(dict.fromkeys(field for field in fields if field not in KEY_FIELDS)) or EXPORT_FIELDS
+    invalid = [field for field in requested if field not in EXPORT_FIELDS]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(invalid)}")
+    return KEY_FIELDS + requested
+
+
+def build_export_query(columns, codes=None, start_date=None, end_date=None):
+    """내보내기 (쿼리, 파라미터)를 만듭니다. (종목코드, 날짜 오름차순, 컬럼명은 검증된 목록만)"""
+    conditions = []
+    params = {}
+    if codes:
+        conditions.append("stock_code = ANY(:codes)")
+        params["codes"] = list(codes)
+    if start_date:
+        conditions.append("date >= :start_date")
+        params["start_date"] = start_date
+    if end_date:
+        conditions.append("date <= :end_date")
+        params["end_date"] = end_date
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = text(f"SELECT {', '.join(columns)} FROM {EXPORT_TABLE} {where} ORDER BY stock_code, date")
+    # 서버 측 커서에서 청크 크기만큼씩 가져옴 (전체 결과를 메모리에 올리지 않음)
+    return query.execution_options(yield_per=EXPORT_CHUNK_ROWS), params
+
+
+class NdjsonEncoder:
+    def __init__(self, columns):
+        self.columns = columns
+
+    def header(self):
+        return b""
+
+    def encode(self, rows):
+        columns = self.columns
+        return b"".join(orjson.dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+    def footer(self):
+        return b""
+
+
+class CsvEncoder:
+    def __init__(self, columns):
+        self.columns = columns
+
+    def _write(self, rows):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+    def header(self):
+        # 엑셀에서 한글 종목명이 깨지지 않도록 BOM을 붙임
+        return b"\xef\xbb\xbf" + self._write([self.columns])
+
+    def encode(self, rows):
+        # date는 str()이 YYYY-MM-DD, None은 빈 칸
+        return self._write(rows)
+
+    def footer(self):
+        return b""
+
+
+class ArrowEncoder:
+    """청크마다 레코드 배치 하나를 Arrow IPC 스트림으로 이어 씁니다."""
+
+    def __init__(self, columns):
+        # Arrow 형식 요청에서만 필요하므로 처음 사용할 때 불러옴
+        import pyarrow as pa
+
+        self.pa = pa
+        self.columns = columns
+        self.schema = pa.schema([(column, self._type(column)) for column in columns])
+        self.sink = io.BytesIO()
+        self.writer = None
+
+    def _type(self, column):
+        pa = self.pa
+        if column == "date":
+            return pa.date32()
+        if column in _TEXT_FIELDS:
+            return pa.string()
+        if column in _INTEGER_FIELDS:
+            return pa.int64()
+        return pa.float64()
+
+    def _drain(self):
+        data = self.sink.getvalue()
+        self.sink.seek(0)
+        self.sink.truncate()
+        return data
+
+    def header(self):
+        self.writer = self.pa.ipc.new_stream(self.sink, self.schema)
+        return self._drain()
+
+    def encode(self, rows):
+        arrays = [
+            self.pa.array(values, type=field.type)
+            for values, field in zip(zip(*rows), self.schema)
+        ]
+        self.writer.write_batch(self.pa.record_batch(arrays, schema=self.schema))
+        return self._drain()
+
+    def footer(self):
+        self.writer.close()
+        return self._drain()
+
+
+ENCODERS = {NDJSON: NdjsonEncoder, CSV: CsvEncoder, ARROW: ArrowEncoder}
+
+
+async def iter_export(session_factory, fmt, columns, codes=None, start_date=None, end_date=None):
+    """completed_stocks를 서버 측 커서로 읽으며 요청 형식의 바이트 청크를 차례로 내보냅니다.
+
+    한 번에 EXPORT_CHUNK_ROWS행만 메모리에 두므로 전체 테이블도 일정한 메모리로 내보냅니다.
+    session_factory: 스트리밍 동안 연결을 쥐고 있을 전용 세션을 만드는 함수
+    """
+    encoder = ENCODERS[fmt](columns)
+    query, params = build_export_query(columns, codes, start_date, end_date)
+    header = encoder.header()
+    if header:
+        yield header
+    async with session_factory() as session:
+        result = await session.stream(query, params)
+        async for rows in result.partitions(EXPORT_CHUNK_ROWS):
+            yield encoder.encode(rows)
+    footer = encoder.footer()
+    if footer:
+        yield footer
@@ -0,0 +1,49 @@
+from sqlalchemy import text
+
+from surge_index import BASE_THRESHOLDS, SURGE, VOLUME_SPIKE, VOLUME_SPIKE_SIGMA, NEAR_LIMIT_UP, NEAR_LIMIT_UP_THRESHOLD
+
+# 이벤트 종류별 magnitude 계산식 (d: 종목별 거래량 평균·표준편차를 붙인 stock_daily_data 행)
+# surge_index.detect_surge_events와 같은 정의: 등락률(%) 또는 종목 전체 기간 기준 거래량 z-score
+EVENT_MAGNITUDE_SQL = """
+    SELECT d.stock_code, d.date, d.change_rate, d.close_price, d.volume,
+           (d.volume - AVG(d.volume) OVER w) / NULLIF(STDDEV_SAMP(d.volume) OVER w, 0) AS volume_z
+    FROM stock_daily_data d
+    {where}
+    WINDOW w AS (PARTITION BY d.stock_code)
+"""
+
+# 행마다 세 종류의 후보를 펼친 뒤 기준을 넘은 것만 삽입 (거래량 급증은 기존 분석과 같이 경계 제외)
+REBUILD_SQL = """
+    INSERT INTO surge_events (stock_code, date, event_type, magnitude, change_rate, close_price, volume)
+    SELECT s.stock_code, s.date, ev.event_type, ev.magnitude, s.change_rate, s.close_price, s.volume
+    FROM ({magnitude}) s
+    CROSS JOIN LATERAL (VALUES
+        (CAST(:surge AS TEXT), CAST(s.change_rate AS DOUBLE PRECISION), s.change_rate >= :surge_base),
+        (CAST(:near_limit_up AS TEXT), CAST(s.change_rate AS DOUBLE PRECISION), s.change_rate >= :near_limit_up_base),
+        (CAST(:volume_spike AS TEXT), CAST(s.volume_z AS DOUBLE PRECISION), s.volume_z > :volume_spike_sigma)
+    ) AS ev(event_type, magnitude, hit)
+    WHERE ev.hit
+    ON CONFLICT (stock_code, date, event_type) DO NOTHING
+"""
+
+
+def rebuild_surge_events(connection, stock_codes=None):
+    """stock_daily_data로부터 surge_events 색인을 집합 연산 한 번으로 다시 만들고 삽입한 행 수를 반환합니다.
+
+    동기 연결 또는 세션을 받으며 커밋은 호출한 쪽에서 합니다.
+    stock_codes: 다시 만들 종목코드 목록 (없으면 전 종목)
+    """
+    params = {
+        "surge": SURGE, "surge_base": BASE_THRESHOLDS[SURGE],
+        "near_limit_up": NEAR_LIMIT_UP, "near_limit_up_base": NEAR_LIMIT_UP_THRESHOLD,
+        "volume_spike": VOLUME_SPIKE, "volume_spike_sigma": VOLUME_SPIKE_SIGMA,
+    }
+    if stock_codes:
+        params["codes"] = list(stock_codes)
+        connection.execute(text("DELETE FROM surge_events WHERE stock_code = ANY(:codes)"), {"codes": params["codes"]})
+        where = "WHERE d.stock_code = ANY(:codes)"
+    else:
+        connection.execute(text("DELETE FROM surge_events"))
+        where = ""
+    result = connection.execute(text(REBUILD_SQL.format(magnitude=EVENT_MAGNITUDE_SQL.format(where=where))), params)
+    return result.rowcount
@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# API 모듈(루트)과 수집·분석 파이프라인 모듈(PythonCode)을 모두 import할 수 있도록 경로 추가
+for path in (ROOT, os.path.join(ROOT, "PythonCode")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# 데이터 버전 파일을 저장소의 DB/versions 대신 임시 경로에 기록
+os.environ.setdefault("DATA_VERSION_DIR", tempfile.mkdtemp(prefix="data_versions_"))
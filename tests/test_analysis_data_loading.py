@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analyze_patterns
+import mmap_store
+from pattern_analyzer import StockPatternAnalyzer
+
+
+@pytest.fixture
+def series_store(tmp_path, monkeypatch):
+    """임시 경로의 시계열 저장소를 프로세스 공용 저장소로 사용 (Parquet·CSV 경로도 비어 있는 임시 경로)"""
+    monkeypatch.chdir(tmp_path)
+    store = mmap_store.MmapSeriesStore(str(tmp_path / "series"))
+    monkeypatch.setattr(mmap_store, "_default_store", store)
+    return store
+
+
+def collected_frame(days=30):
+    index = pd.date_range("2024-01-02", periods=days, freq="B")
+    close = np.linspace(1000, 2000, days)
+    return pd.DataFrame({
+        '시가': close - 10, '고가': close + 10, '저가': close - 20, '종가': close,
+        '거래량': np.arange(days) * 100 + 1000, '등락률': np.full(days, 3.0),
+        '시가총액': close * 1e6, '거래대금': close * 1e3,
+        '공매도잔고': np.full(days, 50.0), '비중': np.full(days, 0.5),
+        '상장주식수': np.full(days, 1e6),
+    }, index=index)
+
+
+def test_single_stock_analysis_reads_series_store(series_store):
+    assert series_store.write(collected_frame(), "테스트", "999999")
+
+    # Parquet 저장소와 CSV에는 없는 종목이므로 시계열 저장소에서만 읽을 수 있음
+    stock_name, df = analyze_patterns.load_stock_data("999999", columns=analyze_patterns.ANALYSIS_COLUMNS)
+
+    assert stock_name == "테스트"
+    assert list(df.columns) == analyze_patterns.ANALYSIS_COLUMNS
+    assert len(df) == 30
+    assert df['종가'].iloc[-1] == 2000
+    assert StockPatternAnalyzer().analyze_stock_data(df, stock_name, "999999")
+
+
+def test_analysis_columns_are_all_in_series_store():
+    assert set(analyze_patterns.ANALYSIS_COLUMNS) <= set(mmap_store.FIELDS.values())
@@ -0,0 +1,82 @@
+import sqlite3
+
+import pandas as pd
+
+from db_manager import DatabaseManager
+
+
+def collected_frame(dates, close):
+    """수집 단계 DataFrame 형태(날짜 인덱스, 한글 컬럼)의 테스트 데이터"""
+    index = pd.to_datetime(dates)
+    return pd.DataFrame({
+        '시가': [close - 100] * len(dates),
+        '고가': [close + 100] * len(dates),
+        '저가': [close - 200] * len(dates),
+        '종가': [close] * len(dates),
+        '거래량': [1000] * len(dates),
+        '등락률': [1.5] * len(dates),
+        '거래량_cap': [2000] * len(dates),
+        '상장주식수': [3000] * len(dates),
+        '기관합계': [10] * len(dates),
+        '기타법인': [20] * len(dates),
+        '공매도잔고': [30] * len(dates),
+        '비중': [0.4] * len(dates),
+    }, index=index)
+
+
+def fetch(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def test_incremental_save_twice_on_fresh_db(tmp_path):
+    db_path = str(tmp_path / "DB" / "collectCompleteData.db")
+    manager = DatabaseManager(db_path)
+
+    manager.save_completed_stocks(collected_frame(["2024-01-02", "2024-01-03"], 5000), "테스트", "000001", incremental=True)
+    manager.save_completed_stocks(collected_frame(["2024-01-03", "2024-01-04"], 6000), "테스트", "000001", incremental=True)
+
+    rows = fetch(db_path, """
+        SELECT date, close_price, trading_volume_cap, listed_shares, institution_total,
+               other_corporation, short_balance, short_ratio
+        FROM completed_stocks WHERE stock_code = '000001' ORDER BY date
+    """)
+    assert rows == [
+        ("2024-01-02", 5000, 2000, 3000, 10, 20, 30, 0.4),
+        ("2024-01-03", 6000, 2000, 3000, 10, 20, 30, 0.4),
+        ("2024-01-04", 6000, 2000, 3000, 10, 20, 30, 0.4),
+    ]
+
+
+def test_incremental_save_upgrades_legacy_table(tmp_path):
+    db_path = str(tmp_path / "collectCompleteData.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE completed_stocks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stock_name TEXT NOT NULL, stock_code TEXT NOT NULL, date DATE NOT NULL,
+            open_price INTEGER, high_price INTEGER, low_price INTEGER, close_price INTEGER,
+            volume BIGINT, change_rate REAL, market_cap BIGINT, volume_cap BIGINT,
+            trading_value BIGINT, shares_outstanding BIGINT, bps REAL, per REAL, pbr REAL,
+            eps REAL, div REAL, dps REAL, institutional_total BIGINT, other_corporate BIGINT,
+            individual BIGINT, foreign_total BIGINT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # UNIQUE가 없던 테이블의 중복 행은 마지막 행만 남음
+    conn.executemany(
+        "INSERT INTO completed_stocks (stock_name, stock_code, date, close_price, volume_cap) VALUES (?, ?, ?, ?, ?)",
+        [("테스트", "000001", "2024-01-02", 4000, 1), ("테스트", "000001", "2024-01-02", 4500, 2)],
+    )
+    conn.commit()
+    conn.close()
+
+    manager = DatabaseManager(db_path)
+    manager.save_completed_stocks(collected_frame(["2024-01-03"], 5000), "테스트", "000001", incremental=True)
+    manager.save_completed_stocks(collected_frame(["2024-01-03"], 5500), "테스트", "000001", incremental=True)
+
+    rows = fetch(db_path, "SELECT date, close_price, trading_volume_cap, short_balance FROM completed_stocks ORDER BY date")
+    assert rows == [("2024-01-02", 4500, 2, None), ("2024-01-03", 5500, 2000, 30)]